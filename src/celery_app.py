@@ -28,7 +28,7 @@ async def get_setup_utils():
     )
 
     # LLM and VectorDB factories
-    llm_provider_factory = LLMProviderFactory(config=settings)
+    llm_provider_factory = LLMProviderFactory(config=settings, db_client=db_client)
     vector_db_provider_factory = VectorDBProviderFactory(config=settings, db_client=db_client)
 
     generation_client = llm_provider_factory.create(
@@ -44,6 +44,8 @@ async def get_setup_utils():
             model_id=settings.EMBEDDING_MODEL_ID,
             embedding_size=settings.EMBEDDING_MODEL_SIZE
         )
+    embedding_client = llm_provider_factory.create_cached_embedding_client(
+        embedding_client=embedding_client, provider=settings.EMBEDDING_BACKEND)
 
     vectordb_client = vector_db_provider_factory.create(
         provider=settings.VECTOR_DB_BACKEND,
@@ -97,9 +99,16 @@ celery_app.conf.update(
 
     task_routes={
         "tasks.file_processing.process_project_files": {"queue": "file_processing"},
+        "tasks.file_processing.fan_out_project_files": {"queue": "file_processing"},
+        "tasks.file_processing.aggregate_process_results": {"queue": "file_processing"},
+        "tasks.file_processing.process_project_files_batch": {"queue": "file_processing"},
+        "tasks.file_processing.reset_project_data": {"queue": "file_processing"},
         "tasks.data_indexing.index_data_content": {"queue": "data_indexing"},
         "tasks.process_workflow.process_and_push_task": {"queue": "file_processing"},
-        "tasks.maintenance.clean_celery_executions_table": {"queue": "default"}
+        "tasks.maintenance.clean_celery_executions_table": {"queue": "default"},
+        "tasks.maintenance.clean_stale_upload_sessions": {"queue": "default"},
+        "tasks.maintenance.prune_embedding_cache": {"queue": "default"},
+        "tasks.maintenance.promote_large_pgvector_collections": {"queue": "default"}
     },
     
     beat_schedule={
@@ -107,6 +116,21 @@ celery_app.conf.update(
             "task": "tasks.maintenance.clean_celery_executions_table",
             "schedule": 86400,
             "args": ()
+        },
+        "cleanup-stale-upload-sessions": {
+            "task": "tasks.maintenance.clean_stale_upload_sessions",
+            "schedule": 3600,
+            "args": ()
+        },
+        "prune-embedding-cache": {
+            "task": "tasks.maintenance.prune_embedding_cache",
+            "schedule": 86400,
+            "args": ()
+        },
+        "promote-large-pgvector-collections": {
+            "task": "tasks.maintenance.promote_large_pgvector_collections",
+            "schedule": 86400,
+            "args": ()
         }
     },
     
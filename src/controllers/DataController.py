@@ -21,6 +21,37 @@ class DataController(BaseController):
             return False, ResponseSignal.FILE_SIZE_EXCEEDED.value
         
         return True, ResponseSignal.FILE_UPLOAD_SUCCESS.value
+
+    def validate_upload_session(self, content_type: str, file_size: int):
+        # resumable uploads declare the file properties before sending any byte
+
+        if content_type not in self.app_settings.FILE_ALLOWED_TYPES:
+            return False, ResponseSignal.FILE_TYPE_NOT_SUPPORTED.value
+
+        if file_size <= 0 or file_size > self.app_settings.FILE_MAX_SIZE * self.size_scale:
+            return False, ResponseSignal.FILE_SIZE_EXCEEDED.value
+
+        return True, ResponseSignal.FILE_VALIDATED_SUCCESS.value
+
+    def parse_content_range(self, content_range: str, file_size: int):
+        """
+        Parse a "bytes start-end/total" header (end inclusive).
+        Returns the [start, end) range or None when it is invalid for this file.
+        """
+        match = re.fullmatch(r'bytes (\d+)-(\d+)/(\d+|\*)', (content_range or "").strip())
+        if not match:
+            return None
+
+        start, end = int(match.group(1)), int(match.group(2)) + 1
+        total = match.group(3)
+
+        if total != "*" and int(total) != file_size:
+            return None
+
+        if start >= end or end > file_size:
+            return None
+
+        return start, end
     
     def generate_unique_filepath(self, orig_filename: str, project_id: str):
         
@@ -1,6 +1,7 @@
 from .BaseController import BaseController
 from models.db_schemas.minirag.schemas import Project, DataChunk
 from stores.llm.LLMEnums import DocumentTypeEnums
+from stores.vectordb.VectorDBEnums import MetadataFieldEnums
 from typing import List
 import json
 
@@ -36,34 +37,67 @@ class NLPController(BaseController):
                              chunks_ids: List[int],
                              do_reset: bool = False):
 
-        # step1: get collection name
+        # step1: embed the chunks
+        vectors = await self.embed_chunks(chunks=chunks)
+
+        # step2: create collection if not exists
         collection_name = self.create_collection_name(
             project_id=project.project_id)
 
-        # step2: manage items
-        texts = [c.chunk_text for c in chunks]
-        metadata = [c.chunk_metadata for c in chunks]
-        vectors = self.embedding_client.embed_text(text=texts, document_type=DocumentTypeEnums.DOCUMENT.value)
-        
-        # step3: create collection if not exists
         _ = await self.vectordb_client.create_collection(
             collection_name=collection_name,
             embedding_size=self.embedding_client.embedding_size,
             do_reset=do_reset
         )
 
-        # step4: index into vector db
+        # step3: index into vector db
+        return await self.insert_into_vector_db(
+            project=project,
+            chunks=chunks,
+            chunks_ids=chunks_ids,
+            vectors=vectors
+        )
+
+    async def embed_chunks(self, chunks: List[DataChunk]):
+        texts = [c.chunk_text for c in chunks]
+        return await self.embedding_client.embed_text(text=texts, document_type=DocumentTypeEnums.DOCUMENT.value)
+
+    async def insert_into_vector_db(self, project: Project, chunks: List[DataChunk],
+                                    chunks_ids: List[int], vectors: List[List[float]]):
+        """Insert already embedded chunks, the collection must exist"""
+
+        if not vectors or len(vectors) != len(chunks):
+            return False
+
+        collection_name = self.create_collection_name(
+            project_id=project.project_id)
+
         _ = await self.vectordb_client.insert_many(
             collection_name=collection_name,
-            texts=texts,
-            metadata=metadata,
+            texts=[c.chunk_text for c in chunks],
+            metadata=[self.get_chunk_metadata(chunk=c) for c in chunks],
             vectors=vectors,
             record_ids=chunks_ids
         )
 
         return True
 
-    async def _search_vector_db_collection_internal(self, project: Project, query: str, limit: int = 5):
+    def get_chunk_metadata(self, chunk: DataChunk) -> dict:
+        """The chunk metadata plus the fields the search filters use"""
+        metadata = dict(chunk.chunk_metadata or {})
+        metadata[MetadataFieldEnums.ASSET_ID.value] = chunk.chunk_asset_id
+        return metadata
+
+    def get_search_params(self, project: Project, search_params: dict = None) -> dict:
+        """ANN tuning of a query: the project defaults overridden by the query values"""
+        params = dict((project.project_config or {}).get("search") or {})
+        for key, value in (search_params or {}).items():
+            if value is not None:
+                params[key] = value
+        return params
+
+    async def _search_vector_db_collection_internal(self, project: Project, query: str, limit: int = 5,
+                                                    search_params: dict = None, search_filter: dict = None):
         """Internal method that returns original objects for internal processing"""
         
         # step 1: get collection name
@@ -72,7 +106,7 @@ class NLPController(BaseController):
             project_id=project.project_id)
 
         # step 2: get text embedding vector
-        vectors = self.embedding_client.embed_text(
+        vectors = await self.embedding_client.embed_text(
             text=query, document_type=DocumentTypeEnums.QUERY.value)
 
         if not vectors or len(vectors) == 0:
@@ -84,22 +118,37 @@ class NLPController(BaseController):
         if not query_vector:
             return False
 
-        # step 3: do semantic search
-        results = await self.vectordb_client.search_by_vector(
-            collection_name=collection_name,
-            vector=query_vector,
-            limit=limit
-        )
+        # step 3: do semantic (or hybrid) search
+        search_params = self.get_search_params(project=project, search_params=search_params)
+        if search_params.get("hybrid"):
+            results = await self.vectordb_client.hybrid_search(
+                collection_name=collection_name,
+                text=query,
+                vector=query_vector,
+                limit=limit,
+                search_params=search_params,
+                search_filter=search_filter
+            )
+        else:
+            results = await self.vectordb_client.search_by_vector(
+                collection_name=collection_name,
+                vector=query_vector,
+                limit=limit,
+                search_params=search_params,
+                search_filter=search_filter
+            )
 
         if not results or len(results) == 0:
             return False
         
         return results
 
-    async def search_vector_db_collection(self, project: Project, query: str, limit: int = 5):
+    async def search_vector_db_collection(self, project: Project, query: str, limit: int = 5,
+                                          search_params: dict = None, search_filter: dict = None):
         """Public method that returns JSON serializable results for API responses"""
         
-        results = await self._search_vector_db_collection_internal(project, query, limit)
+        results = await self._search_vector_db_collection_internal(project, query, limit,
+                                                                   search_params, search_filter)
         
         if not results:
             return False
@@ -109,7 +158,8 @@ class NLPController(BaseController):
             json.dumps(results, default=lambda o: o.__dict__)
         )
 
-    async def answer_rag_question(self, project: Project, query: str, limit: int = 5):
+    async def answer_rag_question(self, project: Project, query: str, limit: int = 5,
+                                  search_params: dict = None, search_filter: dict = None):
 
         answer, full_prompt, chat_history = None, None, None
         
@@ -117,7 +167,9 @@ class NLPController(BaseController):
         retrieved_docs = await self._search_vector_db_collection_internal(
             project=project,
             query=query,
-            limit=limit
+            limit=limit,
+            search_params=search_params,
+            search_filter=search_filter
         )
 
         if not retrieved_docs or len(retrieved_docs) == 0:
@@ -150,7 +202,7 @@ class NLPController(BaseController):
             footer_prompt
         ])
         
-        answer = self.generation_client.generate_text(
+        answer = await self.generation_client.generate_text(
             prompt=full_prompt,
             chat_history=chat_history
         )
@@ -4,8 +4,17 @@ import os
 from langchain_community.document_loaders import TextLoader
 from langchain_community.document_loaders import PyMuPDFLoader
 from models.enums.ProcessingEnum import ProcessingEnum
-from typing import List
+from models.enums.ChunkingMethodEnum import ChunkingMethodEnum
+from typing import List, Iterable, Iterator
 from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import logging
+import fitz
+from helpers.tokenizer import get_tokenizer
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -14,6 +23,24 @@ class Document:
     metadata: dict
 
 
+def extract_pdf_pages(file_path: str, start_page: int, end_page: int) -> List[Document]:
+    """Extract the text of pages [start_page, end_page), runs inside the process pool workers"""
+    with fitz.open(file_path) as pdf_document:
+        total_pages = pdf_document.page_count
+        return [
+            Document(
+                page_content=pdf_document[page_no].get_text(),
+                metadata={
+                    "source": file_path,
+                    "file_path": file_path,
+                    "page": page_no,
+                    "total_pages": total_pages,
+                }
+            )
+            for page_no in range(start_page, min(end_page, total_pages))
+        ]
+
+
 class ProcessController(BaseController):
 
     def __init__(self, project_id: str):
@@ -40,6 +67,10 @@ class ProcessController(BaseController):
         return None
 
     def get_file_content(self, file_id: str):
+        parallel_content = self.get_pdf_content_parallel(file_id=file_id)
+        if parallel_content is not None:
+            return list(parallel_content)
+
         file_loader = self.get_file_loader(file_id=file_id)
 
         if file_loader:
@@ -47,58 +78,250 @@ class ProcessController(BaseController):
 
         return None
 
-    def process_file_content(self, file_content: list, file_id: str,
-                             chunk_size: int = 100, overlap_size: int = 20):
+    def get_file_content_stream(self, file_id: str):
+        """Lazily yield the file pages one by one instead of loading them all"""
+        parallel_content = self.get_pdf_content_parallel(file_id=file_id)
+        if parallel_content is not None:
+            return parallel_content
 
-        file_content_texts = [
-            rec.page_content
-            for rec in file_content
+        file_loader = self.get_file_loader(file_id=file_id)
+
+        if file_loader:
+            return file_loader.lazy_load()
+
+        return None
+
+    def get_pdf_content_parallel(self, file_id: str):
+        """
+        Spread the page ranges of a PDF over a process pool and yield the pages in order.
+        Returns None when the parallel mode does not apply, so callers fall back to the loaders.
+        """
+        max_workers = self.app_settings.FILE_PDF_EXTRACTION_WORKERS
+        pages_per_task = max(self.app_settings.FILE_PDF_PAGES_PER_TASK, 1)
+
+        if not max_workers or max_workers <= 1:
+            return None
+
+        if self.get_file_extension(file_id=file_id) != ProcessingEnum.PDF.value:
+            return None
+
+        file_path = os.path.join(self.project_path, file_id)
+        if not os.path.exists(file_path):
+            return None
+
+        # daemonic processes (e.g. some worker pools) are not allowed to have children
+        if multiprocessing.current_process().daemon:
+            logger.warning("Parallel PDF extraction is not available in daemonic processes")
+            return None
+
+        with fitz.open(file_path) as pdf_document:
+            total_pages = pdf_document.page_count
+
+        if total_pages <= pages_per_task:
+            return None
+
+        return self._extract_pdf_pages_parallel(file_path=file_path, total_pages=total_pages,
+                                                max_workers=max_workers, pages_per_task=pages_per_task)
+
+    def _extract_pdf_pages_parallel(self, file_path: str, total_pages: int,
+                                    max_workers: int, pages_per_task: int) -> Iterator[Document]:
+
+        page_ranges = [
+            (start_page, start_page + pages_per_task)
+            for start_page in range(0, total_pages, pages_per_task)
         ]
 
-        file_content_metadata = [
-            rec.metadata
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(page_ranges))) as executor:
+            # bound the number of extracted ranges waiting to be consumed
+            pending = deque()
+            for start_page, end_page in page_ranges:
+                pending.append(executor.submit(extract_pdf_pages, file_path, start_page, end_page))
+
+                if len(pending) >= max_workers * 2:
+                    yield from pending.popleft().result()
+
+            while pending:
+                yield from pending.popleft().result()
+
+    def process_file_content(self, file_content: list, file_id: str,
+                             chunk_size: int = 100, overlap_size: int = 20,
+                             chunking_method: str = None):
+
+        return list(self.process_file_content_stream(
+            file_content=file_content,
+            file_id=file_id,
+            chunk_size=chunk_size,
+            overlap_size=overlap_size,
+            chunking_method=chunking_method
+        ))
+
+    def process_file_content_stream(self, file_content: Iterable, file_id: str,
+                                    chunk_size: int = 100, overlap_size: int = 20,
+                                    chunking_method: str = None) -> Iterator[Document]:
+        """Generator version of process_file_content, pages are consumed as they come"""
+
+        file_content_texts = (
+            rec.page_content
             for rec in file_content
-        ]
+        )
 
-        # chunks = text_splitter.create_documents(
-        #     file_content_texts,
-        #     metadatas=file_content_metadata
-        # )
+        if chunking_method == ChunkingMethodEnum.TOKEN.value:
+            yield from self.process_token_splitter_stream(
+                texts=file_content_texts,
+                chunk_size=chunk_size,
+                overlap_size=overlap_size,
+            )
+            return
 
-        chunks = self.process_simpler_splitter(
+        yield from self.process_simpler_splitter_stream(
             texts=file_content_texts,
-            metadata=file_content_metadata,
             chunk_size=chunk_size,
         )
 
-        return chunks
-
     def process_simpler_splitter(self, texts: List[str], metadata: List[dict], chunk_size: int, splitter_tag: str = "\n"):
 
-        full_text = " ".join(texts)
+        return list(self.process_simpler_splitter_stream(
+            texts=texts,
+            chunk_size=chunk_size,
+            splitter_tag=splitter_tag
+        ))
 
-        # split by splitter_tag
-        lines = [doc.strip() for doc in full_text.split(
-            splitter_tag) if len(doc.strip()) > 1]
+    def process_simpler_splitter_stream(self, texts: Iterable[str], chunk_size: int,
+                                        splitter_tag: str = "\n") -> Iterator[Document]:
+        """
+        Same output as joining all the texts with a space and splitting by splitter_tag,
+        but only the unfinished line of the previous page is kept in memory.
+        Each chunk metadata holds the (0-based) page it starts on.
+        """
 
-        chunks = []
+        pending_text = None
+        pending_page = 0
         current_chunk = ""
+        chunk_page = 0
+
+        for page_no, text in enumerate(texts):
+            # pages are joined with a space, the last line may continue on the next page
+            if pending_text is None:
+                pending_text, pending_page = text, page_no
+            else:
+                pending_text = f"{pending_text} {text}"
+            lines = pending_text.split(splitter_tag)
+            pending_text = lines.pop()
+
+            for line_no, line in enumerate(lines):
+                line = line.strip()
+                if len(line) <= 1:
+                    continue
+
+                if len(current_chunk) == 0:
+                    # only the first line can have started on an earlier page
+                    chunk_page = pending_page if line_no == 0 else page_no
 
-        for line in lines:
-            current_chunk += line + splitter_tag
-            if len(current_chunk) >= chunk_size:
-                chunks.append(Document(
-                    page_content=current_chunk.strip(),
-                    metadata={}
-                ))
+                current_chunk += line + splitter_tag
+                if len(current_chunk) >= chunk_size:
+                    yield Document(
+                        page_content=current_chunk.strip(),
+                        metadata={"page": chunk_page}
+                    )
+                    current_chunk = ""
 
+            if lines:
+                pending_page = page_no
+
+        if pending_text is not None and len(pending_text.strip()) > 1:
+            if len(current_chunk) == 0:
+                chunk_page = pending_page
+            current_chunk += pending_text.strip() + splitter_tag
 
-                current_chunk = ""
-    
         if len(current_chunk) > 0:
-            chunks.append(Document(
+            yield Document(
                 page_content=current_chunk.strip(),
-                metadata={}
-            ))
+                metadata={"page": chunk_page}
+            )
+
+    def process_token_splitter_stream(self, texts: Iterable[str], chunk_size: int,
+                                      overlap_size: int = 0) -> Iterator[Document]:
+        """
+        Pack the texts into chunks of chunk_size tokens, consecutive chunks share overlap_size tokens.
+        chunk_size is capped by the embedding model input limit and a chunk never exceeds
+        DEFAULT_INPUT_MAX_CHARACTERS, so the providers do not truncate what we pay to embed.
+        Each chunk metadata holds the (0-based) page of its first token.
+        """
+
+        tokenizer = get_tokenizer(self.app_settings.CHUNKING_TOKENIZER_ENCODING)
+
+        max_tokens = chunk_size
+        if self.app_settings.EMBEDDING_MODEL_MAX_INPUT_TOKENS:
+            max_tokens = min(max_tokens, self.app_settings.EMBEDDING_MODEL_MAX_INPUT_TOKENS)
+        max_tokens = max(max_tokens, 1)
+        overlap_size = max(0, min(overlap_size or 0, max_tokens - 1))
+        max_characters = self.app_settings.DEFAULT_INPUT_MAX_CHARACTERS
+
+        tokens = []
+        # page of each buffered token, aligned with tokens
+        token_pages = []
+        # number of tokens at the head of the buffer that were already emitted (the overlap)
+        emitted_tokens = 0
+
+        def is_character_boundary(index: int) -> bool:
+            # a token starting with a UTF-8 continuation byte continues the previous token character
+            return index <= 0 or index >= len(tokens) or \
+                not 0x80 <= tokenizer.decode_single_token_bytes(tokens[index])[0] <= 0xBF
+
+        def get_character_boundary(index: int, lowest: int) -> int:
+            """
+            The closest index above lowest that does not split a character, searched backward first.
+            A character spans a few tokens at most, the buffer always ends on a character boundary.
+            """
+            for boundary in range(index, lowest, -1):
+                if is_character_boundary(boundary):
+                    return boundary
+            boundary = index
+            while not is_character_boundary(boundary):
+                boundary += 1
+            return boundary
+
+        def pack(flush: bool):
+            nonlocal tokens, token_pages, emitted_tokens
+
+            while len(tokens) >= max_tokens or (flush and len(tokens) > emitted_tokens):
+                if len(tokens) < max_tokens and not tokenizer.decode(tokens[emitted_tokens:]).strip():
+                    # nothing new since the last chunk but its overlap (and whitespace)
+                    tokens, token_pages, emitted_tokens = [], [], 0
+                    break
+
+                window = tokens[:get_character_boundary(max_tokens, lowest=emitted_tokens)]
+                chunk_text = tokenizer.decode(window)
+
+                # shrink the window until it fits into the provider input limit
+                while max_characters and len(chunk_text) > max_characters and len(window) > overlap_size + 1:
+                    window_size = max(overlap_size + 1, len(window) * max_characters // len(chunk_text))
+                    window_size = get_character_boundary(window_size, lowest=emitted_tokens)
+                    if window_size >= len(window):
+                        break
+                    window = window[:window_size]
+                    chunk_text = tokenizer.decode(window)
+
+                if len(chunk_text.strip()) > 0:
+                    yield Document(
+                        page_content=chunk_text.strip(),
+                        metadata={"page": token_pages[0]}
+                    )
+
+                if flush and len(window) >= len(tokens):
+                    tokens, token_pages, emitted_tokens = [], [], 0
+                    break
+
+                # the overlap starts on a character boundary too
+                next_start = get_character_boundary(len(window) - overlap_size, lowest=0)
+                tokens = tokens[next_start:]
+                token_pages = token_pages[next_start:]
+                emitted_tokens = len(window) - next_start
+
+        for page_no, text in enumerate(texts):
+            text_tokens = tokenizer.encode(text + "\n", disallowed_special=())
+            tokens.extend(text_tokens)
+            token_pages.extend([page_no] * len(text_tokens))
+            yield from pack(flush=False)
 
-        return chunks
\ No newline at end of file
+        yield from pack(flush=True)
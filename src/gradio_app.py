@@ -5,6 +5,8 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import gradio as gr
 import aiofiles
+import asyncio
+import hashlib
 
 settings = None
 generation_client = None
@@ -56,7 +58,7 @@ async def initialize_services():
 
         db_session_factory = get_fresh_db_session()
 
-        llm_provider_factory = LLMProviderFactory(config=settings)
+        llm_provider_factory = LLMProviderFactory(config=settings, db_client=db_session_factory)
         vector_db_provider_factory = VectorDBProviderFactory(
             config=settings, db_client=db_session_factory
         )
@@ -77,6 +79,9 @@ async def initialize_services():
                 model_id=settings.EMBEDDING_MODEL_ID,
                 embedding_size=settings.EMBEDDING_MODEL_SIZE,
             )
+        embedding_client = llm_provider_factory.create_cached_embedding_client(
+            embedding_client=embedding_client, provider=settings.EMBEDDING_BACKEND
+        )
 
         vectordb_client = vector_db_provider_factory.create(
             provider=settings.VECTOR_DB_BACKEND
@@ -165,16 +170,26 @@ async def upload_file_async(file, project_id: int):
 
         async with aiofiles.open(file_path, "rb") as src:
             content = await src.read()
-        async with aiofiles.open(dest_path, "wb") as dst:
-            await dst.write(content)
 
         db_session = get_fresh_db_session()
         asset_model = await AssetModel.create_instance(db_client=db_session)
+
+        file_hash = hashlib.sha256(content).hexdigest()
+        asset_record = await asset_model.get_asset_by_hash(
+            asset_project_id=project_id, asset_hash=file_hash
+        )
+        if asset_record:
+            return f"✅ File already uploaded! Asset ID: {asset_record.asset_id}"
+
+        async with aiofiles.open(dest_path, "wb") as dst:
+            await dst.write(content)
+
         asset_resource = Asset(
             asset_project_id=project_id,
             asset_type=AssetTypeEnum.FILE.value,
             asset_name=file_id,
             asset_size=os.path.getsize(dest_path),
+            asset_hash=file_hash,
         )
         asset_record = await asset_model.create_asset(asset=asset_resource)
 
@@ -183,7 +198,8 @@ async def upload_file_async(file, project_id: int):
         return f"❌ Error: {str(e)}"
 
 
-async def process_and_index_async(project_id: int, chunk_size: int, overlap_size: int):
+async def process_and_index_async(project_id: int, chunk_size: int, overlap_size: int,
+                                  chunking_method: str = "simple"):
     if not _initialized:
         await initialize_services()
     if not _initialized:
@@ -222,13 +238,18 @@ async def process_and_index_async(project_id: int, chunk_size: int, overlap_size
 
         all_datachunks = []
         for asset in assets:
-            file_content = process_controller.get_file_content(file_id=asset.asset_name)
+            # parsing is CPU bound, keep it off the event loop
+            file_content = await asyncio.to_thread(
+                process_controller.get_file_content, file_id=asset.asset_name
+            )
             if file_content:
-                doc_chunks = process_controller.process_file_content(
+                doc_chunks = await asyncio.to_thread(
+                    process_controller.process_file_content,
                     file_content=file_content,
                     file_id=asset.asset_name,
                     chunk_size=chunk_size,
                     overlap_size=overlap_size,
+                    chunking_method=chunking_method,
                 )
                 if doc_chunks:
                     for i, doc in enumerate(doc_chunks):
@@ -244,10 +265,7 @@ async def process_and_index_async(project_id: int, chunk_size: int, overlap_size
         if not all_datachunks:
             return "⚠️ No content could be extracted from files."
 
-        saved_chunks = []
-        for chunk in all_datachunks:
-            saved_chunk = await chunk_model.create_chunk(chunk=chunk)
-            saved_chunks.append(saved_chunk)
+        chunk_ids = await chunk_model.bulk_insert_chunks(chunks=all_datachunks)
 
         nlp_controller = NLPController(
             generation_client=generation_client,
@@ -256,12 +274,17 @@ async def process_and_index_async(project_id: int, chunk_size: int, overlap_size
             template_parser=template_parser,
         )
 
-        chunk_ids = [c.chunk_id for c in saved_chunks]
-        await nlp_controller.index_into_vector_db(
-            project=project, chunks=saved_chunks, chunks_ids=chunk_ids, do_reset=True
+        is_inserted = await nlp_controller.index_into_vector_db(
+            project=project, chunks=all_datachunks, chunks_ids=chunk_ids, do_reset=True
         )
+        if not is_inserted:
+            return "❌ Error: failed to index the chunks into the vector db."
+
+        # the collection was reset, only these chunks are in it now
+        await chunk_model.reset_project_chunks_indexed(project_id=project_id)
+        await chunk_model.set_chunks_indexed(chunk_ids=chunk_ids)
 
-        return f"✅ Processed and indexed {len(saved_chunks)} chunks successfully!"
+        return f"✅ Processed and indexed {len(chunk_ids)} chunks successfully!"
     except Exception as e:
         return f"❌ Error: {str(e)}"
 
@@ -386,6 +409,9 @@ def create_gradio_interface():
                         overlap_input = gr.Number(
                             label="Overlap Size", value=10, precision=0
                         )
+                        chunking_method_input = gr.Dropdown(
+                            label="Chunking Method", choices=["simple", "token"], value="simple"
+                        )
                         process_btn = gr.Button("⚙️ Process & Index", variant="primary")
                         process_status = gr.Textbox(
                             label="Processing Status", interactive=False
@@ -399,7 +425,7 @@ def create_gradio_interface():
 
                 process_btn.click(
                     fn=process_and_index_async,
-                    inputs=[project_id_input, chunk_size_input, overlap_input],
+                    inputs=[project_id_input, chunk_size_input, overlap_input, chunking_method_input],
                     outputs=[process_status],
                 )
 
@@ -8,7 +8,15 @@ class Settings(BaseSettings):
     
     FILE_ALLOWED_TYPES: list
     FILE_MAX_SIZE: int
+    FILE_UPLOAD_SESSION_RETENTION: int = 86400
+    FILE_UPLOAD_FINALIZE_TIMEOUT: int = 600
+    FILE_UPLOAD_CONCURRENCY: int = 8
     FILE_DEFAULT_CHUNK_SIZE: int
+    FILE_PROCESSING_INSERT_BATCH_SIZE: int = 500
+    FILE_PROCESSING_QUEUE_SIZE: int = 4
+    FILE_PROCESSING_FAN_OUT_BATCH_SIZE: int = 1
+    FILE_PDF_EXTRACTION_WORKERS: int = 1
+    FILE_PDF_PAGES_PER_TASK: int = 16
 
     POSTGRES_USERNAME: str
     POSTGRES_PASSWORD: str
@@ -26,15 +34,59 @@ class Settings(BaseSettings):
     GENERATION_MODEL_ID: str = None
     EMBEDDING_MODEL_ID: str = None
     EMBEDDING_MODEL_SIZE: int = None
+    EMBEDDING_MODEL_MAX_INPUT_TOKENS: int = 512
+    CHUNKING_TOKENIZER_ENCODING: str = "cl100k_base"
+    EMBEDDING_MAX_CONCURRENCY: int = 4
+    OPENAI_EMBEDDING_BATCH_MAX_ITEMS: int = 2048
+    OPENAI_EMBEDDING_BATCH_MAX_TOKENS: int = 300000
+    COHERE_EMBEDDING_BATCH_MAX_ITEMS: int = 96
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MEMORY_MAX_MB: int = 64
+    EMBEDDING_CACHE_PERSISTENT: bool = True
+    EMBEDDING_CACHE_RETENTION: int = 2592000
+    EMBEDDING_QUERY_BATCH_ENABLED: bool = True
+    EMBEDDING_QUERY_BATCH_MAX_WAIT_MS: float = 5
+    EMBEDDING_QUERY_BATCH_MAX_SIZE: int = 64
     DEFAULT_INPUT_MAX_CHARACTERS: int = None
     GENERATION_DEFAULT_OUTPUT_MAX_TOKENS: int = None
     GENERATION_DEFAULT_MAX_TEMPERATURE: float = None
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_TIMEOUT: float = 60.0
+    LLM_RATE_LIMIT_STORE: str = "POSTGRES"
+    LLM_RATE_LIMIT_INTERACTIVE_RESERVE: float = 0.2
+    OPENAI_EMBEDDING_RATE_LIMIT_RPM: int = 0
+    OPENAI_EMBEDDING_RATE_LIMIT_TPM: int = 0
+    OPENAI_GENERATION_RATE_LIMIT_RPM: int = 0
+    OPENAI_GENERATION_RATE_LIMIT_TPM: int = 0
+    COHERE_EMBEDDING_RATE_LIMIT_RPM: int = 0
+    COHERE_EMBEDDING_RATE_LIMIT_TPM: int = 0
+    COHERE_GENERATION_RATE_LIMIT_RPM: int = 0
+    COHERE_GENERATION_RATE_LIMIT_TPM: int = 0
     
     VECTOR_DB_BACKEND_LITERAL: List[str] = None
     VECTOR_DB_BACKEND: str
     VECTOR_DB_PATH: str
     VECTOR_DB_DISTANCE_METHOD: str
     VECTOR_DB_PGVEC_INDEX_THRESHOLD: int = 100
+    VECTOR_DB_PGVEC_LAYOUT: str = "TABLE_PER_COLLECTION"
+    VECTOR_DB_PGVEC_SHARED_PARTITIONS: int = 16
+    VECTOR_DB_PGVEC_DEDICATED_PARTITION_ROWS: int = 100000
+    VECTOR_DB_PGVEC_BINARY_COPY: bool = True
+    VECTOR_DB_PGVEC_INDEX_TYPE: str = "hnsw"
+    VECTOR_DB_PGVEC_HNSW_M: int = 16
+    VECTOR_DB_PGVEC_HNSW_EF_CONSTRUCTION: int = 64
+    VECTOR_DB_PGVEC_IVFFLAT_LISTS: int = 0
+    VECTOR_DB_PGVEC_INDEX_MAINTENANCE_WORK_MEM: str = "512MB"
+    VECTOR_DB_PGVEC_INDEX_PARALLEL_WORKERS: int = 2
+    VECTOR_DB_PGVEC_ITERATIVE_SCAN: str = "relaxed_order"
+    VECTOR_DB_PGVEC_TEXT_SEARCH_CONFIG: str = "english"
+    VECTOR_DB_QDRANT_INDEXING_THRESHOLD: int = 20000
+    VECTOR_DB_COLLECTION_CACHE_TTL: int = 60
+    VECTOR_DB_HYBRID_CANDIDATES: int = 50
+    VECTOR_DB_HYBRID_RRF_K: int = 60
+    DATA_INDEXING_PAGE_SIZE: int = 50
+    DATA_INDEXING_MAX_IN_FLIGHT_PAGES: int = 4
     
     PRIMARY_LANG: str = "en"
     DEFAULT_LANG: str = "en"
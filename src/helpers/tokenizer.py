@@ -0,0 +1,7 @@
+from functools import lru_cache
+import tiktoken
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(encoding_name: str):
+    return tiktoken.get_encoding(encoding_name)
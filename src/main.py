@@ -31,7 +31,7 @@ async def lifespan(app: FastAPI):
     )
 
     # LLM and VectorDB factories
-    llm_provider_factory = LLMProviderFactory(config=settings)
+    llm_provider_factory = LLMProviderFactory(config=settings, db_client=app.db_client)
     vector_db_provider_factory = VectorDBProviderFactory(config=settings, db_client=app.db_client)
 
     app.generation_client = llm_provider_factory.create(
@@ -47,6 +47,10 @@ async def lifespan(app: FastAPI):
             model_id=settings.EMBEDDING_MODEL_ID,
             embedding_size=settings.EMBEDDING_MODEL_SIZE
         )
+    app.embedding_client = llm_provider_factory.create_cached_embedding_client(
+        embedding_client=app.embedding_client, provider=settings.EMBEDDING_BACKEND)
+    app.embedding_client = llm_provider_factory.create_batched_query_embedding_client(
+        embedding_client=app.embedding_client)
 
     app.vectordb_client = vector_db_provider_factory.create(
         provider=settings.VECTOR_DB_BACKEND,
@@ -64,6 +68,10 @@ async def lifespan(app: FastAPI):
     # cleanup
     await app.db_engine.dispose()
     await app.vectordb_client.disconnect()
+    if app.generation_client:
+        await app.generation_client.close()
+    if app.embedding_client:
+        await app.embedding_client.close()
 
 
 app = FastAPI(lifespan=lifespan)
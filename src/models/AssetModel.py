@@ -1,6 +1,7 @@
 from .BaseDataModel import BaseDataModel
 from .db_schemas import Asset
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 
 
 class AssetModel(BaseDataModel):
@@ -40,3 +41,51 @@ class AssetModel(BaseDataModel):
             result = await session.execute(query)
             record = result.scalar_one_or_none()
         return record
+
+    async def get_project_assets_by_names(self, asset_project_id: str, asset_names: list):
+        async with self.db_client() as session:
+            query = select(Asset).where(
+                Asset.asset_project_id == asset_project_id,
+                Asset.asset_name.in_(asset_names)
+            )
+            result = await session.execute(query)
+            records = result.scalars().all()
+        return records
+
+    async def get_asset_by_hash(self, asset_project_id: str, asset_hash: str):
+        async with self.db_client() as session:
+            query = select(Asset).where(
+                Asset.asset_project_id == asset_project_id,
+                Asset.asset_hash == asset_hash
+            )
+            result = await session.execute(query)
+            record = result.scalar_one_or_none()
+        return record
+
+    async def get_assets_by_hashes(self, asset_project_id: str, asset_hashes: list):
+        async with self.db_client() as session:
+            query = select(Asset).where(
+                Asset.asset_project_id == asset_project_id,
+                Asset.asset_hash.in_(asset_hashes)
+            )
+            result = await session.execute(query)
+            records = result.scalars().all()
+        return records
+
+    async def insert_many_assets(self, assets: list):
+        """
+        Insert the assets (dicts of Asset columns) with one multi-row statement.
+        Assets whose content already exists in the project are skipped.
+        Returns the (asset_id, asset_name, asset_hash) rows actually inserted.
+        """
+        if not assets:
+            return []
+
+        async with self.db_client() as session:
+            async with session.begin():
+                stmt = insert(Asset).values(assets).on_conflict_do_nothing(
+                    index_elements=[Asset.asset_project_id, Asset.asset_hash]
+                ).returning(Asset.asset_id, Asset.asset_name, Asset.asset_hash)
+                result = await session.execute(stmt)
+                records = result.all()
+        return records
@@ -1,7 +1,8 @@
 from .BaseDataModel import BaseDataModel
 from .db_schemas import DataChunk
 from bson.objectid import ObjectId
-from sqlalchemy import select, delete, func
+from sqlalchemy import select, delete, update, func, insert
+from typing import List, AsyncIterator
 
 class ChunkModel(BaseDataModel):
     def __init__(self, db_client: object):
@@ -26,14 +27,48 @@ class ChunkModel(BaseDataModel):
             chunk = result.scalar_one_or_none()
         return chunk
 
-    async def insert_many_chunks(self, chunks: list, batch_size: int = 100):
+    async def insert_many_chunks(self, chunks: list, batch_size: int = 1000):
+        chunks_ids = await self.bulk_insert_chunks(chunks=chunks, batch_size=batch_size)
+        return len(chunks_ids)
+
+    async def bulk_insert_chunks(self, chunks: list, batch_size: int = 1000) -> List[int]:
+        """
+        Insert the chunks with multi-row INSERT ... RETURNING statements, without
+        tracking them in the session identity map.
+        Args:
+            chunks: DataChunk objects or dicts of DataChunk columns
+            batch_size: Number of rows per INSERT statement
+        Returns:
+            List[int]: The generated chunk ids, in the same order as chunks
+        """
+        if not chunks:
+            return []
+
+        chunks_values = [
+            self.get_chunk_values(chunk) if isinstance(chunk, DataChunk) else chunk
+            for chunk in chunks
+        ]
+
+        chunks_ids = []
         async with self.db_client() as session:
             async with session.begin():
-                for i in range(0, len(chunks), batch_size):
-                    batch = chunks[i:i + batch_size]
-                    session.add_all(batch)
-            await session.commit()
-        return len(chunks)
+                for i in range(0, len(chunks_values), batch_size):
+                    result = await session.execute(
+                        insert(DataChunk).returning(DataChunk.chunk_id, sort_by_parameter_order=True),
+                        chunks_values[i:i + batch_size]
+                    )
+                    chunks_ids.extend(result.scalars().all())
+
+        return chunks_ids
+
+    def get_chunk_values(self, chunk: DataChunk) -> dict:
+        return {
+            "chunk_text": chunk.chunk_text,
+            "chunk_metadata": chunk.chunk_metadata,
+            "chunk_order": chunk.chunk_order,
+            "chunk_project_id": chunk.chunk_project_id,
+            "chunk_asset_id": chunk.chunk_asset_id,
+        }
 
     async def delete_chunks_by_project_id(self, project_id: ObjectId):
         async with self.db_client() as session:
@@ -43,21 +78,102 @@ class ChunkModel(BaseDataModel):
             await session.commit()
         return result.rowcount
 
+    async def delete_not_indexed_chunks_by_asset_ids(self, project_id: ObjectId, asset_ids: List[int]):
+        """Drop the chunks a failed processing attempt left behind, the indexed ones are kept"""
+        if not asset_ids:
+            return 0
+
+        async with self.db_client() as session:
+            stat = delete(DataChunk).where(
+                DataChunk.chunk_project_id == project_id,
+                DataChunk.chunk_asset_id.in_(asset_ids),
+                DataChunk.chunk_indexed_at.is_(None)
+            )
+            result = await session.execute(stat)
+            await session.commit()
+        return result.rowcount
+
     async def get_project_chunks(self, project_id: ObjectId, page_no: int = 1, page_size: int = 50):
 
         async with self.db_client() as session:
             stat = select(DataChunk).where(
-                DataChunk.chunk_project_id == project_id).offset((page_no - 1) * page_size).limit(page_size)
+                DataChunk.chunk_project_id == project_id).order_by(
+                DataChunk.chunk_id).offset((page_no - 1) * page_size).limit(page_size)
+            result = await session.execute(stat)
+            records = result.scalars().all()
+        return records
+
+    async def get_project_chunks_after(self, project_id: ObjectId, last_chunk_id: int = 0, page_size: int = 50,
+                                       only_not_indexed: bool = False):
+        """Keyset page: the next page_size chunks with chunk_id > last_chunk_id"""
+
+        async with self.db_client() as session:
+            stat = select(DataChunk).where(
+                DataChunk.chunk_project_id == project_id,
+                DataChunk.chunk_id > last_chunk_id
+            )
+            if only_not_indexed:
+                stat = stat.where(DataChunk.chunk_indexed_at.is_(None))
+            stat = stat.order_by(DataChunk.chunk_id).limit(page_size)
             result = await session.execute(stat)
             records = result.scalars().all()
         return records
 
-    async def get_total_chunks_count(self, project_id: ObjectId):
+    async def iterate_project_chunks(self, project_id: ObjectId, page_size: int = 50,
+                                     only_not_indexed: bool = False) -> AsyncIterator[list]:
+        """Walk all the project chunks page by page ordered by chunk_id, each page is an index range scan"""
+
+        last_chunk_id = 0
+        while True:
+            page_chunks = await self.get_project_chunks_after(
+                project_id=project_id,
+                last_chunk_id=last_chunk_id,
+                page_size=page_size,
+                only_not_indexed=only_not_indexed
+            )
+
+            if not page_chunks:
+                break
+
+            yield page_chunks
+
+            if len(page_chunks) < page_size:
+                break
+
+            last_chunk_id = page_chunks[-1].chunk_id
+
+    async def get_total_chunks_count(self, project_id: ObjectId, only_not_indexed: bool = False):
         total_count = 0
         async with self.db_client() as session:
             count_sql = select(func.count(DataChunk.chunk_id)).where(
                 DataChunk.chunk_project_id == project_id)
+            if only_not_indexed:
+                count_sql = count_sql.where(DataChunk.chunk_indexed_at.is_(None))
             records_count = await session.execute(count_sql)
             total_count = records_count.scalar()
             
-        return total_count
\ No newline at end of file
+        return total_count
+
+    async def set_chunks_indexed(self, chunk_ids: List[int]):
+        if not chunk_ids:
+            return 0
+
+        async with self.db_client() as session:
+            stat = update(DataChunk).where(
+                DataChunk.chunk_id.in_(chunk_ids)
+            ).values(chunk_indexed_at=func.now())
+            result = await session.execute(stat)
+            await session.commit()
+        return result.rowcount
+
+    async def reset_project_chunks_indexed(self, project_id: ObjectId):
+        """The project collection was (re)created, none of its chunks is indexed anymore"""
+
+        async with self.db_client() as session:
+            stat = update(DataChunk).where(
+                DataChunk.chunk_project_id == project_id,
+                DataChunk.chunk_indexed_at.is_not(None)
+            ).values(chunk_indexed_at=None)
+            result = await session.execute(stat)
+            await session.commit()
+        return result.rowcount
@@ -0,0 +1,26 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemas import EmbeddingCacheEntry
+from sqlalchemy import delete
+from datetime import datetime, timezone, timedelta
+
+
+class EmbeddingCacheModel(BaseDataModel):
+
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.db_client = db_client
+
+    @classmethod
+    async def create_instance(cls, db_client: object):
+        return cls(db_client=db_client)
+
+    async def delete_unused_entries(self, time_retention: int = 2592000):
+        cutoff_time = datetime.now(timezone.utc) - timedelta(seconds=time_retention)
+
+        async with self.db_client() as session:
+            stmt = delete(EmbeddingCacheEntry).where(
+                EmbeddingCacheEntry.last_used_at < cutoff_time
+            )
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
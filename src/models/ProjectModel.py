@@ -33,6 +33,17 @@ class ProjectModel(BaseDataModel):
                     session.add(project)
                 return project
 
+    async def update_project_config(self, project_id: int, section: str, values: dict):
+        """Replace one section of the project config, the other sections are kept"""
+        async with self.db_client() as session:
+            async with session.begin():
+                project = await session.get(Project, project_id)
+                if project is None:
+                    return None
+                # reassign, in place changes of a JSONB dict are not tracked
+                project.project_config = {**(project.project_config or {}), section: values}
+        return project
+
     async def get_all_projects(self, page: int = 1, page_size: int = 10):
         async with self.db_client() as session:
             async with session.begin():
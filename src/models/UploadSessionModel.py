@@ -0,0 +1,150 @@
+from .BaseDataModel import BaseDataModel
+from .db_schemas import UploadSession
+from .enums.UploadSessionStatusEnum import UploadSessionStatusEnum
+from sqlalchemy import select, delete, func
+from datetime import datetime, timezone, timedelta
+
+
+class UploadSessionModel(BaseDataModel):
+
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.db_client = db_client
+
+    @classmethod
+    async def create_instance(cls, db_client: object):
+        return cls(db_client=db_client)
+
+    async def create_upload_session(self, upload_session: UploadSession):
+        async with self.db_client() as session:
+            async with session.begin():
+                session.add(upload_session)
+            await session.commit()
+            await session.refresh(upload_session)
+        return upload_session
+
+    async def get_upload_session(self, upload_project_id: int, upload_uuid: str):
+        async with self.db_client() as session:
+            query = select(UploadSession).where(
+                UploadSession.upload_project_id == upload_project_id,
+                UploadSession.upload_uuid == upload_uuid
+            )
+            result = await session.execute(query)
+            record = result.scalar_one_or_none()
+        return record
+
+    async def add_received_range(self, upload_id: int, start: int, end: int):
+        """
+        Merge the [start, end) byte range into the received ranges of the session.
+        The row is locked so concurrent range uploads do not lose each other updates,
+        a session that is no longer PENDING does not accept ranges.
+        """
+        async with self.db_client() as session:
+            async with session.begin():
+                query = select(UploadSession).where(
+                    UploadSession.upload_id == upload_id
+                ).with_for_update()
+                result = await session.execute(query)
+                upload_session = result.scalar_one_or_none()
+
+                if upload_session is None or \
+                        upload_session.upload_status != UploadSessionStatusEnum.PENDING.value:
+                    return None
+
+                upload_session.upload_received_ranges = self.merge_byte_ranges(
+                    ranges=upload_session.upload_received_ranges or [],
+                    start=start,
+                    end=end
+                )
+        return upload_session
+
+    async def start_upload_session_finalizing(self, upload_id: int, finalize_timeout: int = 600):
+        """
+        Move a PENDING session to FINALIZING under a row lock, so only one finalize
+        request hashes and stores the file. A session FINALIZING for more than finalize_timeout
+        seconds lost its worker and is claimed again. Returns (upload_session, is_claimed).
+        """
+        cutoff_time = datetime.now(timezone.utc) - timedelta(seconds=finalize_timeout)
+
+        async with self.db_client() as session:
+            async with session.begin():
+                query = select(UploadSession).where(
+                    UploadSession.upload_id == upload_id
+                ).with_for_update()
+                result = await session.execute(query)
+                upload_session = result.scalar_one_or_none()
+
+                if upload_session is None:
+                    return None, False
+
+                is_abandoned = upload_session.upload_status == UploadSessionStatusEnum.FINALIZING.value and \
+                    (upload_session.updated_at or upload_session.created_at) < cutoff_time
+
+                if upload_session.upload_status != UploadSessionStatusEnum.PENDING.value and not is_abandoned:
+                    return upload_session, False
+
+                upload_session.upload_status = UploadSessionStatusEnum.FINALIZING.value
+                # refreshes updated_at when the session was already FINALIZING
+                upload_session.updated_at = func.now()
+        return upload_session, True
+
+    async def set_upload_session_status(self, upload_id: int, upload_status: str):
+        async with self.db_client() as session:
+            async with session.begin():
+                upload_session = await session.get(UploadSession, upload_id)
+                if upload_session:
+                    upload_session.upload_status = upload_status
+        return upload_session
+
+    async def set_upload_session_completed(self, upload_id: int, asset_id: int):
+        async with self.db_client() as session:
+            async with session.begin():
+                upload_session = await session.get(UploadSession, upload_id)
+                if upload_session:
+                    upload_session.upload_status = UploadSessionStatusEnum.COMPLETED.value
+                    upload_session.upload_asset_id = asset_id
+        return upload_session
+
+    async def get_stale_upload_sessions(self, time_retention: int = 86400):
+        cutoff_time = datetime.now(timezone.utc) - timedelta(seconds=time_retention)
+
+        async with self.db_client() as session:
+            query = select(UploadSession).where(
+                # a FINALIZING session this old lost its worker and was never retried
+                UploadSession.upload_status.in_([UploadSessionStatusEnum.PENDING.value,
+                                                 UploadSessionStatusEnum.FINALIZING.value]),
+                # a session still receiving ranges is not stale
+                func.coalesce(UploadSession.updated_at, UploadSession.created_at) < cutoff_time
+            )
+            result = await session.execute(query)
+            records = result.scalars().all()
+        return records
+
+    async def delete_upload_sessions(self, upload_ids: list):
+        async with self.db_client() as session:
+            stmt = delete(UploadSession).where(UploadSession.upload_id.in_(upload_ids))
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def merge_byte_ranges(ranges: list, start: int, end: int) -> list:
+        merged = []
+        for range_start, range_end in sorted(ranges + [[start, end]]):
+            if merged and range_start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], range_end)
+            else:
+                merged.append([range_start, range_end])
+        return merged
+
+    @staticmethod
+    def get_missing_byte_ranges(ranges: list, size: int) -> list:
+        missing = []
+        position = 0
+        for range_start, range_end in sorted(ranges):
+            if range_start > position:
+                missing.append([position, range_start])
+            position = max(position, range_end)
+        if position < size:
+            missing.append([position, size])
+        return missing
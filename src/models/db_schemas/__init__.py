@@ -1 +1,2 @@
-from models.db_schemas.minirag.schemas import Project, DataChunk, Asset, RetrievedDocument
\ No newline at end of file
+from models.db_schemas.minirag.schemas import Project, DataChunk, Asset, RetrievedDocument, UploadSession, \
+    EmbeddingCacheEntry
@@ -2,4 +2,7 @@ from .minirag_base import SQLAlchemyBase
 from .asset import Asset
 from .project import Project
 from .datachunk import DataChunk, RetrievedDocument
-from .celery_task_execution import CeleryTaskExecution
\ No newline at end of file
+from .celery_task_execution import CeleryTaskExecution
+from .upload_session import UploadSession
+from .embedding_cache import EmbeddingCacheEntry
+from .llm_rate_limit import LLMRateLimitBucket
@@ -19,6 +19,9 @@ class DataChunk(SQLAlchemyBase):
     
     chunk_project_id = Column(Integer, ForeignKey("projects.project_id"), nullable=False)
     chunk_asset_id = Column(Integer, ForeignKey("assets.asset_id"), nullable=False)
+
+    # set once the chunk is in the project vector db collection
+    chunk_indexed_at = Column(DateTime, nullable=True)
     
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
@@ -28,9 +31,15 @@ class DataChunk(SQLAlchemyBase):
     
     __table_args__ = (
         Index("ix_chunk_project_id ", chunk_project_id),
-        Index("ix_chunk_asset_id ", chunk_asset_id)
+        Index("ix_chunk_asset_id ", chunk_asset_id),
+        Index("ix_chunk_project_id_chunk_id", chunk_project_id, chunk_id),
+        Index("ix_chunk_project_id_chunk_id_not_indexed", chunk_project_id, chunk_id,
+              postgresql_where=chunk_indexed_at.is_(None))
     )
     
 class RetrievedDocument(BaseModel):
     text: str
-    score: float
\ No newline at end of file
+    # higher is better whatever the search, score_type tells its kind:
+    # "similarity" (vector search, 1 - cosine distance for PGVector) or "rrf" (hybrid search fused rank)
+    score: float
+    score_type: str = "similarity"
\ No newline at end of file
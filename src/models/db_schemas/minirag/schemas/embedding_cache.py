@@ -0,0 +1,22 @@
+from .minirag_base import SQLAlchemyBase
+from sqlalchemy import Column, String, DateTime, LargeBinary, func
+from sqlalchemy import Index
+
+
+class EmbeddingCacheEntry(SQLAlchemyBase):
+    __tablename__ = "embedding_cache"
+
+    # sha256 of (provider, model id, document type, text hash)
+    cache_key = Column(String(64), primary_key=True)
+
+    provider = Column(String(50), nullable=False)
+    model_id = Column(String(255), nullable=False)
+    document_type = Column(String(50), nullable=True)
+    embedding = Column(LargeBinary, nullable=False) # float32 buffer
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_embedding_cache_last_used_at", last_used_at),
+    )
@@ -0,0 +1,14 @@
+from .minirag_base import SQLAlchemyBase
+from sqlalchemy import Column, String, Float, DateTime, func
+
+
+class LLMRateLimitBucket(SQLAlchemyBase):
+    __tablename__ = "llm_rate_limits"
+
+    # e.g. OPENAI:embedding, shared by the API and the Celery workers
+    bucket_key = Column(String(100), primary_key=True)
+
+    available_requests = Column(Float, nullable=False)
+    available_tokens = Column(Float, nullable=False)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,6 +1,6 @@
 from .minirag_base import SQLAlchemyBase
 from sqlalchemy import Column, Integer, DateTime, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 import uuid
 class Project(SQLAlchemyBase):
@@ -9,6 +9,8 @@ class Project(SQLAlchemyBase):
  
     project_id = Column(Integer, primary_key=True, autoincrement=True)
     project_uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
+    # per project settings, e.g. {"search": {"ef_search": 40, "probes": 10, "exact": 0}}
+    project_config = Column(JSONB, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
 
@@ -0,0 +1,29 @@
+from .minirag_base import SQLAlchemyBase
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, func, ForeignKey
+from sqlalchemy import Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+import uuid
+
+
+class UploadSession(SQLAlchemyBase):
+    __tablename__ = "upload_sessions"
+
+    upload_id = Column(Integer, primary_key=True, autoincrement=True)
+    upload_uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
+
+    upload_file_name = Column(String, nullable=False) # generated file id on disk
+    upload_content_type = Column(String, nullable=False)
+    upload_size = Column(BigInteger, nullable=False)
+    upload_received_ranges = Column(JSONB, nullable=False, default=[]) # merged [start, end) byte ranges
+    upload_status = Column(String(20), nullable=False) # UploadSessionStatusEnum
+
+    upload_project_id = Column(Integer, ForeignKey("projects.project_id"), nullable=False)
+    upload_asset_id = Column(Integer, ForeignKey("assets.asset_id"), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+
+    __table_args__ = (
+        Index("ix_upload_session_project_id", upload_project_id),
+        Index("ix_upload_session_status_created_at", upload_status, created_at),
+    )
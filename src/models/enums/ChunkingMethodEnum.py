@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class ChunkingMethodEnum(Enum):
+    SIMPLE = "simple"
+    TOKEN = "token"
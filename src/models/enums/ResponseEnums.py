@@ -7,8 +7,17 @@ class ResponseSignal(Enum):
     FILE_SIZE_EXCEEDED = "file_size_exceeded"
     FILE_UPLOAD_SUCCESS = "file_upload_success"
     FILE_UPLOAD_FAILED = "file_upload_failed"
+    FILE_ALREADY_UPLOADED = "file_already_uploaded"
+    UPLOAD_SESSION_CREATED = "upload_session_created"
+    UPLOAD_SESSION_NOT_FOUND = "upload_session_not_found"
+    UPLOAD_SESSION_RETRIEVED = "upload_session_retrieved"
+    UPLOAD_SESSION_INCOMPLETE = "upload_session_incomplete"
+    UPLOAD_SESSION_FINALIZING = "upload_session_finalizing"
+    UPLOAD_RANGE_INVALID = "upload_range_invalid"
+    UPLOAD_RANGE_RECEIVED = "upload_range_received"
     FILE_PROCESSING_FAILED = "file_processing_failed"
     FILE_PROCESSING_SUCCESS = "file_processing_success"
+    FILE_PROCESSING_PARTIAL = "file_processing_partial"
     NO_FILES_FOUND = "no_files_found"
     FILE_ID_ERROR = "no_file_found_with_this_id"
     PROJECT_NOT_FOUND = "project_not_found"
@@ -17,7 +26,10 @@ class ResponseSignal(Enum):
     VECTORDB_COLLECTION_RETRIEVED = "vector_db_collection_retrieved"
     SEARCH_VECTORDB_COLLECTION_ERROR = "search_vector_db_collection_error"
     SEARCH_VECTORDB_COLLECTION_SUCCESS = "search_vector_db_collection_success"
+    SEARCH_CONFIG_UPDATED = "search_config_updated"
+    SEARCH_CONFIG_INVALID = "search_config_invalid"
     ANSWER_RAG_QUESTION_ERROR = "answer_rag_question_error"
     ANSWER_RAG_QUESTION_SUCCESS = "answer_rag_question_success"
     DATA_PUSH_TASK_READY = "data_push_task_ready"
-    PROCESS_AND_PUSH_WORKFLOW_READY = "process_and_push_workflow_ready"
\ No newline at end of file
+    PROCESS_AND_PUSH_WORKFLOW_READY = "process_and_push_workflow_ready"
+    FILE_PROCESSING_FAN_OUT_READY = "file_processing_fan_out_ready"
\ No newline at end of file
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class UploadSessionStatusEnum(Enum):
+    PENDING = "PENDING"
+    FINALIZING = "FINALIZING"
+    COMPLETED = "COMPLETED"
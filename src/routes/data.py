@@ -2,17 +2,26 @@ from fastapi import APIRouter, Depends, UploadFile, status, Request
 from fastapi.responses import JSONResponse
 import os
 import aiofiles
+import asyncio
+import hashlib
 import logging
+from typing import List
+from sqlalchemy.exc import IntegrityError
+from uuid import UUID
 from helpers.config import get_settings, Settings
 from controllers import DataController, ProcessController, ProjectController, NLPController
 from models import ResponseSignal
-from .schemas import ProcessRequest
+from .schemas import ProcessRequest, UploadSessionRequest
 from models.ProjectModel import ProjectModel
 from models.ChunkModel import ChunkModel
 from models.AssetModel import AssetModel
-from models.db_schemas import DataChunk, Asset
+from models.UploadSessionModel import UploadSessionModel
+from models.db_schemas import DataChunk, Asset, UploadSession
 from models.enums.AssetTypeEnum import AssetTypeEnum
-from tasks.file_processing import process_project_files
+from models.enums.ChunkingMethodEnum import ChunkingMethodEnum
+from models.enums.UploadSessionStatusEnum import UploadSessionStatusEnum
+from tasks.file_processing import (process_project_files, fan_out_project_files,
+                                   with_project_reset)
 from tasks.process_workflow import process_and_push_workflow
 
 logger = logging.getLogger("uvicorn.error")
@@ -52,9 +61,12 @@ async def upload_data(request: Request, project_id: int, file: UploadFile,
         project_id=project_id
     )
 
+    # hash the content while it streams to disk
+    file_hash = hashlib.sha256()
     try:
         async with aiofiles.open(file_path, "wb") as f:
             while chunk := await file.read(app_settings.FILE_DEFAULT_CHUNK_SIZE):
+                file_hash.update(chunk)
                 await f.write(chunk)
     except Exception as e:
 
@@ -72,17 +84,481 @@ async def upload_data(request: Request, project_id: int, file: UploadFile,
         db_client=request.app.db_client
     )
 
+    asset_record, is_duplicate = await store_file_asset(
+        asset_model=asset_model,
+        project_id=project.project_id,
+        file_id=file_id,
+        file_path=file_path,
+        file_hash=file_hash.hexdigest()
+    )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.FILE_ALREADY_UPLOADED.value if is_duplicate
+            else ResponseSignal.FILE_UPLOAD_SUCCESS.value,
+            "file_id": str(asset_record.asset_id),
+        }
+    )
+
+
+async def store_file_asset(asset_model: AssetModel, project_id: int, file_id: str,
+                           file_path: str, file_hash: str):
+    """
+    Create the asset of an uploaded file, unless the project already has the same content.
+    Returns (asset_record, is_duplicate), a duplicate file is removed from the disk
+    unless the existing asset is that same file (a retried finalize).
+    """
+
+    asset_record = await asset_model.get_asset_by_hash(
+        asset_project_id=project_id,
+        asset_hash=file_hash
+    )
+
+    if asset_record is not None:
+        if asset_record.asset_name == file_id:
+            return asset_record, False
+        # duplicate content, keep the existing asset and drop the new copy
+        os.remove(file_path)
+        return asset_record, True
+
     asset_resource = Asset(
-        asset_project_id=project.project_id,
+        asset_project_id=project_id,
         asset_type=AssetTypeEnum.FILE.value,
         asset_name=file_id,
-        asset_size=os.path.getsize(file_path)
+        asset_size=os.path.getsize(file_path),
+        asset_hash=file_hash
+    )
+
+    try:
+        asset_record = await asset_model.create_asset(asset=asset_resource)
+    except IntegrityError:
+        # the same content was uploaded concurrently
+        asset_record = await asset_model.get_asset_by_hash(
+            asset_project_id=project_id,
+            asset_hash=file_hash
+        )
+        if asset_record.asset_name == file_id:
+            return asset_record, False
+        os.remove(file_path)
+        return asset_record, True
+
+    return asset_record, False
+
+
+@data_router.post("/upload-batch/{project_id}")
+async def upload_data_batch(request: Request, project_id: int, files: List[UploadFile],
+                            do_process: int = 0, chunk_size: int = 100, overlap_size: int = 20,
+                            chunking_method: ChunkingMethodEnum = ChunkingMethodEnum.SIMPLE,
+                            app_settings: Settings = Depends(get_settings)):
+
+    project_model = await ProjectModel.create_instance(
+        db_client=request.app.db_client
+    )
+
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+
+    data_controller = DataController()
+    write_semaphore = asyncio.Semaphore(app_settings.FILE_UPLOAD_CONCURRENCY)
+
+    async def write_file(file: UploadFile):
+        is_valid, message = data_controller.validate_uploaded_file(file=file)
+        if not is_valid:
+            return {"file_name": file.filename, "signal": message}
+
+        async with write_semaphore:
+            file_path, file_id = data_controller.generate_unique_filepath(
+                orig_filename=file.filename,
+                project_id=project_id
+            )
+
+            file_hash = hashlib.sha256()
+            try:
+                async with aiofiles.open(file_path, "wb") as f:
+                    while chunk := await file.read(app_settings.FILE_DEFAULT_CHUNK_SIZE):
+                        file_hash.update(chunk)
+                        await f.write(chunk)
+            except Exception as e:
+                logger.error(f"Failed to upload file: {e}")
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                return {"file_name": file.filename, "signal": ResponseSignal.FILE_UPLOAD_FAILED.value}
+
+        return {
+            "file_name": file.filename,
+            "file_id": file_id,
+            "file_path": file_path,
+            "file_hash": file_hash.hexdigest(),
+        }
+
+    uploaded_files = await asyncio.gather(*[write_file(file) for file in files])
+    stored_files = [item for item in uploaded_files if "file_hash" in item]
+
+    asset_model = await AssetModel.create_instance(
+        db_client=request.app.db_client
+    )
+
+    # one bulk insert for the whole batch, contents already in the project are skipped
+    new_assets = {}
+    for item in stored_files:
+        new_assets.setdefault(item["file_hash"], {
+            "asset_project_id": project.project_id,
+            "asset_type": AssetTypeEnum.FILE.value,
+            "asset_name": item["file_id"],
+            "asset_size": os.path.getsize(item["file_path"]),
+            "asset_hash": item["file_hash"],
+        })
+
+    existing_assets = await asset_model.get_assets_by_hashes(
+        asset_project_id=project.project_id,
+        asset_hashes=list(new_assets.keys())
+    )
+    assets_ids = {record.asset_hash: record.asset_id for record in existing_assets}
+
+    inserted_assets = await asset_model.insert_many_assets(
+        assets=[asset for asset_hash, asset in new_assets.items() if asset_hash not in assets_ids]
+    )
+    inserted_names = {record.asset_name for record in inserted_assets}
+    assets_ids.update({record.asset_hash: record.asset_id for record in inserted_assets})
+
+    # a conflicting concurrent upload may have inserted some of the hashes meanwhile
+    missing_hashes = [asset_hash for asset_hash in new_assets if asset_hash not in assets_ids]
+    if len(missing_hashes):
+        existing_assets = await asset_model.get_assets_by_hashes(
+            asset_project_id=project.project_id,
+            asset_hashes=missing_hashes
+        )
+        assets_ids.update({record.asset_hash: record.asset_id for record in existing_assets})
+
+    files_results = []
+    for item in uploaded_files:
+        if "file_hash" not in item:
+            files_results.append(item)
+            continue
+
+        if item["file_id"] in inserted_names:
+            signal = ResponseSignal.FILE_UPLOAD_SUCCESS.value
+        else:
+            # duplicate content, keep the existing asset and drop the new copy
+            os.remove(item["file_path"])
+            signal = ResponseSignal.FILE_ALREADY_UPLOADED.value
+
+        files_results.append({
+            "file_name": item["file_name"],
+            "signal": signal,
+            "file_id": str(assets_ids.get(item["file_hash"])),
+        })
+
+    response = {
+        "signal": ResponseSignal.FILE_UPLOAD_SUCCESS.value,
+        "files": files_results,
+    }
+
+    if do_process == 1 and len(inserted_names):
+        # a single processing task for the new files of the batch
+        task = process_project_files.delay(
+            project_id=project_id,
+            file_id=None,
+            chunk_size=chunk_size,
+            overlap_size=overlap_size,
+            do_reset=0,
+            chunking_method=chunking_method.value,
+            file_ids=sorted(inserted_names)
+        )
+        response["task_id"] = task.id
+
+    return JSONResponse(content=response)
+
+
+@data_router.post("/upload-session/{project_id}")
+async def create_upload_session(request: Request, project_id: int, session_request: UploadSessionRequest,
+                                app_settings: Settings = Depends(get_settings)):
+
+    project_model = await ProjectModel.create_instance(
+        db_client=request.app.db_client
+    )
+
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+
+    # validate the declared file properties before any byte is sent
+    data_controller = DataController()
+    is_valid, message = data_controller.validate_upload_session(
+        content_type=session_request.content_type,
+        file_size=session_request.file_size
+    )
+
+    if not is_valid:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "message": message
+            }
+        )
+
+    file_path, file_id = data_controller.generate_unique_filepath(
+        orig_filename=session_request.file_name,
+        project_id=project_id
+    )
+
+    # ranges can arrive in any order, reserve the (sparse) file upfront
+    async with aiofiles.open(file_path, "wb") as f:
+        await f.truncate(session_request.file_size)
+
+    upload_session_model = await UploadSessionModel.create_instance(
+        db_client=request.app.db_client
+    )
+
+    upload_session = await upload_session_model.create_upload_session(
+        upload_session=UploadSession(
+            upload_project_id=project.project_id,
+            upload_file_name=file_id,
+            upload_content_type=session_request.content_type,
+            upload_size=session_request.file_size,
+            upload_received_ranges=[],
+            upload_status=UploadSessionStatusEnum.PENDING.value
+        )
     )
-    asset_record = await asset_model.create_asset(asset=asset_resource)
 
     return JSONResponse(
         content={
-            "signal": ResponseSignal.FILE_UPLOAD_SUCCESS.value,
+            "signal": ResponseSignal.UPLOAD_SESSION_CREATED.value,
+            "upload_id": str(upload_session.upload_uuid),
+            "chunk_size": app_settings.FILE_DEFAULT_CHUNK_SIZE,
+        }
+    )
+
+
+@data_router.put("/upload-session/{project_id}/{upload_id}")
+async def upload_session_range(request: Request, project_id: int, upload_id: UUID):
+
+    upload_session_model = await UploadSessionModel.create_instance(
+        db_client=request.app.db_client
+    )
+
+    upload_session = await upload_session_model.get_upload_session(
+        upload_project_id=project_id,
+        upload_uuid=upload_id
+    )
+
+    if upload_session is None or \
+            upload_session.upload_status != UploadSessionStatusEnum.PENDING.value:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signal": ResponseSignal.UPLOAD_SESSION_NOT_FOUND.value,
+            }
+        )
+
+    data_controller = DataController()
+    byte_range = data_controller.parse_content_range(
+        content_range=request.headers.get("content-range"),
+        file_size=upload_session.upload_size
+    )
+
+    if byte_range is None:
+        return JSONResponse(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            content={
+                "signal": ResponseSignal.UPLOAD_RANGE_INVALID.value,
+            }
+        )
+
+    start, end = byte_range
+    file_path = os.path.join(
+        ProjectController().get_project_path(project_id=project_id),
+        upload_session.upload_file_name
+    )
+
+    # stream the body straight to its offset, nothing is spooled in memory
+    written_bytes = 0
+    try:
+        async with aiofiles.open(file_path, "r+b") as f:
+            await f.seek(start)
+            async for chunk in request.stream():
+                if written_bytes + len(chunk) > end - start:
+                    break
+                await f.write(chunk)
+                written_bytes += len(chunk)
+    except Exception as e:
+        logger.error(f"Failed to upload file range: {e}")
+
+    # an incomplete range is not recorded, the client has to send it again
+    if written_bytes != end - start:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.UPLOAD_RANGE_INVALID.value,
+                "received_bytes": written_bytes,
+            }
+        )
+
+    upload_session = await upload_session_model.add_received_range(
+        upload_id=upload_session.upload_id,
+        start=start,
+        end=end
+    )
+
+    # the session was finalized while the range was being written
+    if upload_session is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signal": ResponseSignal.UPLOAD_SESSION_NOT_FOUND.value,
+            }
+        )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.UPLOAD_RANGE_RECEIVED.value,
+            "received_ranges": upload_session.upload_received_ranges,
+            "missing_ranges": upload_session_model.get_missing_byte_ranges(
+                ranges=upload_session.upload_received_ranges,
+                size=upload_session.upload_size
+            ),
+        }
+    )
+
+
+@data_router.get("/upload-session/{project_id}/{upload_id}")
+async def get_upload_session(request: Request, project_id: int, upload_id: UUID):
+
+    upload_session_model = await UploadSessionModel.create_instance(
+        db_client=request.app.db_client
+    )
+
+    upload_session = await upload_session_model.get_upload_session(
+        upload_project_id=project_id,
+        upload_uuid=upload_id
+    )
+
+    if upload_session is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signal": ResponseSignal.UPLOAD_SESSION_NOT_FOUND.value,
+            }
+        )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.UPLOAD_SESSION_RETRIEVED.value,
+            "status": upload_session.upload_status,
+            "file_size": upload_session.upload_size,
+            "received_ranges": upload_session.upload_received_ranges,
+            "missing_ranges": upload_session_model.get_missing_byte_ranges(
+                ranges=upload_session.upload_received_ranges,
+                size=upload_session.upload_size
+            ),
+            "file_id": str(upload_session.upload_asset_id) if upload_session.upload_asset_id else None,
+        }
+    )
+
+
+@data_router.post("/upload-session/{project_id}/{upload_id}/finalize")
+async def finalize_upload_session(request: Request, project_id: int, upload_id: UUID,
+                                  app_settings: Settings = Depends(get_settings)):
+
+    upload_session_model = await UploadSessionModel.create_instance(
+        db_client=request.app.db_client
+    )
+
+    upload_session = await upload_session_model.get_upload_session(
+        upload_project_id=project_id,
+        upload_uuid=upload_id
+    )
+
+    if upload_session is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signal": ResponseSignal.UPLOAD_SESSION_NOT_FOUND.value,
+            }
+        )
+
+    # finalize is idempotent for clients retrying it
+    if upload_session.upload_status == UploadSessionStatusEnum.COMPLETED.value:
+        return JSONResponse(
+            content={
+                "signal": ResponseSignal.FILE_UPLOAD_SUCCESS.value,
+                "file_id": str(upload_session.upload_asset_id),
+            }
+        )
+
+    missing_ranges = upload_session_model.get_missing_byte_ranges(
+        ranges=upload_session.upload_received_ranges,
+        size=upload_session.upload_size
+    )
+
+    if len(missing_ranges):
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.UPLOAD_SESSION_INCOMPLETE.value,
+                "missing_ranges": missing_ranges,
+            }
+        )
+
+    # only one finalize request at a time hashes and stores the file
+    upload_session, is_claimed = await upload_session_model.start_upload_session_finalizing(
+        upload_id=upload_session.upload_id,
+        finalize_timeout=app_settings.FILE_UPLOAD_FINALIZE_TIMEOUT
+    )
+
+    if not is_claimed:
+        if upload_session is not None and \
+                upload_session.upload_status == UploadSessionStatusEnum.COMPLETED.value:
+            return JSONResponse(
+                content={
+                    "signal": ResponseSignal.FILE_UPLOAD_SUCCESS.value,
+                    "file_id": str(upload_session.upload_asset_id),
+                }
+            )
+
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={
+                "signal": ResponseSignal.UPLOAD_SESSION_FINALIZING.value,
+            }
+        )
+
+    file_path = os.path.join(
+        ProjectController().get_project_path(project_id=project_id),
+        upload_session.upload_file_name
+    )
+
+    try:
+        file_hash = hashlib.sha256()
+        async with aiofiles.open(file_path, "rb") as f:
+            while chunk := await f.read(app_settings.FILE_DEFAULT_CHUNK_SIZE):
+                file_hash.update(chunk)
+
+        asset_model = await AssetModel.create_instance(
+            db_client=request.app.db_client
+        )
+
+        asset_record, is_duplicate = await store_file_asset(
+            asset_model=asset_model,
+            project_id=upload_session.upload_project_id,
+            file_id=upload_session.upload_file_name,
+            file_path=file_path,
+            file_hash=file_hash.hexdigest()
+        )
+    except Exception:
+        # release the session so the client can retry the finalize
+        _ = await upload_session_model.set_upload_session_status(
+            upload_id=upload_session.upload_id,
+            upload_status=UploadSessionStatusEnum.PENDING.value
+        )
+        raise
+
+    _ = await upload_session_model.set_upload_session_completed(
+        upload_id=upload_session.upload_id,
+        asset_id=asset_record.asset_id
+    )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.FILE_ALREADY_UPLOADED.value if is_duplicate
+            else ResponseSignal.FILE_UPLOAD_SUCCESS.value,
             "file_id": str(asset_record.asset_id),
         }
     )
@@ -95,12 +571,33 @@ async def process_endpoint(request: Request, project_id: int, process_request: P
     overlap_size = process_request.overlap_size
     do_reset = process_request.do_reset
 
+    if process_request.do_fan_out == 1 and not process_request.file_id:
+        task = with_project_reset(
+            fan_out_project_files.si(
+                project_id=project_id,
+                chunk_size=chunk_size,
+                overlap_size=overlap_size,
+                do_reset=do_reset,
+                chunking_method=process_request.chunking_method
+            ),
+            project_id=project_id,
+            do_reset=do_reset
+        ).apply_async()
+
+        return JSONResponse(
+            content={
+                "signal": ResponseSignal.FILE_PROCESSING_FAN_OUT_READY.value,
+                "task_id": task.id,
+            }
+        )
+
     task = process_project_files.delay(
         project_id=project_id,
         file_id=process_request.file_id,
         chunk_size=chunk_size,
         overlap_size=overlap_size,
-        do_reset=do_reset
+        do_reset=do_reset,
+        chunking_method=process_request.chunking_method
     )
 
     return JSONResponse(
@@ -118,13 +615,23 @@ async def process_and_push_endpoint(request: Request, project_id: int, process_r
     overlap_size = process_request.overlap_size
     do_reset = process_request.do_reset
     
-    workflow_task = process_and_push_workflow.delay(
+    workflow_signature = process_and_push_workflow.si(
         project_id=project_id,
         file_id=process_request.file_id,
         chunk_size=chunk_size,
         overlap_size=overlap_size,
-        do_reset=do_reset
+        do_reset=do_reset,
+        chunking_method=process_request.chunking_method,
+        do_fan_out=process_request.do_fan_out
     )
+
+    if process_request.do_fan_out == 1 and not process_request.file_id:
+        # the fanned out batches never reset, do it once before the workflow starts
+        workflow_signature = with_project_reset(workflow_signature,
+                                                project_id=project_id,
+                                                do_reset=do_reset)
+
+    workflow_task = workflow_signature.apply_async()
         
     return JSONResponse(
         content={
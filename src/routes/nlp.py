@@ -1,6 +1,6 @@
 from fastapi import FastAPI, APIRouter, Request, status
 from fastapi.responses import JSONResponse
-from routes.schemas.nlp import PushIndexRequest, SearchIndexRequest
+from routes.schemas.nlp import PushIndexRequest, SearchIndexRequest, SearchConfigRequest
 from models.ProjectModel import ProjectModel
 from models.ChunkModel import ChunkModel
 from models.enums.ResponseEnums import ResponseSignal
@@ -89,7 +89,9 @@ async def search_index(request: Request, project_id: int, search_request: Search
     search_results = await nlp_controller.search_vector_db_collection(
         project=project,
         query=search_request.query,
-        limit=search_request.limit
+        limit=search_request.limit,
+        search_params=get_request_search_params(search_request),
+        search_filter=get_request_search_filter(search_request)
     )
 
     if not search_results:
@@ -133,7 +135,9 @@ async def answer_rag(request: Request, project_id: int, search_request: SearchIn
     answer, full_prompt, chat_history = await nlp_controller.answer_rag_question(
         project=project,
         query=search_request.query,
-        limit=search_request.limit
+        limit=search_request.limit,
+        search_params=get_request_search_params(search_request),
+        search_filter=get_request_search_filter(search_request)
     )
 
     if not answer:
@@ -152,3 +156,63 @@ async def answer_rag(request: Request, project_id: int, search_request: SearchIn
             "chat_history": chat_history
         }
     )
+
+
+def get_request_search_params(search_request) -> dict:
+    return {
+        "ef_search": search_request.ef_search,
+        "probes": search_request.probes,
+        "exact": search_request.exact,
+        "hybrid": search_request.hybrid,
+    }
+
+
+def get_request_search_filter(search_request) -> dict:
+    if search_request.filter is None:
+        return None
+
+    search_filter = {
+        key: value
+        for key, value in search_request.filter.model_dump().items()
+        if value is not None
+    }
+    return search_filter or None
+
+
+@nlp_router.post("/index/search-config/{project_id}")
+async def set_search_config(request: Request, project_id: int, config_request: SearchConfigRequest):
+
+    search_params = get_request_search_params(config_request)
+    # hnsw.ef_search accepts 1..1000, ivfflat.probes at least 1
+    if (search_params["ef_search"] is not None and not 1 <= search_params["ef_search"] <= 1000) or \
+            (search_params["probes"] is not None and search_params["probes"] < 1):
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": ResponseSignal.SEARCH_CONFIG_INVALID.value}
+        )
+
+    project_model = await ProjectModel.create_instance(
+        db_client=request.app.db_client
+    )
+
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+
+    if not project:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"signal": ResponseSignal.PROJECT_NOT_FOUND.value}
+        )
+
+    project = await project_model.update_project_config(
+        project_id=project.project_id,
+        section="search",
+        values={key: value for key, value in search_params.items() if value is not None}
+    )
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signal": ResponseSignal.SEARCH_CONFIG_UPDATED.value,
+            "search_config": project.project_config["search"]
+        }
+    )
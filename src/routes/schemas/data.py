@@ -1,8 +1,22 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
+from models.enums.ChunkingMethodEnum import ChunkingMethodEnum
 
 class ProcessRequest(BaseModel):
+    # the enum fields hold their values, they are passed as is to the celery tasks,
+    # their defaults are validated too so they are converted as well
+    model_config = ConfigDict(use_enum_values=True)
+
     file_id: str = None
     chunk_size: Optional[int] = 100
     overlap_size: Optional[int] = 20
-    do_reset: Optional[int] = 0   
+    do_reset: Optional[int] = 0
+    # "simple": chunk_size in characters, "token": chunk_size/overlap_size in tokens
+    chunking_method: Optional[ChunkingMethodEnum] = Field(ChunkingMethodEnum.SIMPLE, validate_default=True)
+    # split a whole project processing into one celery subtask per files batch
+    do_fan_out: Optional[int] = 0
+
+class UploadSessionRequest(BaseModel):
+    file_name: str
+    file_size: int
+    content_type: str
@@ -1,9 +1,30 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 
 class PushIndexRequest(BaseModel):
     do_reset: Optional[int] = 0
 
+class SearchFilter(BaseModel):
+    asset_id: Optional[int] = None
+    asset_ids: Optional[List[int]] = None
+    # 0-based page the chunk starts on, both bounds inclusive
+    page_gte: Optional[int] = None
+    page_lte: Optional[int] = None
+
 class SearchIndexRequest(BaseModel):
     query: str
     limit: Optional[int] = 5
+    # pushed down to the vector db, only the matching chunks are searched
+    filter: Optional[SearchFilter] = None
+    # ANN tuning for this query only, unset fields use the project defaults
+    ef_search: Optional[int] = None
+    probes: Optional[int] = None
+    exact: Optional[int] = None
+    # fuse the vector and the keyword rankings
+    hybrid: Optional[int] = None
+
+class SearchConfigRequest(BaseModel):
+    ef_search: Optional[int] = None
+    probes: Optional[int] = None
+    exact: Optional[int] = None
+    hybrid: Optional[int] = None
@@ -24,4 +24,9 @@ class CohereEnums(Enum):
     
 class DocumentTypeEnums(Enum):
     DOCUMENT = "document"
-    QUERY = "query" 
+    QUERY = "query"
+
+
+class RateLimitStoreEnums(Enum):
+    POSTGRES = "POSTGRES"
+    MEMORY = "MEMORY"
@@ -1,10 +1,32 @@
-from .LLMEnums import LLMEnums
+from .LLMEnums import LLMEnums, RateLimitStoreEnums
 from .providers.OpenAIProvider import OpenAIProvider
 from .providers.CohereProvider import CohereProvider
+from .cache import EmbeddingMemoryCache, EmbeddingPostgresStore, CachedEmbeddingProvider
+from .batching import BatchedQueryEmbeddingProvider
+from .ratelimit import TokenBucketRateLimiter, MemoryRateLimitStore, PostgresRateLimitStore
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_embedding_memory_cache(max_size_bytes: int):
+    # one LRU per process, shared by every client created in it
+    return EmbeddingMemoryCache(max_size_bytes=max_size_bytes)
+
+
+@lru_cache(maxsize=None)
+def get_memory_rate_limit_store():
+    return MemoryRateLimitStore()
+
+
+@lru_cache(maxsize=None)
+def get_embedding_persistent_store(db_url: str):
+    return EmbeddingPostgresStore(db_url=db_url)
+
 
 class LLMProviderFactory:
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, db_client: object = None):
         self.config = config
+        self.db_client = db_client
         
     def create(self, provider: str):
         if provider == LLMEnums.OPENAI.value:
@@ -13,14 +35,99 @@ class LLMProviderFactory:
                 api_url=self.config.OPENAI_API_BASE,
                 default_input_max_characters=self.config.DEFAULT_INPUT_MAX_CHARACTERS,
                 default_generation_output_max_tokens=self.config.GENERATION_DEFAULT_OUTPUT_MAX_TOKENS,
-                default_generation_temperature=self.config.GENERATION_DEFAULT_MAX_TEMPERATURE
+                default_generation_temperature=self.config.GENERATION_DEFAULT_MAX_TEMPERATURE,
+                embedding_batch_max_items=self.config.OPENAI_EMBEDDING_BATCH_MAX_ITEMS,
+                embedding_batch_max_tokens=self.config.OPENAI_EMBEDDING_BATCH_MAX_TOKENS,
+                embedding_max_concurrency=self.config.EMBEDDING_MAX_CONCURRENCY,
+                tokenizer_encoding=self.config.CHUNKING_TOKENIZER_ENCODING,
+                http_max_connections=self.config.LLM_HTTP_MAX_CONNECTIONS,
+                http_max_keepalive_connections=self.config.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                http_timeout=self.config.LLM_HTTP_TIMEOUT,
+                embedding_rate_limiter=self.create_rate_limiter(
+                    bucket_key=f"{provider}:embedding",
+                    requests_per_minute=self.config.OPENAI_EMBEDDING_RATE_LIMIT_RPM,
+                    tokens_per_minute=self.config.OPENAI_EMBEDDING_RATE_LIMIT_TPM
+                ),
+                generation_rate_limiter=self.create_rate_limiter(
+                    bucket_key=f"{provider}:generation",
+                    requests_per_minute=self.config.OPENAI_GENERATION_RATE_LIMIT_RPM,
+                    tokens_per_minute=self.config.OPENAI_GENERATION_RATE_LIMIT_TPM
+                )
             )
         if provider == LLMEnums.COHERE.value:
             return CohereProvider(
                 api_key=self.config.COHERE_API_KEY,
                 default_input_max_characters=self.config.DEFAULT_INPUT_MAX_CHARACTERS,
                 default_generation_output_max_tokens=self.config.GENERATION_DEFAULT_OUTPUT_MAX_TOKENS,
-                default_generation_temperature=self.config.GENERATION_DEFAULT_MAX_TEMPERATURE
+                default_generation_temperature=self.config.GENERATION_DEFAULT_MAX_TEMPERATURE,
+                embedding_batch_max_items=self.config.COHERE_EMBEDDING_BATCH_MAX_ITEMS,
+                embedding_max_concurrency=self.config.EMBEDDING_MAX_CONCURRENCY,
+                tokenizer_encoding=self.config.CHUNKING_TOKENIZER_ENCODING,
+                http_max_connections=self.config.LLM_HTTP_MAX_CONNECTIONS,
+                http_max_keepalive_connections=self.config.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                http_timeout=self.config.LLM_HTTP_TIMEOUT,
+                embedding_rate_limiter=self.create_rate_limiter(
+                    bucket_key=f"{provider}:embedding",
+                    requests_per_minute=self.config.COHERE_EMBEDDING_RATE_LIMIT_RPM,
+                    tokens_per_minute=self.config.COHERE_EMBEDDING_RATE_LIMIT_TPM
+                ),
+                generation_rate_limiter=self.create_rate_limiter(
+                    bucket_key=f"{provider}:generation",
+                    requests_per_minute=self.config.COHERE_GENERATION_RATE_LIMIT_RPM,
+                    tokens_per_minute=self.config.COHERE_GENERATION_RATE_LIMIT_TPM
+                )
             )
         
-        return None
\ No newline at end of file
+        return None
+
+    def create_rate_limiter(self, bucket_key: str, requests_per_minute: int, tokens_per_minute: int):
+        if not requests_per_minute and not tokens_per_minute:
+            return None
+
+        memory_store = get_memory_rate_limit_store()
+        store = memory_store
+        if self.config.LLM_RATE_LIMIT_STORE == RateLimitStoreEnums.POSTGRES.value and self.db_client is not None:
+            store = PostgresRateLimitStore(db_client=self.db_client)
+
+        return TokenBucketRateLimiter(
+            bucket_key=bucket_key,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            store=store,
+            fallback_store=memory_store if store is not memory_store else None,
+            bulk_reserve_ratio=self.config.LLM_RATE_LIMIT_INTERACTIVE_RESERVE
+        )
+
+    def create_cached_embedding_client(self, embedding_client, provider: str):
+        if embedding_client is None or not self.config.EMBEDDING_CACHE_ENABLED:
+            return embedding_client
+
+        persistent_store = None
+        if self.config.EMBEDDING_CACHE_PERSISTENT:
+            db_url = "postgresql+psycopg2://{}:{}@{}:{}/{}".format(
+                self.config.POSTGRES_USERNAME,
+                self.config.POSTGRES_PASSWORD,
+                self.config.POSTGRES_HOST,
+                self.config.POSTGRES_PORT,
+                self.config.POSTGRES_MAIN_DATABASE,
+            )
+            persistent_store = get_embedding_persistent_store(db_url=db_url)
+
+        return CachedEmbeddingProvider(
+            provider=embedding_client,
+            provider_name=provider,
+            memory_cache=get_embedding_memory_cache(
+                max_size_bytes=self.config.EMBEDDING_CACHE_MEMORY_MAX_MB * 1048576
+            ),
+            persistent_store=persistent_store
+        )
+
+    def create_batched_query_embedding_client(self, embedding_client):
+        if embedding_client is None or not self.config.EMBEDDING_QUERY_BATCH_ENABLED:
+            return embedding_client
+
+        return BatchedQueryEmbeddingProvider(
+            provider=embedding_client,
+            max_wait_ms=self.config.EMBEDDING_QUERY_BATCH_MAX_WAIT_MS,
+            max_batch_size=self.config.EMBEDDING_QUERY_BATCH_MAX_SIZE
+        )
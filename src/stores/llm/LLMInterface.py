@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import List
 
 
 class LLMInterface(ABC):
@@ -12,14 +13,52 @@ class LLMInterface(ABC):
         pass
 
     @abstractmethod
-    def generate_text(self, prompt: str, chat_history: list = [], max_output_tokens: int = None,
+    async def generate_text(self, prompt: str, chat_history: list = [], max_output_tokens: int = None,
                       temperature: float = None):
         pass
 
     @abstractmethod
-    def embed_text(self, text: str, document_type: str = None):
+    async def embed_text(self, text: str, document_type: str = None):
         pass
 
     @abstractmethod
     def construct_prompt(self, prompt: str, role: str):
         pass
+
+    async def close(self):
+        pass
+
+    def count_tokens(self, texts: List[str]) -> int:
+        return sum(len(self.tokenizer.encode(text, disallowed_special=())) for text in texts)
+
+    async def wait_for_rate_limit(self, rate_limiter, texts: List[str], extra_tokens: int = 0,
+                                  interactive: bool = True):
+        if rate_limiter is None:
+            return
+        await rate_limiter.acquire(tokens=self.count_tokens(texts) + extra_tokens,
+                                   interactive=interactive)
+
+    def create_embedding_batches(self, texts: List[str], max_items: int,
+                                 max_tokens: int = None, tokenizer=None) -> List[List[str]]:
+        """
+        Split the texts into consecutive batches of at most max_items texts
+        and (when a tokenizer is given) at most max_tokens tokens.
+        """
+        batches = []
+        current_batch, current_tokens = [], 0
+
+        for text in texts:
+            text_tokens = len(tokenizer.encode(text, disallowed_special=())) if tokenizer and max_tokens else 0
+
+            if current_batch and (len(current_batch) >= max_items or
+                                  (max_tokens and current_tokens + text_tokens > max_tokens)):
+                batches.append(current_batch)
+                current_batch, current_tokens = [], 0
+
+            current_batch.append(text)
+            current_tokens += text_tokens
+
+        if current_batch:
+            batches.append(current_batch)
+
+        return batches
@@ -0,0 +1,111 @@
+from ..LLMInterface import LLMInterface
+from ..LLMEnums import DocumentTypeEnums
+from utils.metrics import EMBEDDING_QUERY_BATCH_SIZE, EMBEDDING_QUERY_BATCH_LATENCY
+from typing import List, Union
+import asyncio
+import logging
+import time
+
+
+class BatchedQueryEmbeddingProvider(LLMInterface):
+    """
+    Wraps an LLM provider, single query embeddings issued concurrently are collected
+    for up to max_wait_ms (or max_batch_size queries) and sent as one embed_text call.
+    Everything else is delegated to the provider.
+    """
+
+    def __init__(self, provider: LLMInterface, max_wait_ms: float = 5, max_batch_size: int = 64):
+        self.provider = provider
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_size = max(max_batch_size, 1)
+        self.logger = logging.getLogger(__name__)
+
+        self.pending = []
+        self.flush_handle = None
+        self.running_batches = set()
+
+    def __getattr__(self, name):
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    def set_generation_model(self, model_id: str):
+        return self.provider.set_generation_model(model_id=model_id)
+
+    def set_embedding_model(self, model_id: str, embedding_size: int):
+        return self.provider.set_embedding_model(model_id=model_id, embedding_size=embedding_size)
+
+    async def generate_text(self, prompt: str, chat_history: list = [], max_output_tokens: int = None,
+                            temperature: float = None):
+        return await self.provider.generate_text(prompt=prompt, chat_history=chat_history,
+                                                 max_output_tokens=max_output_tokens,
+                                                 temperature=temperature)
+
+    def construct_prompt(self, prompt: str, role: str):
+        return self.provider.construct_prompt(prompt=prompt, role=role)
+
+    async def close(self):
+        self.flush()
+        if self.running_batches:
+            await asyncio.gather(*self.running_batches, return_exceptions=True)
+        await self.provider.close()
+
+    async def embed_text(self, text: Union[str, List[str]], document_type: str = None):
+
+        if isinstance(text, list) and len(text) == 1:
+            text = text[0]
+
+        # documents are already batched by the indexing pipeline
+        if document_type != DocumentTypeEnums.QUERY.value or not isinstance(text, str):
+            return await self.provider.embed_text(text=text, document_type=document_type)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((text, future))
+
+        if len(self.pending) >= self.max_batch_size:
+            self.flush()
+        elif self.flush_handle is None:
+            self.flush_handle = loop.call_later(self.max_wait, self.flush)
+
+        vector = await future
+        if vector is None:
+            return None
+
+        return [vector]
+
+    def flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+
+        if not len(self.pending):
+            return
+
+        batch, self.pending = self.pending, []
+        # keep a reference so the running batch is not garbage collected
+        task = asyncio.ensure_future(self.embed_batch(batch))
+        self.running_batches.add(task)
+        task.add_done_callback(self.running_batches.discard)
+
+    async def embed_batch(self, batch: list):
+        texts = [text for text, _ in batch]
+        EMBEDDING_QUERY_BATCH_SIZE.observe(len(texts))
+
+        start_time = time.perf_counter()
+        try:
+            vectors = await self.provider.embed_text(
+                text=texts, document_type=DocumentTypeEnums.QUERY.value)
+        except Exception as e:
+            self.logger.error(f"Failed to embed a batch of {len(texts)} queries: {e}")
+            vectors = None
+        finally:
+            EMBEDDING_QUERY_BATCH_LATENCY.observe(time.perf_counter() - start_time)
+
+        if not vectors or len(vectors) != len(batch):
+            vectors = [None] * len(batch)
+
+        for (_, future), vector in zip(batch, vectors):
+            # a caller may have been cancelled while waiting (e.g. client disconnect)
+            if not future.done():
+                future.set_result(vector)
@@ -0,0 +1 @@
+from .BatchedQueryEmbeddingProvider import BatchedQueryEmbeddingProvider
@@ -0,0 +1,129 @@
+from ..LLMInterface import LLMInterface
+from .EmbeddingMemoryCache import EmbeddingMemoryCache
+from .EmbeddingPostgresStore import EmbeddingPostgresStore
+from utils.metrics import EMBEDDING_CACHE_REQUESTS
+from typing import List, Union
+import asyncio
+import hashlib
+import logging
+
+
+class CachedEmbeddingProvider(LLMInterface):
+    """
+    Wraps an LLM provider, embed_text goes through an in-process LRU then a persistent store,
+    only the misses are sent to the provider. Everything else is delegated to the provider.
+    """
+
+    def __init__(self, provider: LLMInterface, provider_name: str,
+                 memory_cache: EmbeddingMemoryCache,
+                 persistent_store: EmbeddingPostgresStore = None):
+        self.provider = provider
+        self.provider_name = provider_name
+        self.memory_cache = memory_cache
+        self.persistent_store = persistent_store
+        self.logger = logging.getLogger(__name__)
+
+        self.stats = {
+            "memory_hits": 0,
+            "persistent_hits": 0,
+            "misses": 0,
+        }
+
+    def __getattr__(self, name):
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    def set_generation_model(self, model_id: str):
+        return self.provider.set_generation_model(model_id=model_id)
+
+    def set_embedding_model(self, model_id: str, embedding_size: int):
+        return self.provider.set_embedding_model(model_id=model_id, embedding_size=embedding_size)
+
+    async def generate_text(self, prompt: str, chat_history: list = [], max_output_tokens: int = None,
+                            temperature: float = None):
+        return await self.provider.generate_text(prompt=prompt, chat_history=chat_history,
+                                                 max_output_tokens=max_output_tokens,
+                                                 temperature=temperature)
+
+    def construct_prompt(self, prompt: str, role: str):
+        return self.provider.construct_prompt(prompt=prompt, role=role)
+
+    async def close(self):
+        await self.provider.close()
+
+    def create_cache_key(self, text: str, document_type: str = None) -> str:
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        key_data = "|".join([
+            self.provider_name,
+            str(self.provider.embedding_model_id),
+            str(document_type),
+            text_hash
+        ])
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+    async def embed_text(self, text: Union[str, List[str]], document_type: str = None):
+
+        if isinstance(text, str):
+            text = [text]
+
+        keys = [self.create_cache_key(t, document_type) for t in text]
+        vectors = {}
+
+        # tier 1: in-process LRU
+        for key in set(keys):
+            vector = self.memory_cache.get(key)
+            if vector is not None:
+                vectors[key] = vector
+        self.record_lookups("memory", hits=len(vectors), total=len(set(keys)))
+
+        # tier 2: persistent store, its driver is blocking so it runs off the event loop
+        missing_keys = [key for key in set(keys) if key not in vectors]
+        if self.persistent_store and len(missing_keys):
+            stored_vectors = await asyncio.to_thread(self.persistent_store.get_many, missing_keys)
+            for key, vector in stored_vectors.items():
+                self.memory_cache.set(key, vector)
+            vectors.update(stored_vectors)
+            self.record_lookups("persistent", hits=len(stored_vectors), total=len(missing_keys))
+
+        # provider: each distinct missing text is embedded once
+        missing_texts = {}
+        for key, t in zip(keys, text):
+            if key not in vectors and key not in missing_texts:
+                missing_texts[key] = t
+
+        if len(missing_texts):
+            new_vectors = await self.provider.embed_text(
+                text=list(missing_texts.values()),
+                document_type=document_type
+            )
+
+            if not new_vectors or len(new_vectors) != len(missing_texts):
+                return None
+
+            new_entries = []
+            for key, vector in zip(missing_texts.keys(), new_vectors):
+                vectors[key] = vector
+                self.memory_cache.set(key, vector)
+                new_entries.append({
+                    "cache_key": key,
+                    "provider": self.provider_name,
+                    "model_id": str(self.provider.embedding_model_id),
+                    "document_type": document_type,
+                    "embedding": vector,
+                })
+
+            if self.persistent_store:
+                await asyncio.to_thread(self.persistent_store.set_many, new_entries)
+
+        self.stats["misses"] += len(missing_texts)
+
+        return [vectors[key] for key in keys]
+
+    def record_lookups(self, tier: str, hits: int, total: int):
+        self.stats[f"{tier}_hits"] += hits
+        EMBEDDING_CACHE_REQUESTS.labels(tier, "hit").inc(hits)
+        EMBEDDING_CACHE_REQUESTS.labels(tier, "miss").inc(total - hits)
+
+    def get_stats(self) -> dict:
+        return dict(self.stats)
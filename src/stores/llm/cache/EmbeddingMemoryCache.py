@@ -0,0 +1,47 @@
+from collections import OrderedDict
+from array import array
+from typing import List, Optional
+import threading
+
+
+class EmbeddingMemoryCache:
+    """In-process LRU of embeddings, evicted by their total size in bytes"""
+
+    def __init__(self, max_size_bytes: int):
+        self.max_size_bytes = max_size_bytes
+        self.size_bytes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_entry_size(self, key: str, vector: array) -> int:
+        # float32 buffer + rough key/object overhead
+        return vector.itemsize * len(vector) + len(key) + 128
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self.lock:
+            vector = self.entries.get(key)
+            if vector is None:
+                return None
+            self.entries.move_to_end(key)
+        return vector.tolist()
+
+    def set(self, key: str, vector: List[float]):
+        if self.max_size_bytes <= 0:
+            return
+
+        vector = array("f", vector)
+        entry_size = self.get_entry_size(key, vector)
+        if entry_size > self.max_size_bytes:
+            return
+
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size_bytes -= self.get_entry_size(key, previous)
+
+            self.entries[key] = vector
+            self.size_bytes += entry_size
+
+            while self.size_bytes > self.max_size_bytes:
+                evicted_key, evicted_vector = self.entries.popitem(last=False)
+                self.size_bytes -= self.get_entry_size(evicted_key, evicted_vector)
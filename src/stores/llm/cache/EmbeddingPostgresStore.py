@@ -0,0 +1,85 @@
+from models.db_schemas.minirag.schemas import EmbeddingCacheEntry
+from sqlalchemy import create_engine, select, update, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.dialects.postgresql import insert
+from array import array
+from datetime import datetime, timezone, timedelta
+from typing import List
+import logging
+
+
+class EmbeddingPostgresStore:
+    """
+    Persistent embeddings cache shared by the API and the Celery workers.
+    Hits refresh last_used_at at most once per touch interval, entries unused for
+    EMBEDDING_CACHE_RETENTION are removed by the prune_embedding_cache maintenance task.
+    """
+
+    def __init__(self, db_url: str, touch_interval: int = 86400):
+        self.db_engine = create_engine(db_url, pool_pre_ping=True)
+        self.db_client = sessionmaker(bind=self.db_engine)
+        self.touch_interval = touch_interval
+        self.logger = logging.getLogger(__name__)
+
+    def get_many(self, keys: List[str]) -> dict:
+        if not keys:
+            return {}
+
+        try:
+            with self.db_client() as session:
+                query = select(EmbeddingCacheEntry.cache_key, EmbeddingCacheEntry.embedding,
+                               EmbeddingCacheEntry.last_used_at).where(
+                    EmbeddingCacheEntry.cache_key.in_(keys)
+                )
+                records = session.execute(query).all()
+        except Exception as e:
+            # the cache must never break embedding, a failing store is a miss
+            self.logger.error(f"Failed to read the embeddings cache: {e}")
+            return {}
+
+        touch_before = datetime.now(timezone.utc) - timedelta(seconds=self.touch_interval)
+        self.touch_many([
+            record.cache_key for record in records
+            if record.last_used_at < touch_before
+        ])
+
+        return {
+            record.cache_key: array("f", bytes(record.embedding)).tolist()
+            for record in records
+        }
+
+    def set_many(self, entries: List[dict]):
+        """entries: dicts of cache_key, provider, model_id, document_type, embedding (list of floats)"""
+        if not entries:
+            return
+
+        values = [
+            {**entry, "embedding": array("f", entry["embedding"]).tobytes()}
+            for entry in entries
+        ]
+
+        try:
+            with self.db_client() as session:
+                with session.begin():
+                    session.execute(
+                        insert(EmbeddingCacheEntry).values(values).on_conflict_do_nothing(
+                            index_elements=[EmbeddingCacheEntry.cache_key]
+                        )
+                    )
+        except Exception as e:
+            self.logger.error(f"Failed to write the embeddings cache: {e}")
+
+    def touch_many(self, keys: List[str]):
+        if not keys:
+            return
+
+        try:
+            with self.db_client() as session:
+                with session.begin():
+                    session.execute(
+                        update(EmbeddingCacheEntry).where(
+                            EmbeddingCacheEntry.cache_key.in_(keys)
+                        ).values(last_used_at=func.now())
+                    )
+        except Exception as e:
+            self.logger.error(f"Failed to touch the embeddings cache: {e}")
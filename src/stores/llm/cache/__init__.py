@@ -0,0 +1,3 @@
+from .EmbeddingMemoryCache import EmbeddingMemoryCache
+from .EmbeddingPostgresStore import EmbeddingPostgresStore
+from .CachedEmbeddingProvider import CachedEmbeddingProvider
@@ -2,6 +2,9 @@ from cohere.types import embedding_type
 from ..LLMInterface import LLMInterface
 from ..LLMEnums import CohereEnums, DocumentTypeEnums
 import cohere
+from helpers.tokenizer import get_tokenizer
+import httpx
+import asyncio
 import logging
 from typing import List, Union
 
@@ -11,24 +14,62 @@ class CohereProvider(LLMInterface):
     def __init__(self, api_key: str,
                  default_input_max_characters: int = 1024,
                  default_generation_output_max_tokens: int = 1024,
-                 default_generation_temperature: float = 0.1):
+                 default_generation_temperature: float = 0.1,
+                 embedding_batch_max_items: int = 96,
+                 embedding_batch_max_tokens: int = None,
+                 embedding_max_concurrency: int = 4,
+                 tokenizer_encoding: str = "cl100k_base",
+                 http_max_connections: int = 100,
+                 http_max_keepalive_connections: int = 20,
+                 http_timeout: float = 60.0,
+                 embedding_rate_limiter=None,
+                 generation_rate_limiter=None):
         self.api_key = api_key
         self.default_input_max_characters = default_input_max_characters
         self.default_generation_output_max_tokens = default_generation_output_max_tokens
         self.default_generation_temperature = default_generation_temperature
 
+        self.embedding_batch_max_items = embedding_batch_max_items
+        self.embedding_batch_max_tokens = embedding_batch_max_tokens
+        self.embedding_max_concurrency = embedding_max_concurrency
+        # bounds the in flight batches of every embed_text call of this provider
+        self.embedding_semaphore = asyncio.Semaphore(max(embedding_max_concurrency, 1))
+        self.tokenizer_encoding = tokenizer_encoding
+        self._tokenizer = None
+
+        self.embedding_rate_limiter = embedding_rate_limiter
+        self.generation_rate_limiter = generation_rate_limiter
+
         self.generation_model_id = None
         self.embedding_model_id = None
         self.embedding_size = None
 
-        self.client = cohere.Client(
-            api_key=self.api_key
+        # one pooled HTTP client per provider, requests reuse its keep-alive connections
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=http_max_connections,
+                max_keepalive_connections=http_max_keepalive_connections
+            ),
+            timeout=http_timeout
+        )
+
+        self.client = cohere.AsyncClient(
+            api_key=self.api_key,
+            timeout=http_timeout,
+            httpx_client=self.http_client
         )
 
         self.logger = logging.getLogger(__name__)
 
         self.enums = CohereEnums
 
+    @property
+    def tokenizer(self):
+        # loaded on the first embedding, generation only clients never need it
+        if self._tokenizer is None:
+            self._tokenizer = get_tokenizer(self.tokenizer_encoding)
+        return self._tokenizer
+
     def set_generation_model(self, model_id: str):
         self.generation_model_id = model_id
 
@@ -39,7 +80,7 @@ class CohereProvider(LLMInterface):
     def process_text(self, text: str):
         return text[:self.default_input_max_characters].strip()
 
-    def generate_text(self, prompt: str, chat_history: list = [], max_output_tokens: int = None,
+    async def generate_text(self, prompt: str, chat_history: list = [], max_output_tokens: int = None,
                       temperature: float = None):
 
         if not self.client:
@@ -57,7 +98,14 @@ class CohereProvider(LLMInterface):
             self.construct_prompt(prompt=prompt, role=CohereEnums.USER.value)
         )
 
-        response = self.client.chat(
+        # prompt tokens plus the completion budget, as counted by the provider limits
+        await self.wait_for_rate_limit(
+            rate_limiter=self.generation_rate_limiter,
+            texts=[str(message.get("content", "")) for message in chat_history],
+            extra_tokens=max_tokens
+        )
+
+        response = await self.client.chat(
             model=self.generation_model_id,
             chat_history=chat_history,
             message=self.process_text(prompt=prompt),
@@ -71,7 +119,7 @@ class CohereProvider(LLMInterface):
 
         return response.text
 
-    def embed_text(self, text: Union[str, List[str]], document_type: str = None):
+    async def embed_text(self, text: Union[str, List[str]], document_type: str = None):
 
         if not self.client:
             self.logger.error("Cohere client is not set")
@@ -88,9 +136,40 @@ class CohereProvider(LLMInterface):
         if document_type == DocumentTypeEnums.QUERY.value:
             input_type = CohereEnums.QUERY.value
 
-        response = self.client.embed(
-            model=self.embedding_model_id,
+        # respect the per request limits, then run the batches concurrently
+        batches = self.create_embedding_batches(
             texts=[self.process_text(t) for t in text],
+            max_items=self.embedding_batch_max_items,
+            max_tokens=self.embedding_batch_max_tokens,
+            tokenizer=self.tokenizer
+        )
+
+        # queries are waited on by a user, documents come from bulk indexing
+        interactive = document_type == DocumentTypeEnums.QUERY.value
+
+        async def embed_batch_limited(batch: List[str]):
+            async with self.embedding_semaphore:
+                return await self.embed_batch(batch, input_type, interactive=interactive)
+
+        batches_vectors = await asyncio.gather(*[embed_batch_limited(batch) for batch in batches])
+
+        if any(vectors is None for vectors in batches_vectors):
+            return None
+
+        # gather keeps the batches order, so the vectors follow the input order
+        return [vector for vectors in batches_vectors for vector in vectors]
+
+    async def embed_batch(self, texts: List[str], input_type: str, interactive: bool = True):
+
+        await self.wait_for_rate_limit(
+            rate_limiter=self.embedding_rate_limiter,
+            texts=texts,
+            interactive=interactive
+        )
+
+        response = await self.client.embed(
+            model=self.embedding_model_id,
+            texts=texts,
             input_type=input_type,
             embedding_types=['float']
         )
@@ -101,6 +180,9 @@ class CohereProvider(LLMInterface):
 
         return [f for f in response.embeddings.float]
 
+    async def close(self):
+        await self.http_client.aclose()
+
     def construct_prompt(self, prompt: str, role: str):
         return {
             "role": role,
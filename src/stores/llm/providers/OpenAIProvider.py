@@ -1,6 +1,9 @@
 from ..LLMInterface import LLMInterface
-from ..LLMEnums import OpenAIEnums
-from openai import OpenAI
+from ..LLMEnums import OpenAIEnums, DocumentTypeEnums
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from helpers.tokenizer import get_tokenizer
+import httpx
+import asyncio
 import logging
 from typing import List, Union
 
@@ -9,7 +12,16 @@ class OpenAIProvider(LLMInterface):
     def __init__(self, api_key: str, api_url: str = None,
                  default_input_max_characters: int = 1024,
                  default_generation_output_max_tokens: int = 1024,
-                 default_generation_temperature: float = 0.1):
+                 default_generation_temperature: float = 0.1,
+                 embedding_batch_max_items: int = 2048,
+                 embedding_batch_max_tokens: int = 300000,
+                 embedding_max_concurrency: int = 4,
+                 tokenizer_encoding: str = "cl100k_base",
+                 http_max_connections: int = 100,
+                 http_max_keepalive_connections: int = 20,
+                 http_timeout: float = 60.0,
+                 embedding_rate_limiter=None,
+                 generation_rate_limiter=None):
 
         self.api_key = api_key
         self.api_url = api_url
@@ -18,20 +30,45 @@ class OpenAIProvider(LLMInterface):
         self.default_generation_output_max_tokens = default_generation_output_max_tokens
         self.default_generation_temperature = default_generation_temperature
 
+        self.embedding_batch_max_items = embedding_batch_max_items
+        self.embedding_batch_max_tokens = embedding_batch_max_tokens
+        self.embedding_max_concurrency = embedding_max_concurrency
+        # bounds the in flight batches of every embed_text call of this provider
+        self.embedding_semaphore = asyncio.Semaphore(max(embedding_max_concurrency, 1))
+        self.tokenizer_encoding = tokenizer_encoding
+        self._tokenizer = None
+
+        self.embedding_rate_limiter = embedding_rate_limiter
+        self.generation_rate_limiter = generation_rate_limiter
+
         self.generation_model_id = None
         self.embedding_model_id = None
         self.embedding_size = None
         
         self.enums = OpenAIEnums
 
-        self.client = OpenAI(
+        # one pooled HTTP client per provider, requests reuse its keep-alive connections
+        self.client = AsyncOpenAI(
             api_key=self.api_key,
-            base_url=self.api_url if self.api_url and len(self.api_url) else None
-
+            base_url=self.api_url if self.api_url and len(self.api_url) else None,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=http_max_connections,
+                    max_keepalive_connections=http_max_keepalive_connections
+                ),
+                timeout=http_timeout
+            )
         )
 
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def tokenizer(self):
+        # loaded on the first embedding, generation only clients never need it
+        if self._tokenizer is None:
+            self._tokenizer = get_tokenizer(self.tokenizer_encoding)
+        return self._tokenizer
+
     def set_generation_model(self, model_id: str):
         self.generation_model_id = model_id
 
@@ -42,7 +79,7 @@ class OpenAIProvider(LLMInterface):
     def process_text(self, text: str):
         return text[:self.default_input_max_characters].strip()
 
-    def generate_text(self, prompt: str, chat_history: list = [], max_output_tokens: int = None,
+    async def generate_text(self, prompt: str, chat_history: list = [], max_output_tokens: int = None,
                       temperature: float = None):
 
         if not self.client:
@@ -60,7 +97,14 @@ class OpenAIProvider(LLMInterface):
             self.construct_prompt(prompt=prompt, role=OpenAIEnums.USER.value)
         )
 
-        response = self.client.chat.completions.create(
+        # prompt tokens plus the completion budget, as counted by the provider limits
+        await self.wait_for_rate_limit(
+            rate_limiter=self.generation_rate_limiter,
+            texts=[str(message.get("content", "")) for message in chat_history],
+            extra_tokens=max_tokens
+        )
+
+        response = await self.client.chat.completions.create(
             model=self.generation_model_id,
             messages=chat_history,
             max_tokens=max_tokens,
@@ -73,7 +117,7 @@ class OpenAIProvider(LLMInterface):
 
         return response.choices[0].message.content
 
-    def embed_text(self, text: Union[str, List[str]], document_type: str = None):
+    async def embed_text(self, text: Union[str, List[str]], document_type: str = None):
 
         if not self.client:
             self.logger.error("OpenAI client is not set")
@@ -85,18 +129,51 @@ class OpenAIProvider(LLMInterface):
 
         if isinstance(text, str):
             text = [text]
-        
-        response = self.client.embeddings.create(
-            model=self.embedding_model_id,
-            input=text,
 
+        # respect the per request limits, then run the batches concurrently
+        batches = self.create_embedding_batches(
+            texts=text,
+            max_items=self.embedding_batch_max_items,
+            max_tokens=self.embedding_batch_max_tokens,
+            tokenizer=self.tokenizer
+        )
+
+        # queries are waited on by a user, documents come from bulk indexing
+        interactive = document_type == DocumentTypeEnums.QUERY.value
+
+        async def embed_batch_limited(batch: List[str]):
+            async with self.embedding_semaphore:
+                return await self.embed_batch(batch, interactive=interactive)
+
+        batches_vectors = await asyncio.gather(*[embed_batch_limited(batch) for batch in batches])
+
+        if any(vectors is None for vectors in batches_vectors):
+            return None
+
+        # gather keeps the batches order, so the vectors follow the input order
+        return [vector for vectors in batches_vectors for vector in vectors]
+
+    async def embed_batch(self, texts: List[str], interactive: bool = True):
+
+        await self.wait_for_rate_limit(
+            rate_limiter=self.embedding_rate_limiter,
+            texts=texts,
+            interactive=interactive
+        )
+
+        response = await self.client.embeddings.create(
+            model=self.embedding_model_id,
+            input=texts,
         )
 
         if not response or not response.data or len(response.data) == 0 or not response.data[0].embedding:
             self.logger.error("Failed to embed text with OpenAI")
             return None
 
-        return [record.embedding for record in response.data]
+        return [record.embedding for record in sorted(response.data, key=lambda record: record.index)]
+
+    async def close(self):
+        await self.client.close()
 
     def construct_prompt(self, prompt: str, role: str):
         return {
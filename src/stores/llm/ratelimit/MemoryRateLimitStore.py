@@ -0,0 +1,34 @@
+from .TokenBucketRateLimiter import take_from_bucket
+import threading
+import time
+
+
+class MemoryRateLimitStore:
+    """In-process token buckets, used when no shared store is available"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    async def acquire(self, bucket_key: str, requests_per_minute: int, tokens_per_minute: int,
+                      requests: int, tokens: int, reserve_ratio: float) -> float:
+        with self.lock:
+            now = time.monotonic()
+            available_requests, available_tokens, updated_at = self.buckets.get(
+                bucket_key, (requests_per_minute, tokens_per_minute, now)
+            )
+
+            available_requests, available_tokens, wait = take_from_bucket(
+                available_requests=available_requests,
+                available_tokens=available_tokens,
+                elapsed=now - updated_at,
+                requests_per_minute=requests_per_minute,
+                tokens_per_minute=tokens_per_minute,
+                requests=requests,
+                tokens=tokens,
+                reserve_ratio=reserve_ratio
+            )
+
+            self.buckets[bucket_key] = (available_requests, available_tokens, now)
+
+        return wait
@@ -0,0 +1,43 @@
+from .TokenBucketRateLimiter import take_from_bucket
+from models.db_schemas.minirag.schemas import LLMRateLimitBucket
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+
+
+class PostgresRateLimitStore:
+    """Token buckets in the llm_rate_limits table, shared by every API and worker process"""
+
+    def __init__(self, db_client: object):
+        self.db_client = db_client
+
+    async def acquire(self, bucket_key: str, requests_per_minute: int, tokens_per_minute: int,
+                      requests: int, tokens: int, reserve_ratio: float) -> float:
+        async with self.db_client() as session:
+            async with session.begin():
+                await session.execute(
+                    insert(LLMRateLimitBucket).values(
+                        bucket_key=bucket_key,
+                        available_requests=requests_per_minute,
+                        available_tokens=tokens_per_minute,
+                    ).on_conflict_do_nothing(index_elements=[LLMRateLimitBucket.bucket_key])
+                )
+
+                # the row lock serializes the processes, the database clock avoids host skew
+                query = select(LLMRateLimitBucket, func.clock_timestamp()).where(
+                    LLMRateLimitBucket.bucket_key == bucket_key
+                ).with_for_update()
+                bucket, now = (await session.execute(query)).one()
+
+                bucket.available_requests, bucket.available_tokens, wait = take_from_bucket(
+                    available_requests=bucket.available_requests,
+                    available_tokens=bucket.available_tokens,
+                    elapsed=(now - bucket.updated_at).total_seconds(),
+                    requests_per_minute=requests_per_minute,
+                    tokens_per_minute=tokens_per_minute,
+                    requests=requests,
+                    tokens=tokens,
+                    reserve_ratio=reserve_ratio
+                )
+                bucket.updated_at = now
+
+        return wait
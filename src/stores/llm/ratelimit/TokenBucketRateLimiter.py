@@ -0,0 +1,98 @@
+from utils.metrics import LLM_RATE_LIMIT_WAIT
+import asyncio
+import logging
+import time
+
+
+def take_from_bucket(available_requests: float, available_tokens: float, elapsed: float,
+                     requests_per_minute: int, tokens_per_minute: int,
+                     requests: int, tokens: int, reserve_ratio: float):
+    """
+    Refill both buckets for the elapsed seconds then take requests/tokens from them.
+    A limit of 0 disables that bucket. Callers with a reserve_ratio leave that share
+    of each bucket untouched, so callers without one always find capacity first.
+    Returns the new (available_requests, available_tokens, wait), wait is 0 when the
+    call was admitted, otherwise the seconds to wait before trying again.
+    """
+    wait = 0.0
+    buckets = []
+
+    for available, limit, amount in ((available_requests, requests_per_minute, requests),
+                                     (available_tokens, tokens_per_minute, tokens)):
+        if not limit:
+            buckets.append(available)
+            continue
+
+        rate = limit / 60
+        available = min(limit, available + max(elapsed, 0) * rate)
+        # a single call bigger than the bucket would never fit
+        needed = min(min(amount, limit) + limit * reserve_ratio, limit)
+
+        if available < needed:
+            wait = max(wait, (needed - available) / rate)
+
+        buckets.append(available)
+
+    if wait == 0:
+        buckets = [
+            available - min(amount, limit) if limit else available
+            for available, limit, amount in zip(buckets,
+                                                (requests_per_minute, tokens_per_minute),
+                                                (requests, tokens))
+        ]
+
+    return buckets[0], buckets[1], wait
+
+
+class TokenBucketRateLimiter:
+    """
+    Paces the calls to one provider API (requests/min and tokens/min) across processes.
+    Bulk calls (document embeddings) keep a reserve of the buckets for the interactive ones
+    (queries and generation), so searches are not queued behind an indexing run.
+    """
+
+    def __init__(self, bucket_key: str, requests_per_minute: int, tokens_per_minute: int,
+                 store, fallback_store=None, bulk_reserve_ratio: float = 0.2,
+                 max_wait_seconds: float = 5):
+        self.bucket_key = bucket_key
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.store = store
+        self.fallback_store = fallback_store
+        self.bulk_reserve_ratio = bulk_reserve_ratio
+        self.max_wait_seconds = max_wait_seconds
+        self.logger = logging.getLogger(__name__)
+
+    async def acquire(self, tokens: int = 0, requests: int = 1, interactive: bool = True):
+        reserve_ratio = 0 if interactive else self.bulk_reserve_ratio
+        start_time = time.perf_counter()
+
+        while True:
+            wait = await self.try_acquire(requests=requests, tokens=tokens, reserve_ratio=reserve_ratio)
+            if wait <= 0:
+                break
+            # re-check at least every max_wait_seconds, other processes may free capacity
+            await asyncio.sleep(min(wait, self.max_wait_seconds))
+
+        LLM_RATE_LIMIT_WAIT.labels(
+            self.bucket_key, "interactive" if interactive else "bulk"
+        ).observe(time.perf_counter() - start_time)
+
+    async def try_acquire(self, requests: int, tokens: int, reserve_ratio: float) -> float:
+        kwargs = dict(
+            bucket_key=self.bucket_key,
+            requests_per_minute=self.requests_per_minute,
+            tokens_per_minute=self.tokens_per_minute,
+            requests=requests,
+            tokens=tokens,
+            reserve_ratio=reserve_ratio
+        )
+
+        try:
+            return await self.store.acquire(**kwargs)
+        except Exception as e:
+            if self.fallback_store is None:
+                raise
+            # pacing per process is better than not pacing at all
+            self.logger.error(f"Rate limit store failed, using the in-process buckets: {e}")
+            return await self.fallback_store.acquire(**kwargs)
@@ -0,0 +1,3 @@
+from .TokenBucketRateLimiter import TokenBucketRateLimiter
+from .MemoryRateLimitStore import MemoryRateLimitStore
+from .PostgresRateLimitStore import PostgresRateLimitStore
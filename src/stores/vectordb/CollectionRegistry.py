@@ -0,0 +1,44 @@
+from typing import Optional
+import threading
+import time
+
+
+class CollectionRegistry:
+    """
+    Process-local cache of what is known about the vector db collections
+    (exists, embedding_size, has_index, ...), every entry expires after ttl_seconds
+    so changes made by other processes are picked up.
+    """
+
+    def __init__(self, ttl_seconds: float = 60):
+        self.ttl_seconds = ttl_seconds
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, collection_name: str, key: str):
+        with self.lock:
+            entry = self.entries.get(collection_name)
+            if entry is None:
+                return None
+
+            if time.monotonic() - entry["cached_at"] > self.ttl_seconds:
+                del self.entries[collection_name]
+                return None
+
+            return entry.get(key)
+
+    def set(self, collection_name: str, **info):
+        with self.lock:
+            entry = self.entries.get(collection_name)
+            if entry is None or time.monotonic() - entry["cached_at"] > self.ttl_seconds:
+                entry = {}
+            entry.update(info)
+            entry["cached_at"] = time.monotonic()
+            self.entries[collection_name] = entry
+
+    def invalidate(self, collection_name: Optional[str] = None):
+        with self.lock:
+            if collection_name is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(collection_name, None)
@@ -17,6 +17,7 @@ class PgVectorTableSchemaEnums(Enum):
     VECTOR = "vector"
     CHUNK_ID = "chunk_id"
     METADATA = "metadata"
+    COLLECTION_NAME = "collection_name"
     _PREFIX = "pgvector"
 
 
@@ -27,4 +28,28 @@ class PgVectorDistanceMethodsEnums(Enum):
 class PgVectorIndexTypeEnums(Enum):
     HNSW = "hnsw"
     IVFFLAT = "ivfflat"
-    
\ No newline at end of file
+
+
+class PgVectorLayoutEnums(Enum):
+    # a table per collection
+    TABLE_PER_COLLECTION = "TABLE_PER_COLLECTION"
+    # one table partitioned by collection, small collections share hash partitions
+    PARTITIONED = "PARTITIONED"
+
+
+class PgVectorIterativeScanEnums(Enum):
+    OFF = "off"
+    STRICT_ORDER = "strict_order"
+    RELAXED_ORDER = "relaxed_order"
+
+
+class MetadataFieldEnums(Enum):
+    # written into every record metadata at index time, search filters use them
+    ASSET_ID = "asset_id"
+    PAGE = "page"
+
+
+class SearchScoreTypeEnums(Enum):
+    # every provider returns higher is better scores, of one of these kinds
+    SIMILARITY = "similarity"
+    RRF = "rrf"
@@ -39,5 +39,18 @@ class VectorDBInterface(ABC):
                    record_id: str = None, batch_size: int = 50):
         pass
 
-    def search_by_vector(self, collection_name: str, vector: list, limit: int) -> List[RetrievedDocument]:
+    def search_by_vector(self, collection_name: str, vector: list, limit: int,
+                         search_params: dict = None, search_filter: dict = None) -> List[RetrievedDocument]:
+        pass
+
+    async def hybrid_search(self, collection_name: str, text: str, vector: list, limit: int,
+                            search_params: dict = None, search_filter: dict = None) -> List[RetrievedDocument]:
+        # providers without a lexical index fall back to the vector search
+        return await self.search_by_vector(collection_name=collection_name, vector=vector, limit=limit,
+                                           search_params=search_params, search_filter=search_filter)
+
+    async def start_bulk_load(self, collection_name: str, drop_index: bool = False):
+        pass
+
+    async def finish_bulk_load(self, collection_name: str):
         pass
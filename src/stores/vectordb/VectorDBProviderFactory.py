@@ -1,7 +1,16 @@
-from .providers import QdrantDBProvider, PGVectorProvider
-from .VectorDBEnums import VectorDBEnums, DistanceMethodEnums
+from .providers import QdrantDBProvider, PGVectorProvider, PGVectorPartitionedProvider
+from .VectorDBEnums import VectorDBEnums, DistanceMethodEnums, PgVectorLayoutEnums
+from .CollectionRegistry import CollectionRegistry
 from controllers.BaseController import BaseController
 from sqlalchemy.orm import sessionmaker
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_collection_registry(ttl_seconds: float) -> CollectionRegistry:
+    # one registry per process, shared by every provider the factory creates
+    return CollectionRegistry(ttl_seconds=ttl_seconds)
+
 
 class VectorDBProviderFactory:
     def __init__(self, config, db_client: sessionmaker=None):
@@ -14,19 +23,43 @@ class VectorDBProviderFactory:
             db_path = self.base_controller.get_database_path(
                 db_name=self.config.VECTOR_DB_PATH
             )
-            return QdrantDBProvider(    
-                db_path=db_path,
+            return QdrantDBProvider(
+                db_client=db_path,
                 default_vector_size=self.config.EMBEDDING_MODEL_SIZE,
                 distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
-                index_threshold=self.config.VECTOR_DB_PGVEC_INDEX_THRESHOLD
+                index_threshold=self.config.VECTOR_DB_PGVEC_INDEX_THRESHOLD,
+                indexing_threshold=self.config.VECTOR_DB_QDRANT_INDEXING_THRESHOLD,
+                collection_registry=get_collection_registry(self.config.VECTOR_DB_COLLECTION_CACHE_TTL),
+                hybrid_candidates=self.config.VECTOR_DB_HYBRID_CANDIDATES
             )
 
         if provider == VectorDBEnums.PGVECTOR.value:
-            return PGVectorProvider(
+            pgvector_options = dict(
                 db_client=self.db_client,
                 default_vector_size=self.config.EMBEDDING_MODEL_SIZE,
                 distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
-                index_threshold=self.config.VECTOR_DB_PGVEC_INDEX_THRESHOLD
+                index_threshold=self.config.VECTOR_DB_PGVEC_INDEX_THRESHOLD,
+                use_binary_copy=self.config.VECTOR_DB_PGVEC_BINARY_COPY,
+                index_type=self.config.VECTOR_DB_PGVEC_INDEX_TYPE,
+                hnsw_m=self.config.VECTOR_DB_PGVEC_HNSW_M,
+                hnsw_ef_construction=self.config.VECTOR_DB_PGVEC_HNSW_EF_CONSTRUCTION,
+                ivfflat_lists=self.config.VECTOR_DB_PGVEC_IVFFLAT_LISTS,
+                index_maintenance_work_mem=self.config.VECTOR_DB_PGVEC_INDEX_MAINTENANCE_WORK_MEM,
+                index_parallel_workers=self.config.VECTOR_DB_PGVEC_INDEX_PARALLEL_WORKERS,
+                collection_registry=get_collection_registry(self.config.VECTOR_DB_COLLECTION_CACHE_TTL),
+                iterative_scan=self.config.VECTOR_DB_PGVEC_ITERATIVE_SCAN,
+                text_search_config=self.config.VECTOR_DB_PGVEC_TEXT_SEARCH_CONFIG,
+                hybrid_candidates=self.config.VECTOR_DB_HYBRID_CANDIDATES,
+                hybrid_rrf_k=self.config.VECTOR_DB_HYBRID_RRF_K
             )
 
+            if self.config.VECTOR_DB_PGVEC_LAYOUT == PgVectorLayoutEnums.PARTITIONED.value:
+                return PGVectorPartitionedProvider(
+                    **pgvector_options,
+                    shared_partitions=self.config.VECTOR_DB_PGVEC_SHARED_PARTITIONS,
+                    dedicated_partition_rows=self.config.VECTOR_DB_PGVEC_DEDICATED_PARTITION_ROWS
+                )
+
+            return PGVectorProvider(**pgvector_options)
+
         return None
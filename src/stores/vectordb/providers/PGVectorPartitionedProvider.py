@@ -0,0 +1,376 @@
+from .PGVectorProvider import PGVectorProvider
+from ..VectorDBEnums import PgVectorTableSchemaEnums, MetadataFieldEnums
+from typing import List
+from sqlalchemy.sql import text as sql_text
+import re
+
+
+class PGVectorPartitionedProvider(PGVectorProvider):
+    """
+    All the collections live in one table LIST partitioned by collection name:
+    - the small collections share the DEFAULT partition, itself HASH partitioned in shared_partitions
+    - a collection reaching dedicated_partition_rows records is moved to its own partition
+      by promote_large_collections, run as a maintenance task off the indexing path
+    The vector indexes are built per partition and the searches are pruned to the collection partition,
+    so the catalog grows with the large collections only.
+    """
+
+    def __init__(self, db_client, shared_partitions: int = 16, dedicated_partition_rows: int = 100000,
+                 **kwargs):
+        super().__init__(db_client=db_client, **kwargs)
+
+        # the modulus of the hash partitions, fixed once the table is created
+        self.shared_partitions = max(int(shared_partitions), 1)
+        self.dedicated_partition_rows = dedicated_partition_rows
+
+        self.parent_table = f"{self.pgvector_table_prefix}_{self.default_vector_size}"
+        self.shared_table = f"{self.parent_table}_shared"
+        self.catalog_table = f"{self.parent_table}_collections"
+        self.default_dedicated_partition_name = lambda collection_name: f"{self.parent_table}_{collection_name}"
+        self.is_layout_ready = False
+
+    async def connect(self):
+        await super().connect()
+        await self.ensure_layout()
+
+    async def ensure_layout(self):
+        if self.is_layout_ready:
+            return
+
+        collection_column = PgVectorTableSchemaEnums.COLLECTION_NAME.value
+        async with self.db_client() as session:
+            async with session.begin():
+                # the workers connecting together would race on the CREATE statements
+                await session.execute(sql_text("SELECT pg_advisory_xact_lock(hashtext(:parent_table));"),
+                                      {"parent_table": self.parent_table})
+
+                await session.execute(sql_text(
+                    f"CREATE TABLE IF NOT EXISTS {self.catalog_table} ("
+                    f"{collection_column} text PRIMARY KEY, "
+                    "partition_table text, "
+                    "created_at timestamptz NOT NULL DEFAULT now()"
+                    ");"
+                ))
+
+                await session.execute(sql_text(
+                    f"CREATE TABLE IF NOT EXISTS {self.parent_table} ("
+                    f"{PgVectorTableSchemaEnums.ID.value} bigserial, "
+                    f"{collection_column} text NOT NULL, "
+                    f"{PgVectorTableSchemaEnums.TEXT.value} text, "
+                    f"{PgVectorTableSchemaEnums.VECTOR.value} vector({self.default_vector_size}), "
+                    f"{PgVectorTableSchemaEnums.METADATA.value} jsonb DEFAULT \'{{}}\', "
+                    f"{PgVectorTableSchemaEnums.CHUNK_ID.value} integer, "
+                    f"PRIMARY KEY ({collection_column}, {PgVectorTableSchemaEnums.ID.value}), "
+                    f"FOREIGN KEY ({PgVectorTableSchemaEnums.CHUNK_ID.value}) REFERENCES chunks(chunk_id)"
+                    f") PARTITION BY LIST ({collection_column});"
+                ))
+
+                # partitioned indexes, every partition gets its own copy
+                await session.execute(sql_text(
+                    f"CREATE UNIQUE INDEX IF NOT EXISTS {self.default_chunk_id_index_name(self.parent_table)} "
+                    f"ON {self.parent_table} ({collection_column}, {PgVectorTableSchemaEnums.CHUNK_ID.value});"
+                ))
+                for field in MetadataFieldEnums:
+                    await session.execute(sql_text(
+                        f"CREATE INDEX IF NOT EXISTS {self.default_metadata_index_name(self.parent_table, field.value)} "
+                        f"ON {self.parent_table} ({collection_column}, {self.get_metadata_field_sql(field.value)});"
+                    ))
+                await session.execute(self.get_text_search_index_sql(collection_name=self.parent_table))
+
+                await session.execute(sql_text(
+                    f"CREATE TABLE IF NOT EXISTS {self.shared_table} PARTITION OF {self.parent_table} "
+                    f"DEFAULT PARTITION BY HASH ({collection_column});"
+                ))
+                for remainder in range(self.shared_partitions):
+                    await session.execute(sql_text(
+                        f"CREATE TABLE IF NOT EXISTS {self.shared_table}_{remainder} PARTITION OF {self.shared_table} "
+                        f"FOR VALUES WITH (MODULUS {self.shared_partitions}, REMAINDER {remainder});"
+                    ))
+
+        self.is_layout_ready = True
+
+    def get_collection_table(self, collection_name: str) -> str:
+        return self.parent_table
+
+    def get_collection_key(self, collection_name: str) -> dict:
+        return {PgVectorTableSchemaEnums.COLLECTION_NAME.value: collection_name}
+
+    async def is_collection_existed(self, collection_name: str) -> bool:
+        is_existed = self.collection_registry.get(collection_name, "exists")
+        if is_existed is not None:
+            return is_existed
+
+        async with self.db_client() as session:
+            async with session.begin():
+                result = await session.execute(sql_text(
+                    f"SELECT partition_table FROM {self.catalog_table} "
+                    f"WHERE {PgVectorTableSchemaEnums.COLLECTION_NAME.value} = :collection_name;"
+                ), {"collection_name": collection_name})
+                record = result.fetchone()
+
+        is_existed = record is not None
+        self.collection_registry.set(collection_name, exists=is_existed,
+                                     embedding_size=self.default_vector_size if is_existed else None,
+                                     has_text_search=is_existed,
+                                     dedicated_partition=(record.partition_table or "") if is_existed else "")
+
+        return is_existed
+
+    async def list_all_collections(self) -> List:
+        async with self.db_client() as session:
+            async with session.begin():
+                result = await session.execute(sql_text(
+                    f"SELECT {PgVectorTableSchemaEnums.COLLECTION_NAME.value} FROM {self.catalog_table} "
+                    f"ORDER BY {PgVectorTableSchemaEnums.COLLECTION_NAME.value};"
+                ))
+                records = result.scalars().all()
+
+        return records
+
+    async def get_collection_info(self, collection_name: str) -> dict:
+        if not await self.is_collection_existed(collection_name=collection_name):
+            return None
+
+        dedicated_partition = await self.get_dedicated_partition(collection_name=collection_name)
+        partition_table = await self.get_partition_table(collection_name=collection_name)
+        async with self.db_client() as session:
+            async with session.begin():
+                count_sql = sql_text(
+                    f"SELECT COUNT(*) FROM {self.parent_table} "
+                    f"WHERE {PgVectorTableSchemaEnums.COLLECTION_NAME.value} = :collection_name;")
+                record_count = await session.execute(count_sql, {"collection_name": collection_name})
+
+        return {
+            "table_info": {
+                "tablename": self.parent_table,
+                "partition": partition_table,
+                "dedicated_partition": bool(dedicated_partition)
+            },
+            "record_count": record_count.scalar_one()
+        }
+
+    async def delete_collection(self, collection_name: str):
+        async with self.db_client() as session:
+            async with session.begin():
+                self.logger.info(f"Deleting collection: {collection_name}")
+
+                result = await session.execute(sql_text(
+                    f"SELECT partition_table FROM {self.catalog_table} "
+                    f"WHERE {PgVectorTableSchemaEnums.COLLECTION_NAME.value} = :collection_name FOR UPDATE;"
+                ), {"collection_name": collection_name})
+                partition_table = result.scalar_one_or_none()
+
+                if partition_table:
+                    await session.execute(sql_text(f"DROP TABLE IF EXISTS {partition_table};"))
+                else:
+                    await session.execute(sql_text(
+                        f"DELETE FROM {self.parent_table} "
+                        f"WHERE {PgVectorTableSchemaEnums.COLLECTION_NAME.value} = :collection_name;"
+                    ), {"collection_name": collection_name})
+
+                await session.execute(sql_text(
+                    f"DELETE FROM {self.catalog_table} "
+                    f"WHERE {PgVectorTableSchemaEnums.COLLECTION_NAME.value} = :collection_name;"
+                ), {"collection_name": collection_name})
+
+        self.collection_registry.invalidate(collection_name)
+        if partition_table:
+            self.collection_registry.invalidate(partition_table)
+        return True
+
+    async def create_collection(self, collection_name: str,
+                                embedding_size: int,
+                                do_reset: bool = False):
+        # the name ends up in the partition bounds
+        if not re.fullmatch(r"\w+", collection_name):
+            self.logger.error(f"Invalid collection name: {collection_name}")
+            return False
+
+        if embedding_size != self.default_vector_size:
+            self.logger.error(
+                f"Can't create collection: {collection_name}, the partitioned table holds "
+                f"vectors of size {self.default_vector_size}, not {embedding_size}")
+            return False
+
+        if do_reset:
+            _ = await self.delete_collection(collection_name=collection_name)
+
+        if await self.is_collection_existed(collection_name=collection_name):
+            return False
+
+        self.logger.info(f"Creating collection: {collection_name}")
+        async with self.db_client() as session:
+            async with session.begin():
+                result = await session.execute(sql_text(
+                    f"INSERT INTO {self.catalog_table} ({PgVectorTableSchemaEnums.COLLECTION_NAME.value}) "
+                    "VALUES (:collection_name) ON CONFLICT DO NOTHING "
+                    f"RETURNING {PgVectorTableSchemaEnums.COLLECTION_NAME.value};"
+                ), {"collection_name": collection_name})
+                is_created = result.scalar_one_or_none() is not None
+
+        self.collection_registry.set(collection_name, exists=True, embedding_size=self.default_vector_size,
+                                     has_text_search=True, dedicated_partition="")
+        return is_created
+
+    async def ensure_chunk_id_unique(self, collection_name: str):
+        # the partitioned table is created with the unique (collection_name, chunk_id) index
+        return
+
+    async def ensure_metadata_indexes(self, collection_name: str):
+        return
+
+    async def create_text_search_index(self, collection_name: str):
+        # the partitioned table is created with the tsvector expression index
+        return False
+
+    async def get_dedicated_partition(self, collection_name: str) -> str:
+        """The partition of a large collection, "" while the collection is in the shared partitions"""
+        dedicated_partition = self.collection_registry.get(collection_name, "dedicated_partition")
+        if dedicated_partition is not None:
+            return dedicated_partition
+
+        async with self.db_client() as session:
+            async with session.begin():
+                result = await session.execute(sql_text(
+                    f"SELECT partition_table FROM {self.catalog_table} "
+                    f"WHERE {PgVectorTableSchemaEnums.COLLECTION_NAME.value} = :collection_name;"
+                ), {"collection_name": collection_name})
+                dedicated_partition = result.scalar_one_or_none() or ""
+
+        self.collection_registry.set(collection_name, dedicated_partition=dedicated_partition)
+        return dedicated_partition
+
+    async def get_partition_table(self, collection_name: str) -> str:
+        """The leaf partition holding the collection records, None while the collection is empty"""
+        dedicated_partition = await self.get_dedicated_partition(collection_name=collection_name)
+        if dedicated_partition:
+            return dedicated_partition
+
+        shared_partition = self.collection_registry.get(collection_name, "shared_partition")
+        if shared_partition:
+            return shared_partition
+
+        async with self.db_client() as session:
+            async with session.begin():
+                result = await session.execute(sql_text(
+                    f"SELECT tableoid::regclass::text FROM {self.parent_table} "
+                    f"WHERE {PgVectorTableSchemaEnums.COLLECTION_NAME.value} = :collection_name LIMIT 1;"
+                ), {"collection_name": collection_name})
+                shared_partition = result.scalar_one_or_none()
+
+        if shared_partition:
+            self.collection_registry.set(collection_name, shared_partition=shared_partition)
+        return shared_partition
+
+    async def promote_large_collections(self) -> List[str]:
+        """Move the collections grown past dedicated_partition_rows to their own indexed partition"""
+        promoted_collections = []
+        for collection_name in await self.list_all_collections():
+            if await self.promote_collection_if_large(collection_name=collection_name):
+                # the new partition starts without a vector index
+                await self.create_vector_index(collection_name=collection_name)
+                promoted_collections.append(collection_name)
+
+        return promoted_collections
+
+    async def promote_collection_if_large(self, collection_name: str) -> bool:
+        if await self.get_dedicated_partition(collection_name=collection_name):
+            return False
+
+        async with self.db_client() as session:
+            async with session.begin():
+                # stop counting at the threshold
+                result = await session.execute(sql_text(
+                    f"SELECT COUNT(*) FROM (SELECT 1 FROM {self.parent_table} "
+                    f"WHERE {PgVectorTableSchemaEnums.COLLECTION_NAME.value} = :collection_name "
+                    "LIMIT :threshold) AS collection_records;"
+                ), {"collection_name": collection_name, "threshold": self.dedicated_partition_rows})
+                records_count = result.scalar_one()
+
+        if records_count < self.dedicated_partition_rows:
+            return False
+
+        return await self.create_dedicated_partition(collection_name=collection_name)
+
+    async def create_dedicated_partition(self, collection_name: str) -> bool:
+        """
+        Move the collection records from the shared partitions to a partition of its own,
+        creating a list partition validates the DEFAULT partition, which is locked meanwhile.
+        """
+        partition_table = self.default_dedicated_partition_name(collection_name)
+        moved_table = f"{collection_name}_moved"
+        columns = ", ".join([
+            PgVectorTableSchemaEnums.ID.value,
+            PgVectorTableSchemaEnums.COLLECTION_NAME.value,
+            PgVectorTableSchemaEnums.TEXT.value,
+            PgVectorTableSchemaEnums.VECTOR.value,
+            PgVectorTableSchemaEnums.METADATA.value,
+            PgVectorTableSchemaEnums.CHUNK_ID.value,
+        ])
+
+        self.logger.info(f"Moving collection: {collection_name} to its partition: {partition_table}")
+        async with self.db_client() as session:
+            async with session.begin():
+                # the catalog row lock serializes the workers promoting the same collection
+                result = await session.execute(sql_text(
+                    f"SELECT partition_table FROM {self.catalog_table} "
+                    f"WHERE {PgVectorTableSchemaEnums.COLLECTION_NAME.value} = :collection_name FOR UPDATE;"
+                ), {"collection_name": collection_name})
+                record = result.fetchone()
+                if record is None or record.partition_table:
+                    return False
+
+                await session.execute(sql_text(
+                    f"CREATE TEMP TABLE {moved_table} ON COMMIT DROP AS "
+                    f"SELECT {columns} FROM {self.parent_table} WITH NO DATA;"
+                ))
+                await session.execute(sql_text(
+                    f"WITH moved AS (DELETE FROM {self.parent_table} "
+                    f"WHERE {PgVectorTableSchemaEnums.COLLECTION_NAME.value} = :collection_name "
+                    f"RETURNING {columns}) "
+                    f"INSERT INTO {moved_table} ({columns}) SELECT {columns} FROM moved;"
+                ), {"collection_name": collection_name})
+                await session.execute(sql_text(
+                    f"CREATE TABLE {partition_table} PARTITION OF {self.parent_table} "
+                    f"FOR VALUES IN ('{collection_name}');"
+                ))
+                await session.execute(sql_text(
+                    f"INSERT INTO {self.parent_table} ({columns}) SELECT {columns} FROM {moved_table};"
+                ))
+                await session.execute(sql_text(
+                    f"UPDATE {self.catalog_table} SET partition_table = :partition_table "
+                    f"WHERE {PgVectorTableSchemaEnums.COLLECTION_NAME.value} = :collection_name;"
+                ), {"partition_table": partition_table, "collection_name": collection_name})
+
+        self.collection_registry.set(collection_name, dedicated_partition=partition_table, shared_partition=None)
+        return True
+
+    async def create_vector_index(self, collection_name: str,
+                                  index_type: str = None):
+        """Index the partition of the collection, the dedicated or the shared one holding it"""
+        if not await self.is_collection_existed(collection_name=collection_name):
+            return False
+
+        partition_table = await self.get_partition_table(collection_name=collection_name)
+        if not partition_table:
+            return False
+
+        return await super().create_vector_index(collection_name=partition_table, index_type=index_type)
+
+    async def reset_vector_index(self, collection_name: str,
+                                 index_type: str = None) -> bool:
+        partition_table = await self.get_partition_table(collection_name=collection_name)
+        if partition_table:
+            _ = await self.drop_vector_index(collection_name=partition_table)
+
+        return await self.create_vector_index(collection_name=collection_name,
+                                              index_type=index_type)
+
+    async def start_bulk_load(self, collection_name: str, drop_index: bool = False):
+        self.bulk_loading_collections.add(collection_name)
+
+        # the index of a shared partition serves the other collections too, it is kept
+        dedicated_partition = await self.get_dedicated_partition(collection_name=collection_name)
+        if drop_index and dedicated_partition:
+            self.logger.info(f"Dropping vector index for the bulk load of: {collection_name}")
+            _ = await self.drop_vector_index(collection_name=dedicated_partition)
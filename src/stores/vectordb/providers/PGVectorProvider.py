@@ -1,19 +1,56 @@
 from ..VectorDBInterface import VectorDBInterface
+from ..CollectionRegistry import CollectionRegistry
 from ..VectorDBEnums import (
-    PgVectorTableSchemaEnums, PgVectorIndexTypeEnums, PgVectorDistanceMethodsEnums, DistanceMethodEnums)
+    PgVectorTableSchemaEnums, PgVectorIndexTypeEnums, PgVectorDistanceMethodsEnums, DistanceMethodEnums,
+    PgVectorIterativeScanEnums, MetadataFieldEnums, SearchScoreTypeEnums)
 from typing import List
 import logging
 from models.db_schemas.minirag.schemas import RetrievedDocument
 from sqlalchemy.sql import text as sql_text
+from sqlalchemy.exc import ProgrammingError
+from pgvector import Vector
+import numpy as np
 import json
+import re
 
 
 class PGVectorProvider(VectorDBInterface):
-    def __init__(self, db_client, default_vector_size: int = 786, distance_method: str = None, index_threshold: int = 100):
+    def __init__(self, db_client, default_vector_size: int = 786, distance_method: str = None, index_threshold: int = 100,
+                 use_binary_copy: bool = True,
+                 index_type: str = PgVectorIndexTypeEnums.HNSW.value,
+                 hnsw_m: int = 16, hnsw_ef_construction: int = 64, ivfflat_lists: int = 0,
+                 index_maintenance_work_mem: str = "512MB", index_parallel_workers: int = 2,
+                 collection_registry: CollectionRegistry = None,
+                 iterative_scan: str = PgVectorIterativeScanEnums.RELAXED_ORDER.value,
+                 text_search_config: str = "english", hybrid_candidates: int = 50, hybrid_rrf_k: int = 60):
 
         self.db_client = db_client
         self.default_vector_size = default_vector_size
         self.index_threshold = index_threshold
+        self.use_binary_copy = use_binary_copy
+
+        self.index_type = index_type
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.ivfflat_lists = ivfflat_lists
+        self.index_maintenance_work_mem = index_maintenance_work_mem
+        self.index_parallel_workers = index_parallel_workers
+        # collections in a bulk load, their index is built once by finish_bulk_load
+        self.bulk_loading_collections = set()
+        # saves the catalog lookups on the search/insert hot paths
+        self.collection_registry = collection_registry or CollectionRegistry()
+
+        if iterative_scan not in [e.value for e in PgVectorIterativeScanEnums]:
+            iterative_scan = PgVectorIterativeScanEnums.OFF.value
+        # filtered searches keep scanning the vector index until enough rows match (pgvector >= 0.8)
+        self.iterative_scan = iterative_scan
+
+        # text search configuration of the tsvector expression, it is part of the index DDL
+        if not re.fullmatch(r"\w+", text_search_config or ""):
+            text_search_config = "simple"
+        self.text_search_config = text_search_config
+        self.hybrid_candidates = hybrid_candidates
+        self.hybrid_rrf_k = hybrid_rrf_k
 
         if distance_method == DistanceMethodEnums.COSINE.value:
             distance_method = PgVectorDistanceMethodsEnums.COSINE.value
@@ -24,6 +61,13 @@ class PGVectorProvider(VectorDBInterface):
         self.pgvector_table_prefix = PgVectorTableSchemaEnums._PREFIX.value
         self.logger = logging.getLogger("uvicorn")
         self.default_index_name = lambda collection_name: f"{collection_name}_vector_idx"
+        self.default_chunk_id_index_name = lambda collection_name: f"{collection_name}_chunk_id_idx"
+        # collections checked to have the unique chunk_id index the upserts rely on
+        self.upsert_ready_collections = set()
+        self.default_metadata_index_name = lambda collection_name, field: f"{collection_name}_{field}_idx"
+        # collections checked to have the metadata indexes the search filters rely on
+        self.metadata_indexed_collections = set()
+        self.default_text_search_index_name = lambda collection_name: f"{collection_name}_text_search_idx"
 
     async def connect(self):
         async with self.db_client() as session:
@@ -37,14 +81,47 @@ class PGVectorProvider(VectorDBInterface):
         pass
 
     async def is_collection_existed(self, collection_name: str) -> bool:
+        is_existed = self.collection_registry.get(collection_name, "exists")
+        if is_existed is not None:
+            return is_existed
+
         async with self.db_client() as session:
             async with session.begin():
+                # the vector column typmod is the collection embedding size
                 result = await session.execute(sql_text(
-                    "SELECT * FROM pg_tables WHERE tablename = :collection_name;"
-                ), {"collection_name": collection_name})
-                record = result.scalar_one_or_none()
+                    "SELECT a.atttypmod, EXISTS ("
+                    "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE i.indrelid = a.attrelid AND c.relname = :text_search_index "
+                    "AND i.indisvalid) AS has_text_search "
+                    "FROM pg_attribute a "
+                    "WHERE a.attrelid = to_regclass(:collection_name) AND a.attname = :vector_column;"
+                ), {"collection_name": collection_name,
+                    "vector_column": PgVectorTableSchemaEnums.VECTOR.value,
+                    "text_search_index": self.default_text_search_index_name(collection_name)})
+                record = result.fetchone()
+
+        is_existed = record is not None
+        embedding_size = record.atttypmod if is_existed and record.atttypmod > 0 else None
+        self.collection_registry.set(collection_name, exists=is_existed, embedding_size=embedding_size,
+                                     has_text_search=is_existed and record.has_text_search)
+
+        return is_existed
+
+    def is_undefined_table_error(self, error: Exception) -> bool:
+        # undefined_table, a missing column or function must not be taken for a dropped collection
+        orig = getattr(error, "orig", None)
+        return (getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)) == "42P01"
+
+    def handle_missing_collection(self, collection_name: str, error: Exception) -> bool:
+        """The registry said the collection exists but it was dropped meanwhile"""
+        if not self.is_undefined_table_error(error):
+            return False
 
-        return record
+        self.logger.error(f"Collection was dropped: {collection_name}")
+        self.collection_registry.invalidate(collection_name)
+        self.upsert_ready_collections.discard(collection_name)
+        self.metadata_indexed_collections.discard(collection_name)
+        return True
 
     async def list_all_collections(self) -> List:
         records = []
@@ -98,6 +175,9 @@ class PGVectorProvider(VectorDBInterface):
                     f"DROP TABLE IF EXISTS {collection_name};")
                 await session.execute(delete_sql)
                 await session.commit()
+        self.upsert_ready_collections.discard(collection_name)
+        self.metadata_indexed_collections.discard(collection_name)
+        self.collection_registry.invalidate(collection_name)
         return True
 
     async def create_collection(self, collection_name: str,
@@ -122,30 +202,154 @@ class PGVectorProvider(VectorDBInterface):
                         ")"
                     )
                     await session.execute(create_sql)
+                    # one vector per chunk, inserts upsert on it
+                    await session.execute(sql_text(
+                        f"CREATE UNIQUE INDEX {self.default_chunk_id_index_name(collection_name)} "
+                        f"ON {collection_name} ({PgVectorTableSchemaEnums.CHUNK_ID.value})"
+                    ))
+                    for field in MetadataFieldEnums:
+                        await session.execute(self.get_metadata_index_sql(
+                            collection_name=collection_name, field=field.value))
+                    await session.execute(self.get_text_search_index_sql(collection_name=collection_name))
                     await session.commit()
+            self.upsert_ready_collections.add(collection_name)
+            self.metadata_indexed_collections.add(collection_name)
+            self.collection_registry.set(collection_name, exists=True, embedding_size=embedding_size,
+                                         has_index=False, has_text_search=True)
             return True
 
         return False
 
+    async def ensure_chunk_id_unique(self, collection_name: str):
+        """
+        Collections created before the unique chunk_id index may hold duplicated chunks,
+        keep the latest vector of each chunk then add the index.
+        """
+        if collection_name in self.upsert_ready_collections:
+            return
+
+        index_name = self.default_chunk_id_index_name(collection_name)
+        async with self.db_client() as session:
+            async with session.begin():
+                check_sql = sql_text("SELECT 1 FROM pg_indexes "
+                                     "WHERE tablename = :collection_name AND indexname = :index_name;")
+                result = await session.execute(check_sql, {"collection_name": collection_name,
+                                                           "index_name": index_name})
+
+                if not result.scalar_one_or_none():
+                    self.logger.info(f"Adding unique chunk_id index to collection: {collection_name}")
+
+                    await session.execute(sql_text(
+                        f"LOCK TABLE {collection_name} IN SHARE ROW EXCLUSIVE MODE;"
+                    ))
+                    await session.execute(sql_text(
+                        f"DELETE FROM {collection_name} a USING {collection_name} b "
+                        f"WHERE a.{PgVectorTableSchemaEnums.CHUNK_ID.value} = b.{PgVectorTableSchemaEnums.CHUNK_ID.value} "
+                        f"AND a.{PgVectorTableSchemaEnums.ID.value} < b.{PgVectorTableSchemaEnums.ID.value};"
+                    ))
+                    await session.execute(sql_text(
+                        f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} "
+                        f"ON {collection_name} ({PgVectorTableSchemaEnums.CHUNK_ID.value});"
+                    ))
+
+        self.upsert_ready_collections.add(collection_name)
+
+    def get_metadata_field_sql(self, field: str) -> str:
+        return f"(({PgVectorTableSchemaEnums.METADATA.value} ->> '{field}')::integer)"
+
+    def get_metadata_index_sql(self, collection_name: str, field: str):
+        return sql_text(
+            f"CREATE INDEX IF NOT EXISTS {self.default_metadata_index_name(collection_name, field)} "
+            f"ON {collection_name} ({self.get_metadata_field_sql(field)});"
+        )
+
+    async def ensure_metadata_indexes(self, collection_name: str):
+        """Collections created before the search filters lack the metadata expression indexes"""
+        if collection_name in self.metadata_indexed_collections:
+            return
+
+        async with self.db_client() as session:
+            async with session.begin():
+                for field in MetadataFieldEnums:
+                    await session.execute(self.get_metadata_index_sql(
+                        collection_name=collection_name, field=field.value))
+
+        self.metadata_indexed_collections.add(collection_name)
+
+    def get_text_search_vector_sql(self) -> str:
+        # the index and the hybrid query must use the very same expression
+        return (f"to_tsvector('{self.text_search_config}'::regconfig, "
+                f"coalesce({PgVectorTableSchemaEnums.TEXT.value}, ''))")
+
+    def get_text_search_index_sql(self, collection_name: str, concurrently: bool = False):
+        return sql_text(
+            f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS "
+            f"{self.default_text_search_index_name(collection_name)} "
+            f"ON {collection_name} USING gin (({self.get_text_search_vector_sql()}));"
+        )
+
+    async def create_text_search_index(self, collection_name: str):
+        """
+        Collections created before the hybrid search lack the tsvector expression index,
+        it is built concurrently by finish_bulk_load, never from the insert path.
+        """
+        is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
+        if not is_collection_existed or self.collection_registry.get(collection_name, "has_text_search"):
+            return False
+
+        index_name = self.default_text_search_index_name(collection_name)
+        async with self.db_client() as session:
+            connection = await session.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+            result = await connection.execute(sql_text(
+                "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE i.indrelid = to_regclass(:collection_name) AND c.relname = :index_name;"
+            ), {"collection_name": collection_name, "index_name": index_name})
+            is_valid = result.scalar_one_or_none()
+
+            if not is_valid:
+                self.logger.info(f"Creating text search index for collection: {collection_name}")
+                if is_valid is False:
+                    # an interrupted build leaves an invalid index that IF NOT EXISTS would keep
+                    await connection.execute(sql_text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name};"))
+                await connection.execute(self.get_text_search_index_sql(collection_name=collection_name,
+                                                                        concurrently=True))
+
+        self.collection_registry.set(collection_name, has_text_search=True)
+        return not is_valid
+
     async def is_index_existed(self, collection_name: str) -> bool:
+        if self.collection_registry.get(collection_name, "has_index"):
+            return True
+
         index_name = self.default_index_name(collection_name)
         async with self.db_client() as session:
             async with session.begin():
+                # an interrupted CREATE INDEX CONCURRENTLY leaves an invalid index behind
                 check_sql = sql_text(f"""
-                                     SELECT 1
-                                     FROM pg_indexes
-                                     WHERE tablename = :collection_name
-                                     AND indexname = :index_name;
+                                     SELECT i.indisvalid
+                                     FROM pg_indexes p
+                                     JOIN pg_class c ON c.relname = p.indexname
+                                     JOIN pg_index i ON i.indexrelid = c.oid
+                                     WHERE p.tablename = :collection_name
+                                     AND p.indexname = :index_name;
                                      """)
                 result = await session.execute(check_sql,
                                                {"collection_name": collection_name,
                                                 "index_name": index_name})
-                record = result.scalar_one_or_none()
+                is_valid = result.scalar_one_or_none()
 
-        return bool(record)
+        if is_valid is False:
+            self.logger.warning(f"Dropping invalid vector index of collection: {collection_name}")
+            await self.drop_vector_index(collection_name=collection_name)
+            return False
+
+        self.collection_registry.set(collection_name, has_index=bool(is_valid))
+        return bool(is_valid)
 
     async def create_vector_index(self, collection_name: str,
-                                  index_type: str = PgVectorIndexTypeEnums.HNSW.value):
+                                  index_type: str = None):
+        index_type = index_type or self.index_type
+
         is_index_existed = await self.is_index_existed(collection_name=collection_name)
         if is_index_existed:
             return False
@@ -157,38 +361,111 @@ class PGVectorProvider(VectorDBInterface):
                 count = await session.execute(count_sql)
                 records_count = count.scalar_one()
 
-                if records_count < self.index_threshold:
-                    return False
+        if records_count < self.index_threshold:
+            return False
 
-                self.logger.info(
-                    f"Creating vector index for collection: {collection_name}")
+        self.logger.info(
+            f"Creating vector index for collection: {collection_name}")
 
-                index_name = self.default_index_name(collection_name)
-                create_idx_sql = sql_text(
-                    f"CREATE INDEX {index_name} ON {collection_name} "
-                    f"USING {index_type} ({PgVectorTableSchemaEnums.VECTOR.value} {self.distance_method});"
-                )
-                await session.execute(create_idx_sql)
-                await session.commit()
-                self.logger.info(
-                    f"Vector index created for collection: {collection_name}")
+        index_name = self.default_index_name(collection_name)
+        create_idx_sql = sql_text(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {collection_name} "
+            f"USING {index_type} ({PgVectorTableSchemaEnums.VECTOR.value} {self.distance_method}) "
+            f"WITH ({self.get_index_build_options(index_type=index_type, records_count=records_count)});"
+        )
+
+        # CONCURRENTLY keeps the collection readable and writable during the build,
+        # it can not run inside a transaction block
+        async with self.db_client() as session:
+            connection = await session.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+            try:
+                await connection.execute(sql_text(
+                    f"SET maintenance_work_mem = '{self.index_maintenance_work_mem}';"))
+                await connection.execute(sql_text(
+                    f"SET max_parallel_maintenance_workers = {int(self.index_parallel_workers)};"))
+                await connection.execute(create_idx_sql)
+            finally:
+                # the connection goes back to the pool
+                await connection.execute(sql_text("RESET maintenance_work_mem;"))
+                await connection.execute(sql_text("RESET max_parallel_maintenance_workers;"))
+
+        self.collection_registry.set(collection_name, has_index=True)
+        self.logger.info(
+            f"Vector index created for collection: {collection_name}")
 
         return True
 
-    async def reset_vector_index(self, collection_name: str,
-                                 index_type: str = PgVectorIndexTypeEnums.HNSW.value) -> bool:
+    def get_index_build_options(self, index_type: str, records_count: int) -> str:
+        if index_type == PgVectorIndexTypeEnums.IVFFLAT.value:
+            lists = self.ivfflat_lists
+            if not lists:
+                # pgvector guideline: rows / 1000 up to 1M rows, sqrt(rows) above
+                lists = records_count // 1000 if records_count <= 1000000 else int(records_count ** 0.5)
+            return f"lists = {max(int(lists), 1)}"
+
+        return f"m = {int(self.hnsw_m)}, ef_construction = {int(self.hnsw_ef_construction)}"
+
+    async def drop_vector_index(self, collection_name: str):
         index_name = self.default_index_name(collection_name)
         async with self.db_client() as session:
-            async with session.begin():
-                drop_idx_sql = sql_text(
-                    "DROP INDEX IF EXISTS :index_name;")
-                await session.execute(drop_idx_sql,
-                                      {"index_name": index_name})
-                await session.commit()
+            connection = await session.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+            await connection.execute(sql_text(
+                f"DROP INDEX CONCURRENTLY IF EXISTS {index_name};"))
+        self.collection_registry.set(collection_name, has_index=False)
+        return True
+
+    async def reset_vector_index(self, collection_name: str,
+                                 index_type: str = None) -> bool:
+        _ = await self.drop_vector_index(collection_name=collection_name)
 
         return await self.create_vector_index(collection_name=collection_name,
                                               index_type=index_type)
 
+    async def start_bulk_load(self, collection_name: str, drop_index: bool = False):
+        """
+        Inserts into the collection stop maintaining the vector index until finish_bulk_load,
+        with drop_index the existing index is dropped and rebuilt once at the end.
+        """
+        self.bulk_loading_collections.add(collection_name)
+        if drop_index:
+            self.logger.info(f"Dropping vector index for the bulk load of: {collection_name}")
+            _ = await self.drop_vector_index(collection_name=collection_name)
+
+    async def finish_bulk_load(self, collection_name: str):
+        self.bulk_loading_collections.discard(collection_name)
+        await self.create_text_search_index(collection_name=collection_name)
+        return await self.create_vector_index(collection_name=collection_name)
+
+    def get_collection_table(self, collection_name: str) -> str:
+        """Table holding the records of a collection, its own table in this layout"""
+        return collection_name
+
+    def get_collection_key(self, collection_name: str) -> dict:
+        """Columns (and values) identifying the collection records inside its table"""
+        return {}
+
+    def get_record_columns(self, collection_name: str) -> List[str]:
+        return list(self.get_collection_key(collection_name).keys()) + [
+            PgVectorTableSchemaEnums.TEXT.value,
+            PgVectorTableSchemaEnums.VECTOR.value,
+            PgVectorTableSchemaEnums.METADATA.value,
+            PgVectorTableSchemaEnums.CHUNK_ID.value,
+        ]
+
+    def get_upsert_conflict_sql(self, collection_name: str) -> str:
+        conflict_columns = list(self.get_collection_key(collection_name).keys()) + [
+            PgVectorTableSchemaEnums.CHUNK_ID.value]
+        return (f"ON CONFLICT ({', '.join(conflict_columns)}) DO UPDATE SET "
+                f"{PgVectorTableSchemaEnums.TEXT.value} = EXCLUDED.{PgVectorTableSchemaEnums.TEXT.value}, "
+                f"{PgVectorTableSchemaEnums.VECTOR.value} = EXCLUDED.{PgVectorTableSchemaEnums.VECTOR.value}, "
+                f"{PgVectorTableSchemaEnums.METADATA.value} = EXCLUDED.{PgVectorTableSchemaEnums.METADATA.value}")
+
+    def get_insert_sql(self, collection_name: str):
+        columns = self.get_record_columns(collection_name)
+        return sql_text(f"INSERT INTO {self.get_collection_table(collection_name)} ({', '.join(columns)}) "
+                        f"VALUES ({', '.join(':' + column for column in columns)}) "
+                        f"{self.get_upsert_conflict_sql(collection_name)};")
+
     async def insert_one(self, collection_name: str, text: str,
                          vector: list, metadata: dict = None,
                          record_id: str = None):
@@ -204,27 +481,32 @@ class PGVectorProvider(VectorDBInterface):
                 f"Can't insert new record without chunk_id: {collection_name}")
             return False
 
-        async with self.db_client() as session:
-            async with session.begin():
-                insert_sql = sql_text(f"INSERT INTO {collection_name} ("
-                                      f"{PgVectorTableSchemaEnums.TEXT.value}, "
-                                      f"{PgVectorTableSchemaEnums.VECTOR.value}, "
-                                      f"{PgVectorTableSchemaEnums.METADATA.value}, "
-                                      f"{PgVectorTableSchemaEnums.CHUNK_ID.value}) "
-                                      "VALUES (:text, :vector, :metadata, :chunk_id);")
+        try:
+            await self.ensure_chunk_id_unique(collection_name=collection_name)
+            await self.ensure_metadata_indexes(collection_name=collection_name)
 
-                metadata_json = json.dumps(
-                    metadata, ensure_ascii=False) if metadata else "{}"
-                await session.execute(insert_sql, {
-                    "text": text,
-                    # '[0,1,2,3]'
-                    "vector": "[" + ",".join(map(str, vector)) + "]",
-                    "metadata": metadata_json,
-                    "chunk_id": record_id
-                })
-                await session.commit()
+            async with self.db_client() as session:
+                async with session.begin():
+                    insert_sql = self.get_insert_sql(collection_name)
+
+                    metadata_json = json.dumps(
+                        metadata, ensure_ascii=False) if metadata else "{}"
+                    await session.execute(insert_sql, {
+                        **self.get_collection_key(collection_name),
+                        "text": text,
+                        # '[0,1,2,3]'
+                        "vector": "[" + ",".join(map(str, vector)) + "]",
+                        "metadata": metadata_json,
+                        "chunk_id": record_id
+                    })
+                    await session.commit()
+        except ProgrammingError as e:
+            if self.handle_missing_collection(collection_name=collection_name, error=e):
+                return False
+            raise
 
-                await self.create_vector_index(collection_name=collection_name)
+        if collection_name not in self.bulk_loading_collections:
+            await self.create_vector_index(collection_name=collection_name)
         return True
 
     async def insert_many(self, collection_name: str, texts: list,
@@ -241,43 +523,173 @@ class PGVectorProvider(VectorDBInterface):
                 f"Invalid data items for collection: {collection_name}, vectors length: {len(vectors)}, record_ids length: {len(record_ids)}")
             return False
 
-        if len(metadata) == 0 or not metadata:
+        embedding_size = self.collection_registry.get(collection_name, "embedding_size")
+        if embedding_size and any(len(vector) != embedding_size for vector in vectors):
+            self.logger.error(
+                f"Invalid vectors size for collection: {collection_name}, expected: {embedding_size}")
+            return False
+
+        if not metadata or len(metadata) == 0:
             metadata = [None] * len(texts)
 
-        async with self.db_client() as session:
-            async with session.begin():
-                for i in range(0, len(texts), batch_size):
-                    batch_texts = texts[i:i + batch_size]
-                    batch_vectors = vectors[i:i + batch_size]
-                    batch_record_ids = record_ids[i:i + batch_size]
-                    batch_metadata = metadata[i:i + batch_size]
-
-                    values = []
-
-                    for _text, _vector, _metadata, _record_id in zip(batch_texts, batch_vectors, batch_metadata, batch_record_ids):
-
-                        metadata_json = json.dumps(
-                            _metadata, ensure_ascii=False) if _metadata else "{}"
-                        values.append({
-                            "text": _text,
-                            "vector": "[" + ",".join(map(str, _vector)) + "]",
-                            "metadata": metadata_json,
-                            "chunk_id": _record_id
-                        })
-
-                    batch_insert_sql = sql_text(f"INSERT INTO {collection_name} ("
-                                                f"{PgVectorTableSchemaEnums.TEXT.value}, "
-                                                f"{PgVectorTableSchemaEnums.VECTOR.value}, "
-                                                f"{PgVectorTableSchemaEnums.METADATA.value}, "
-                                                f"{PgVectorTableSchemaEnums.CHUNK_ID.value}) "
-                                                "VALUES (:text, :vector, :metadata, :chunk_id);")
-                    await session.execute(batch_insert_sql, values)
-
-        await self.create_vector_index(collection_name=collection_name)
+        try:
+            await self.ensure_chunk_id_unique(collection_name=collection_name)
+            await self.ensure_metadata_indexes(collection_name=collection_name)
+
+            async with self.db_client() as session:
+                async with session.begin():
+                    if self.use_binary_copy:
+                        await self.copy_many(session=session, collection_name=collection_name,
+                                             texts=texts, vectors=vectors,
+                                             metadata=metadata, record_ids=record_ids)
+                    else:
+                        await self.execute_many(session=session, collection_name=collection_name,
+                                                texts=texts, vectors=vectors,
+                                                metadata=metadata, record_ids=record_ids,
+                                                batch_size=batch_size)
+        except ProgrammingError as e:
+            if self.handle_missing_collection(collection_name=collection_name, error=e):
+                return False
+            raise
+
+        if collection_name not in self.bulk_loading_collections:
+            await self.create_vector_index(collection_name=collection_name)
 
         return True
 
-    async def search_by_vector(self, collection_name: str, vector: list, limit: int = 5):
+    async def execute_many(self, session, collection_name: str, texts: list, vectors: list,
+                           metadata: list, record_ids: list, batch_size: int = 50):
+        for i in range(0, len(texts), batch_size):
+            batch_texts = texts[i:i + batch_size]
+            batch_vectors = vectors[i:i + batch_size]
+            batch_record_ids = record_ids[i:i + batch_size]
+            batch_metadata = metadata[i:i + batch_size]
+
+            values = []
+
+            for _text, _vector, _metadata, _record_id in zip(batch_texts, batch_vectors, batch_metadata, batch_record_ids):
+
+                metadata_json = json.dumps(
+                    _metadata, ensure_ascii=False) if _metadata else "{}"
+                values.append({
+                    **self.get_collection_key(collection_name),
+                    "text": _text,
+                    "vector": "[" + ",".join(map(str, _vector)) + "]",
+                    "metadata": metadata_json,
+                    "chunk_id": _record_id
+                })
+
+            await session.execute(self.get_insert_sql(collection_name), values)
+
+    async def copy_many(self, session, collection_name: str, texts: list, vectors: list,
+                        metadata: list, record_ids: list):
+        """
+        Stream the rows with a binary COPY into a temporary staging table, the vectors go
+        as float32 buffers, then upsert them into the collection in one statement.
+        """
+        collection_table = self.get_collection_table(collection_name)
+        collection_key = tuple(self.get_collection_key(collection_name).values())
+        columns = self.get_record_columns(collection_name)
+        staging_table = f"{collection_name}_staging"
+
+        await session.execute(sql_text(
+            f"CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS "
+            f"SELECT {', '.join(columns)} FROM {collection_table} WITH NO DATA;"
+        ))
+
+        # pgvector binary format: big endian float32, converted once for the whole batch
+        vectors = np.asarray(vectors, dtype=">f4")
+        records = [
+            collection_key + (_text, _vector, json.dumps(_metadata, ensure_ascii=False) if _metadata else "{}", _record_id)
+            for _text, _vector, _metadata, _record_id in zip(texts, vectors, metadata, record_ids)
+        ]
+
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        asyncpg_connection = raw_connection.driver_connection
+
+        # the binary codec only lives for the COPY, the other queries bind vectors as text
+        await asyncpg_connection.set_type_codec(
+            "vector",
+            schema="public",
+            encoder=lambda value: Vector(value).to_binary(),
+            decoder=lambda value: Vector.from_binary(value).to_numpy(),
+            format="binary"
+        )
+        try:
+            await asyncpg_connection.copy_records_to_table(
+                staging_table, records=records, columns=columns
+            )
+        finally:
+            await asyncpg_connection.reset_type_codec("vector", schema="public")
+
+        # DISTINCT ON: a chunk repeated in the batch would hit its own row twice
+        upsert_sql = sql_text(f"INSERT INTO {collection_table} ({', '.join(columns)}) "
+                              f"SELECT DISTINCT ON ({PgVectorTableSchemaEnums.CHUNK_ID.value}) {', '.join(columns)} "
+                              f"FROM {staging_table} ORDER BY {PgVectorTableSchemaEnums.CHUNK_ID.value} "
+                              f"{self.get_upsert_conflict_sql(collection_name)};")
+        await session.execute(upsert_sql)
+
+    async def apply_search_params(self, session, search_params: dict = None):
+        """SET LOCAL the ANN tuning of one query, it ends with the search transaction"""
+        search_params = search_params or {}
+
+        if search_params.get("exact"):
+            # without the index scan the ORDER BY distance is an exact scan
+            await session.execute(sql_text("SET LOCAL enable_indexscan = off;"))
+            return
+
+        if search_params.get("ef_search"):
+            ef_search = max(1, min(int(search_params["ef_search"]), 1000))
+            await session.execute(sql_text(f"SET LOCAL hnsw.ef_search = {ef_search};"))
+
+        if search_params.get("probes"):
+            probes = max(1, int(search_params["probes"]))
+            await session.execute(sql_text(f"SET LOCAL ivfflat.probes = {probes};"))
+
+    def get_filter_conditions(self, collection_name: str, search_filter: dict = None):
+        """WHERE conditions of the collection records matching a search filter, and their bind params"""
+        search_filter = search_filter or {}
+        asset_id_sql = self.get_metadata_field_sql(MetadataFieldEnums.ASSET_ID.value)
+        page_sql = self.get_metadata_field_sql(MetadataFieldEnums.PAGE.value)
+
+        collection_key = self.get_collection_key(collection_name)
+        conditions = [f"{column} = :{column}" for column in collection_key]
+        params = dict(collection_key)
+        if search_filter.get("asset_id") is not None:
+            conditions.append(f"{asset_id_sql} = :filter_asset_id")
+            params["filter_asset_id"] = int(search_filter["asset_id"])
+
+        if search_filter.get("asset_ids") is not None:
+            conditions.append(f"{asset_id_sql} = ANY(:filter_asset_ids)")
+            params["filter_asset_ids"] = [int(asset_id) for asset_id in search_filter["asset_ids"]]
+
+        if search_filter.get("page_gte") is not None:
+            conditions.append(f"{page_sql} >= :filter_page_gte")
+            params["filter_page_gte"] = int(search_filter["page_gte"])
+
+        if search_filter.get("page_lte") is not None:
+            conditions.append(f"{page_sql} <= :filter_page_lte")
+            params["filter_page_lte"] = int(search_filter["page_lte"])
+
+        return conditions, params
+
+    async def apply_iterative_scan(self, session):
+        """
+        Without it the index returns ef_search/probes candidates and the WHERE may leave
+        fewer than limit of them, ivfflat only supports the relaxed order.
+        """
+        if self.iterative_scan == PgVectorIterativeScanEnums.OFF.value:
+            return
+
+        if self.index_type == PgVectorIndexTypeEnums.IVFFLAT.value:
+            await session.execute(sql_text(
+                f"SET LOCAL ivfflat.iterative_scan = {PgVectorIterativeScanEnums.RELAXED_ORDER.value};"))
+        else:
+            await session.execute(sql_text(f"SET LOCAL hnsw.iterative_scan = {self.iterative_scan};"))
+
+    async def search_by_vector(self, collection_name: str, vector: list, limit: int = 5,
+                               search_params: dict = None, search_filter: dict = None):
         is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
         if not is_collection_existed:
             self.logger.error(
@@ -285,25 +697,128 @@ class PGVectorProvider(VectorDBInterface):
             return False
 
         vector = "[" + ",".join(map(str, vector)) + "]"
-        async with self.db_client() as session:
-            async with session.begin():
-                search_sql = sql_text(f"SELECT {PgVectorTableSchemaEnums.TEXT.value} as text, {PgVectorTableSchemaEnums.VECTOR.value} <=> :vector as score "
-                                      f"FROM {collection_name} "
-                                      "ORDER BY score "
-                                      "LIMIT :limit;"
-                                      )
-
-                result = await session.execute(search_sql, {
-                    "vector": vector,
-                    "limit": limit
-                })
-                records = result.fetchall()
+        filter_conditions, filter_params = self.get_filter_conditions(collection_name=collection_name,
+                                                                      search_filter=search_filter)
+        collection_table = self.get_collection_table(collection_name)
+        filter_clause = "WHERE " + " AND ".join(filter_conditions) + " " if filter_conditions else ""
+        try:
+            async with self.db_client() as session:
+                async with session.begin():
+                    await self.apply_search_params(session=session, search_params=search_params)
+
+                    # the ORDER BY stays on the distance the vector index serves, the score is the similarity
+                    distance_sql = f"{PgVectorTableSchemaEnums.VECTOR.value} <=> :vector"
+                    search_sql = (f"SELECT {PgVectorTableSchemaEnums.TEXT.value} as text, 1 - ({distance_sql}) as score "
+                                  f"FROM {collection_table} "
+                                  f"{filter_clause}"
+                                  f"ORDER BY {distance_sql} "
+                                  "LIMIT :limit")
+
+                    if filter_clause:
+                        await self.apply_iterative_scan(session=session)
+                        # an iterative scan in relaxed order may return the rows slightly out of order
+                        search_sql = f"SELECT text, score FROM ({search_sql}) AS results ORDER BY score DESC"
+
+                    result = await session.execute(sql_text(search_sql + ";"), {
+                        "vector": vector,
+                        "limit": limit,
+                        **filter_params
+                    })
+                    records = result.fetchall()
+        except ProgrammingError as e:
+            if self.handle_missing_collection(collection_name=collection_name, error=e):
+                return False
+            raise
 
         return [
             RetrievedDocument(**{
                 "text": record.text,
-                "score": record.score
+                "score": record.score,
+                "score_type": SearchScoreTypeEnums.SIMILARITY.value
             })
             for record in records
         ]
 
+    async def hybrid_search(self, collection_name: str, text: str, vector: list, limit: int = 5,
+                            search_params: dict = None, search_filter: dict = None):
+        """
+        Fuse the vector and the full text rankings with reciprocal rank fusion,
+        both candidate lists are computed and fused by a single query.
+        """
+        is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
+        if not is_collection_existed:
+            self.logger.error(
+                f"Can't search in non existed collection: {collection_name}")
+            return False
+
+        if not self.collection_registry.get(collection_name, "has_text_search"):
+            # the index is built by the next indexing of the collection
+            self.logger.warning(f"No text search index in collection: {collection_name}, "
+                                "falling back to vector search")
+            return await self.search_by_vector(collection_name=collection_name, vector=vector, limit=limit,
+                                               search_params=search_params, search_filter=search_filter)
+
+        vector = "[" + ",".join(map(str, vector)) + "]"
+        filter_conditions, filter_params = self.get_filter_conditions(collection_name=collection_name,
+                                                                      search_filter=search_filter)
+        collection_table = self.get_collection_table(collection_name)
+        filter_clause = "WHERE " + " AND ".join(filter_conditions) + " " if filter_conditions else ""
+        text_search_vector = self.get_text_search_vector_sql()
+        join_conditions = [f"c.{PgVectorTableSchemaEnums.ID.value} = fused.id"] + [
+            f"c.{column} = :{column}" for column in self.get_collection_key(collection_name)]
+        # any of the query terms matches, ts_rank_cd ranks the chunks matching more of them higher
+        ts_query = f"replace(plainto_tsquery('{self.text_search_config}'::regconfig, :query_text)::text, '&', '|')::tsquery"
+
+        hybrid_sql = sql_text(
+            "WITH semantic AS ("
+            "SELECT id, ROW_NUMBER() OVER (ORDER BY score) AS rank FROM ("
+            f"SELECT {PgVectorTableSchemaEnums.ID.value} AS id, {PgVectorTableSchemaEnums.VECTOR.value} <=> :vector AS score "
+            f"FROM {collection_table} {filter_clause}"
+            "ORDER BY score LIMIT :candidates) AS semantic_candidates"
+            "), lexical AS ("
+            "SELECT id, ROW_NUMBER() OVER (ORDER BY score DESC) AS rank FROM ("
+            f"SELECT {PgVectorTableSchemaEnums.ID.value} AS id, ts_rank_cd({text_search_vector}, query) AS score "
+            f"FROM {collection_table}, (SELECT {ts_query} AS query) AS search_query "
+            f"WHERE {' AND '.join([f'{text_search_vector} @@ query'] + filter_conditions)} "
+            "ORDER BY score DESC LIMIT :candidates) AS lexical_candidates"
+            "), fused AS ("
+            "SELECT COALESCE(semantic.id, lexical.id) AS id, "
+            "(COALESCE(1.0 / (:rrf_k + semantic.rank), 0.0) + "
+            "COALESCE(1.0 / (:rrf_k + lexical.rank), 0.0))::float8 AS score "
+            "FROM semantic FULL OUTER JOIN lexical ON semantic.id = lexical.id "
+            "ORDER BY score DESC LIMIT :limit"
+            ") "
+            f"SELECT c.{PgVectorTableSchemaEnums.TEXT.value} AS text, fused.score AS score "
+            f"FROM fused JOIN {collection_table} c ON {' AND '.join(join_conditions)} "
+            "ORDER BY fused.score DESC;"
+        )
+
+        try:
+            async with self.db_client() as session:
+                async with session.begin():
+                    await self.apply_search_params(session=session, search_params=search_params)
+                    if filter_conditions:
+                        await self.apply_iterative_scan(session=session)
+
+                    result = await session.execute(hybrid_sql, {
+                        "vector": vector,
+                        "query_text": text,
+                        "candidates": max(limit, self.hybrid_candidates),
+                        "rrf_k": self.hybrid_rrf_k,
+                        "limit": limit,
+                        **filter_params
+                    })
+                    records = result.fetchall()
+        except ProgrammingError as e:
+            if self.handle_missing_collection(collection_name=collection_name, error=e):
+                return False
+            raise
+
+        return [
+            RetrievedDocument(**{
+                "text": record.text,
+                "score": record.score,
+                "score_type": SearchScoreTypeEnums.RRF.value
+            })
+            for record in records
+        ]
@@ -1,18 +1,34 @@
 from qdrant_client import QdrantClient, models
 from ..VectorDBInterface import VectorDBInterface
-from ..VectorDBEnums import DistanceMethodEnums
+from ..VectorDBEnums import DistanceMethodEnums, MetadataFieldEnums, SearchScoreTypeEnums
+from ..CollectionRegistry import CollectionRegistry
 from typing import List
+from collections import Counter
 import logging
+import uuid
+import zlib
+import re
 from models.db_schemas.minirag.schemas import RetrievedDocument
 
+# words, keeping part numbers and error codes (e.g. AB-12.5, 0x8007) as one term
+_TERM_PATTERN = re.compile(r"\w+(?:[-./]\w+)*")
+
 
 class QdrantDBProvider(VectorDBInterface):
-    def __init__(self, db_client: str, default_vector_size: int = 786, distance_method: str = None, index_threshold: int = 100):
+    def __init__(self, db_client: str, default_vector_size: int = 786, distance_method: str = None, index_threshold: int = 100,
+                 indexing_threshold: int = 20000, collection_registry: CollectionRegistry = None,
+                 hybrid_candidates: int = 50):
 
         self.client = None
+        self.indexing_threshold = indexing_threshold
         self.db_client = db_client
         self.default_vector_size = default_vector_size
         self.distance_method = models.Distance.COSINE
+        self.collection_registry = collection_registry or CollectionRegistry()
+        self.hybrid_candidates = hybrid_candidates
+        # BM25 style sparse vectors, qdrant applies the IDF at query time
+        self.sparse_vector_name = "bm25"
+        self.bm25_k1 = 1.2
         self.logger = logging.getLogger("uvicorn")
 
         if distance_method == DistanceMethodEnums.COSINE.value:
@@ -32,7 +48,20 @@ class QdrantDBProvider(VectorDBInterface):
         self.client = None
 
     async def is_collection_existed(self, collection_name: str) -> bool:
-        return self.client.collection_exists(collection_name=collection_name)
+        is_existed = self.collection_registry.get(collection_name, "exists")
+        if is_existed is None:
+            is_existed = self.client.collection_exists(collection_name=collection_name)
+            self.collection_registry.set(collection_name, exists=is_existed)
+        return is_existed
+
+    def handle_missing_collection(self, collection_name: str, error: Exception) -> bool:
+        """The registry said the collection exists but it was deleted meanwhile"""
+        if "not found" not in str(error).lower():
+            return False
+
+        self.logger.error(f"Collection was deleted: {collection_name}")
+        self.collection_registry.invalidate(collection_name)
+        return True
 
     async def list_all_collections(self) -> List:
         return self.client.get_collections()
@@ -43,6 +72,7 @@ class QdrantDBProvider(VectorDBInterface):
     async def delete_collection(self, collection_name: str):
         if await self.is_collection_existed(collection_name=collection_name):
             self.logger.info(f"Deleting collection: {collection_name}")
+            self.collection_registry.invalidate(collection_name)
             return self.client.delete_collection(collection_name=collection_name)
 
     async def create_collection(self, collection_name: str, embedding_size: int, do_reset: bool = False):
@@ -57,7 +87,21 @@ class QdrantDBProvider(VectorDBInterface):
                                               vectors_config=models.VectorParams(
                                                   size=embedding_size,
                                                   distance=self.distance_method
-                                              ))
+                                              ),
+                                              sparse_vectors_config={
+                                                  self.sparse_vector_name: models.SparseVectorParams(
+                                                      modifier=models.Modifier.IDF
+                                                  )
+                                              })
+            # payload indexes let the filtered searches skip the non matching points
+            for field in MetadataFieldEnums:
+                _ = self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=self.get_metadata_field_key(field.value),
+                    field_schema=models.PayloadSchemaType.INTEGER
+                )
+            self.collection_registry.set(collection_name, exists=True, embedding_size=embedding_size,
+                                         has_sparse_vectors=True)
             return True
 
         return False
@@ -70,41 +114,59 @@ class QdrantDBProvider(VectorDBInterface):
                 f"Can't insert new record to non existed collection: {collection_name}")
             return False
 
-        _ = self.client.upload_records(
-            collection_name=collection_name,
-            records=[models.Record(
-                id=[record_id],
-                vector=vector,
-                payload={
-                    "text": text,
-                    "metadata": metadata
-                }
-            )]
-        )
+        has_sparse_vectors = await self.has_sparse_vectors(collection_name=collection_name)
+
+        # the point id is the chunk id, writing the same chunk again overwrites its point
+        try:
+            _ = self.client.upsert(
+                collection_name=collection_name,
+                points=[models.PointStruct(
+                    id=record_id if record_id is not None else self.create_point_id(text),
+                    vector=self.get_point_vector(text=text, vector=vector,
+                                                 has_sparse_vectors=has_sparse_vectors),
+                    payload={
+                        "text": text,
+                        "metadata": metadata
+                    }
+                )]
+            )
+        except Exception as e:
+            if self.handle_missing_collection(collection_name=collection_name, error=e):
+                return False
+            raise
 
         return True
 
     async def insert_many(self, collection_name: str, texts: list,
-                          vectors: list, metadatas: list = None,
+                          vectors: list, metadata: list = None,
                           record_ids: list = None, batch_size: int = 50):
-        if metadatas is None:
-            metadatas = [None] * len(texts)
+        if metadata is None:
+            metadata = [None] * len(texts)
 
         if record_ids is None:
-            record_ids = list(range(0, len(texts)))
+            record_ids = [self.create_point_id(text) for text in texts]
+
+        try:
+            has_sparse_vectors = await self.has_sparse_vectors(collection_name=collection_name)
+        except Exception as e:
+            self.handle_missing_collection(collection_name=collection_name, error=e)
+            self.logger.error(
+                f"Can't insert new records to collection: {collection_name}, error: {e}")
+            return False
 
         for i in range(0, len(texts), batch_size):
             batch_end = i + batch_size
 
             batch_texts = texts[i:batch_end]
             batch_vectors = vectors[i:batch_end]
-            batch_metadata = metadatas[i:batch_end]
+            batch_metadata = metadata[i:batch_end]
             batch_record_ids = record_ids[i:batch_end]
 
-            batch_records = [
-                models.Record(
+            batch_points = [
+                models.PointStruct(
                     id=batch_record_ids[j],
-                    vector=batch_vectors[j],
+                    vector=self.get_point_vector(text=batch_texts[j], vector=batch_vectors[j],
+                                                 has_sparse_vectors=has_sparse_vectors),
                     payload={
                         "text": batch_texts[j],
                         "metadata": batch_metadata[j]
@@ -114,28 +176,131 @@ class QdrantDBProvider(VectorDBInterface):
             ]
 
             try:
-                _ = self.client.upload_records(
+                _ = self.client.upsert(
                     collection_name=collection_name,
-                    records=batch_records
+                    points=batch_points
                 )
             except Exception as e:
+                self.handle_missing_collection(collection_name=collection_name, error=e)
                 self.logger.error(
                     f"Can't insert new records to collection: {collection_name}, error: {e}")
                 return False
 
-            return True
+        return True
+
+    def create_point_id(self, text: str) -> str:
+        # records without a chunk id get an id derived from their text, so retries stay idempotent
+        return str(uuid.uuid5(uuid.NAMESPACE_OID, text))
+
+    async def has_sparse_vectors(self, collection_name: str) -> bool:
+        """Collections created before the hybrid search only have the dense vector"""
+        has_sparse_vectors = self.collection_registry.get(collection_name, "has_sparse_vectors")
+        if has_sparse_vectors is None:
+            collection_info = self.client.get_collection(collection_name=collection_name)
+            sparse_vectors = collection_info.config.params.sparse_vectors or {}
+            has_sparse_vectors = self.sparse_vector_name in sparse_vectors
+            self.collection_registry.set(collection_name, has_sparse_vectors=has_sparse_vectors)
+        return has_sparse_vectors
+
+    def create_sparse_vector(self, text: str, is_query: bool = False):
+        """
+        Hash the terms into the sparse dimensions, documents get the BM25 saturated term
+        frequency (no length normalization) and queries a weight of 1 per term.
+        """
+        term_counts = Counter(
+            zlib.crc32(term.encode("utf-8"))
+            for term in _TERM_PATTERN.findall((text or "").lower())
+        )
+        indices = list(term_counts.keys())
+
+        if is_query:
+            values = [1.0] * len(indices)
+        else:
+            values = [
+                count * (self.bm25_k1 + 1) / (count + self.bm25_k1)
+                for count in term_counts.values()
+            ]
+
+        return models.SparseVector(indices=indices, values=values)
+
+    def get_point_vector(self, text: str, vector: list, has_sparse_vectors: bool):
+        if not has_sparse_vectors:
+            return vector
+
+        # "" is the name of the unnamed dense vector
+        return {
+            "": vector,
+            self.sparse_vector_name: self.create_sparse_vector(text=text)
+        }
+
+    def get_metadata_field_key(self, field: str) -> str:
+        return f"metadata.{field}"
+
+    def get_search_filter(self, search_filter: dict = None):
+        search_filter = search_filter or {}
+        asset_id_key = self.get_metadata_field_key(MetadataFieldEnums.ASSET_ID.value)
+
+        conditions = []
+        if search_filter.get("asset_id") is not None:
+            conditions.append(models.FieldCondition(
+                key=asset_id_key, match=models.MatchValue(value=int(search_filter["asset_id"]))))
+
+        if search_filter.get("asset_ids") is not None:
+            conditions.append(models.FieldCondition(
+                key=asset_id_key, match=models.MatchAny(any=[int(a) for a in search_filter["asset_ids"]])))
+
+        if search_filter.get("page_gte") is not None or search_filter.get("page_lte") is not None:
+            conditions.append(models.FieldCondition(
+                key=self.get_metadata_field_key(MetadataFieldEnums.PAGE.value),
+                range=models.Range(gte=search_filter.get("page_gte"), lte=search_filter.get("page_lte"))))
+
+        if not conditions:
+            return None
 
-    async def search_by_vector(self, collection_name: str, vector: list, limit: int = 5):
+        return models.Filter(must=conditions)
+
+    def get_search_params(self, search_params: dict = None):
+        search_params = search_params or {}
+        if not search_params.get("exact") and not search_params.get("ef_search"):
+            return None
+
+        return models.SearchParams(
+            hnsw_ef=int(search_params["ef_search"]) if search_params.get("ef_search") else None,
+            exact=bool(search_params.get("exact"))
+        )
+
+    async def start_bulk_load(self, collection_name: str, drop_index: bool = False):
+        # no HNSW building while the points are uploaded, the optimizer indexes them once at the end
+        self.client.update_collection(
+            collection_name=collection_name,
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0)
+        )
+
+    async def finish_bulk_load(self, collection_name: str):
+        self.client.update_collection(
+            collection_name=collection_name,
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=self.indexing_threshold)
+        )
+
+    async def search_by_vector(self, collection_name: str, vector: list, limit: int = 5,
+                               search_params: dict = None, search_filter: dict = None):
         if not await self.is_collection_existed(collection_name=collection_name):
             self.logger.error(
                 f"Can't search in non existed collection: {collection_name}")
             return False
 
-        results = self.client.search(
-            collection_name=collection_name,
-            query_vector=vector,
-            limit=limit
-        )
+        try:
+            results = self.client.search(
+                collection_name=collection_name,
+                query_vector=vector,
+                limit=limit,
+                query_filter=self.get_search_filter(search_filter),
+                search_params=self.get_search_params(search_params)
+            )
+        except Exception as e:
+            if self.handle_missing_collection(collection_name=collection_name, error=e):
+                return False
+            raise
 
         if not results or len(results) == 0:
             return None
@@ -143,7 +308,69 @@ class QdrantDBProvider(VectorDBInterface):
         return [
             RetrievedDocument(**{
                 "text": result.payload["text"],
-                "score": result.score
+                "score": result.score,
+                "score_type": SearchScoreTypeEnums.SIMILARITY.value
             })
             for result in results
         ]
+
+    async def hybrid_search(self, collection_name: str, text: str, vector: list, limit: int = 5,
+                            search_params: dict = None, search_filter: dict = None):
+        """Fuse the dense and the sparse (BM25) candidates with RRF in one query_points call"""
+        if not await self.is_collection_existed(collection_name=collection_name):
+            self.logger.error(
+                f"Can't search in non existed collection: {collection_name}")
+            return False
+
+        try:
+            has_sparse_vectors = await self.has_sparse_vectors(collection_name=collection_name)
+        except Exception as e:
+            if self.handle_missing_collection(collection_name=collection_name, error=e):
+                return False
+            raise
+
+        sparse_vector = self.create_sparse_vector(text=text, is_query=True)
+        if not has_sparse_vectors or not sparse_vector.indices:
+            return await self.search_by_vector(collection_name=collection_name, vector=vector, limit=limit,
+                                               search_params=search_params, search_filter=search_filter)
+
+        query_filter = self.get_search_filter(search_filter)
+        candidates = max(limit, self.hybrid_candidates)
+
+        try:
+            response = self.client.query_points(
+                collection_name=collection_name,
+                prefetch=[
+                    models.Prefetch(
+                        query=vector,
+                        filter=query_filter,
+                        params=self.get_search_params(search_params),
+                        limit=candidates
+                    ),
+                    models.Prefetch(
+                        query=sparse_vector,
+                        using=self.sparse_vector_name,
+                        filter=query_filter,
+                        limit=candidates
+                    ),
+                ],
+                query=models.FusionQuery(fusion=models.Fusion.RRF),
+                limit=limit,
+                with_payload=True
+            )
+        except Exception as e:
+            if self.handle_missing_collection(collection_name=collection_name, error=e):
+                return False
+            raise
+
+        if not response.points:
+            return None
+
+        return [
+            RetrievedDocument(**{
+                "text": point.payload["text"],
+                "score": point.score,
+                "score_type": SearchScoreTypeEnums.RRF.value
+            })
+            for point in response.points
+        ]
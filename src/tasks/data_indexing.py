@@ -7,6 +7,7 @@ from models.enums.ResponseEnums import ResponseSignal
 from controllers import NLPController
 import logging
 from tqdm.auto import tqdm
+from collections import deque
 
 
 logger = logging.getLogger(__name__)
@@ -22,6 +23,7 @@ def index_data_content(self, project_id: int, do_reset: int):
 async def _index_data_content(task_instance, project_id: int, do_reset: int):
     
     db_engine, vectordb_client = None, None
+    generation_client, embedding_client = None, None
 
     try:
 
@@ -56,40 +58,52 @@ async def _index_data_content(task_instance, project_id: int, do_reset: int):
             template_parser=template_parser
         )
 
-        has_records = True
-        page_no = 1
         inserted_items_count = 0
-        idx = 0
+        settings = get_settings()
 
         # create collection if not exists
         collection_name = nlp_controller.create_collection_name(project_id=project.project_id)
     
-        _ = await vectordb_client.create_collection(
+        is_created = await vectordb_client.create_collection(
             collection_name=collection_name,
             embedding_size=embedding_client.embedding_size,
             do_reset=do_reset
         )
 
+        # incremental indexing: only the chunks not in the collection yet,
+        # a new (or reset) collection holds none of them
+        if is_created:
+            _ = await chunk_model.reset_project_chunks_indexed(project_id=project.project_id)
+
         # setup batching
-        total_chunks_count = await chunk_model.get_total_chunks_count(project_id=project.project_id)
+        total_chunks_count = await chunk_model.get_total_chunks_count(
+            project_id=project.project_id, only_not_indexed=True)
+        indexed_chunks_count = await chunk_model.get_total_chunks_count(
+            project_id=project.project_id) - total_chunks_count
         pbar = tqdm(total=total_chunks_count, desc="vector Indexing", position=0)
-    
 
-        while has_records:
-            page_chunks = await chunk_model.get_project_chunks(project_id=project.project_id, page_no=page_no)
-            if len(page_chunks):
-                page_no += 1
+        # bulk load: the vector index is built once at the end instead of per page,
+        # it is dropped when this load at least doubles the collection
+        await vectordb_client.start_bulk_load(
+            collection_name=collection_name,
+            drop_index=total_chunks_count >= indexed_chunks_count
+        )
 
-            if not page_chunks or len(page_chunks) == 0:
-                has_records = False
-                break
+        # pipeline: the next pages are embedded while the oldest one is written,
+        # pages are inserted (and fail) in order, at most max_in_flight pages are embedding
+        max_in_flight = max(settings.DATA_INDEXING_MAX_IN_FLIGHT_PAGES, 1)
+        in_flight_pages = deque()
 
+        async def insert_oldest_page():
+            page_chunks, embed_task = in_flight_pages.popleft()
+            vectors = await embed_task
             chunks_ids = [c.chunk_id for c in page_chunks]
-            idx += len(page_chunks)
-            is_inserted = await nlp_controller.index_into_vector_db(
+
+            is_inserted = await nlp_controller.insert_into_vector_db(
                 project=project,
                 chunks=page_chunks,
                 chunks_ids=chunks_ids,
+                vectors=vectors
             )
 
             if not is_inserted:
@@ -100,8 +114,37 @@ async def _index_data_content(task_instance, project_id: int, do_reset: int):
                     }
                 )
                 raise Exception(f"Failed to insert into vector db for project ID: {project_id}")
+
+            _ = await chunk_model.set_chunks_indexed(chunk_ids=chunks_ids)
             pbar.update(len(page_chunks))
-            inserted_items_count += len(page_chunks)
+            return len(page_chunks)
+
+        try:
+            # keyset pagination, every page starts right after the last chunk_id of the previous one
+            async for page_chunks in chunk_model.iterate_project_chunks(
+                    project_id=project.project_id,
+                    page_size=settings.DATA_INDEXING_PAGE_SIZE,
+                    only_not_indexed=True):
+
+                in_flight_pages.append((
+                    page_chunks,
+                    asyncio.create_task(nlp_controller.embed_chunks(chunks=page_chunks))
+                ))
+
+                if len(in_flight_pages) >= max_in_flight:
+                    inserted_items_count += await insert_oldest_page()
+
+            while in_flight_pages:
+                inserted_items_count += await insert_oldest_page()
+        finally:
+            # a failed page stops the run, do not leave its successors embedding
+            for _, embed_task in in_flight_pages:
+                embed_task.cancel()
+            if in_flight_pages:
+                await asyncio.gather(*[t for _, t in in_flight_pages], return_exceptions=True)
+
+            # build the index even after a failure, the inserted pages must stay searchable
+            await vectordb_client.finish_bulk_load(collection_name=collection_name)
 
         pbar.close()
         task_instance.update_state(
@@ -126,5 +169,9 @@ async def _index_data_content(task_instance, project_id: int, do_reset: int):
                 await db_engine.dispose()
             if vectordb_client:
                 await vectordb_client.disconnect()
+            if generation_client:
+                await generation_client.close()
+            if embedding_client:
+                await embedding_client.close()
         except Exception as e:
             logger.error(f"Task failed while cleaning: {str(e)}")
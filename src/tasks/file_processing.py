@@ -1,3 +1,4 @@
+from celery import chord, chain
 from celery_app import celery_app, get_setup_utils
 from helpers.config import get_settings
 import asyncio
@@ -9,6 +10,7 @@ from models.db_schemas import DataChunk
 from models.enums.AssetTypeEnum import AssetTypeEnum
 from controllers import ProcessController, NLPController
 from utils.idempotency_manager import IdempotencyManager
+from utils.async_pipeline import iterate_in_executor
 
 import logging
 logger = logging.getLogger(__name__)
@@ -21,11 +23,13 @@ def process_project_files(self, project_id: int,
                           file_id: int,
                           chunk_size: int,
                           overlap_size: int,
-                          do_reset: int):
+                          do_reset: int,
+                          chunking_method: str = None,
+                          file_ids: list = None):
 
     return asyncio.run(
         _process_project_files(self, project_id, file_id, chunk_size,
-                               overlap_size, do_reset)
+                               overlap_size, do_reset, chunking_method, file_ids)
     )
 
 
@@ -33,8 +37,12 @@ async def _process_project_files(task_instance, project_id: int,
                                  file_id: int,
                                  chunk_size: int,
                                  overlap_size: int,
-                                 do_reset: int):
+                                 do_reset: int,
+                                 chunking_method: str = None,
+                                 file_ids: list = None):
     db_engine, vectordb_client = None, None
+    generation_client, embedding_client = None, None
+    idempotency_manager, task_record = None, None
 
     try:
 
@@ -48,7 +56,9 @@ async def _process_project_files(task_instance, project_id: int,
             "file_id": file_id,
             "chunk_size": chunk_size,
             "overlap_size": overlap_size,
-            "do_reset": do_reset
+            "do_reset": do_reset,
+            "chunking_method": chunking_method,
+            "file_ids": file_ids
         }
         
         task_name = "tasks.file_processing.process_project_files"
@@ -132,6 +142,16 @@ async def _process_project_files(task_instance, project_id: int,
             project_files_ids = {
                 asset_record.asset_id: asset_record.asset_name
             }
+        elif file_ids:
+            # a batch of a fanned out project processing
+            project_files = await asset_model.get_project_assets_by_names(
+                asset_project_id=project.project_id,
+                asset_names=file_ids
+            )
+            project_files_ids = {
+                record.asset_id: record.asset_name
+                for record in project_files
+            }
         else:
 
             asset_model = await AssetModel.create_instance(
@@ -183,39 +203,40 @@ async def _process_project_files(task_instance, project_id: int,
             _ = await chunk_model.delete_chunks_by_project_id(
                 project_id=project.project_id
             )
+        elif existing_task or task_instance.request.retries > 0:
+            # a previous attempt may have inserted part of these files chunks
+            _ = await chunk_model.delete_not_indexed_chunks_by_asset_ids(
+                project_id=project.project_id,
+                asset_ids=list(project_files_ids.keys())
+            )
 
-        for asset_id, file_id in project_files_ids.items():
+        # parse/chunk in an executor while the previous batches are written to the DB
+        chunks_batches = _iterate_project_chunks_batches(
+            process_controller=process_controller,
+            project_files_ids=project_files_ids,
+            project_id=project.project_id,
+            chunk_size=chunk_size,
+            overlap_size=overlap_size,
+            chunking_method=chunking_method,
+            batch_size=settings.FILE_PROCESSING_INSERT_BATCH_SIZE
+        )
 
-            file_content = process_controller.get_file_content(file_id=file_id)
+        file_records = 0
+        async for file_id, file_chunks_records, is_file_done in iterate_in_executor(
+                chunks_batches, max_pending=settings.FILE_PROCESSING_QUEUE_SIZE):
 
-            if file_content is None:
-                logger.error(f"Failed to process file: {file_id}")
-                continue
+            if len(file_chunks_records):
+                file_records += await chunk_model.insert_many_chunks(chunks=file_chunks_records)
 
-            file_chunks = process_controller.process_file_content(
-                file_content=file_content,
-                file_id=file_id,
-                chunk_size=chunk_size,
-                overlap_size=overlap_size
-            )
+            if not is_file_done:
+                continue
 
-            if file_chunks is None or len(file_chunks) == 0:
+            if file_records == 0:
                 logger.error(f"Failed to process file: {file_id}")
-                pass
-
-            file_chunks_records = [
-                DataChunk(
-                    chunk_text=chunk.page_content,
-                    chunk_metadata=chunk.metadata,
-                    chunk_order=i+1,
-                    chunk_project_id=project.project_id,
-                    chunk_asset_id=asset_id
-                )
-                for i, chunk in enumerate(file_chunks)
-            ]
 
-            no_records += await chunk_model.insert_many_chunks(chunks=file_chunks_records)
+            no_records += file_records
             no_files += 1
+            file_records = 0
 
         task_instance.update_state(
             state="SUCCESS",
@@ -241,11 +262,22 @@ async def _process_project_files(task_instance, project_id: int,
             "inserted_chunks": no_records,
             "processed_files": no_files,
             "project_id": project_id,
-            "do_reset": do_reset
+            "do_reset": do_reset,
+            "chunking_method": chunking_method,
+            "file_ids": file_ids
         }
 
     except Exception as e:
         logger.error(f"Task failed: {str(e)}")
+        if task_record:
+            # a STARTED record would make the retry (same celery_task_id) skip the work
+            try:
+                await idempotency_manager.update_task_status(
+                    execution_id=task_record.execution_id,
+                    status="FAILURE",
+                )
+            except Exception as update_error:
+                logger.error(f"Failed to update the task record: {str(update_error)}")
         raise
     finally:
         try:
@@ -253,5 +285,273 @@ async def _process_project_files(task_instance, project_id: int,
                 await db_engine.dispose()
             if vectordb_client:
                 await vectordb_client.disconnect()
+            if generation_client:
+                await generation_client.close()
+            if embedding_client:
+                await embedding_client.close()
         except Exception as e:
             logger.error(f"Task failed while cleaning: {str(e)}")
+
+
+def with_project_reset(dispatch_signature, project_id: int, do_reset: int):
+    """
+    Run the reset once before the (retried) fan out dispatch, so a retry can not delete
+    the chunks the already enqueued subtasks are writing.
+    """
+    if do_reset == 1:
+        return chain(reset_project_data.si(project_id), dispatch_signature)
+    return dispatch_signature
+
+
+@celery_app.task(bind=True, name="tasks.file_processing.reset_project_data")
+def reset_project_data(self, project_id: int):
+    # not retried on purpose, see with_project_reset
+    return asyncio.run(_reset_project_data(project_id))
+
+
+@celery_app.task(bind=True, name="tasks.file_processing.fan_out_project_files",
+                 autoretry_for=(Exception,),
+                 retry_kwargs={"max_retries": 3, "countdown": 60})
+def fan_out_project_files(self, project_id: int,
+                          chunk_size: int,
+                          overlap_size: int,
+                          do_reset: int,
+                          chunking_method: str = None):
+
+    # the reset, if requested, already ran in reset_project_data
+    subtasks = asyncio.run(
+        _prepare_fan_out_subtasks(project_id, chunk_size, overlap_size, chunking_method)
+    )
+
+    result = chord(subtasks)(
+        aggregate_process_results.s(project_id, do_reset)
+    )
+
+    return {
+        "signal": ResponseSignal.FILE_PROCESSING_FAN_OUT_READY.value,
+        "chord_id": result.id,
+        "subtasks_count": len(subtasks)
+    }
+
+
+@celery_app.task(bind=True, name="tasks.file_processing.process_project_files_batch",
+                 max_retries=3, default_retry_delay=60)
+def process_project_files_batch(self, project_id: int,
+                                chunk_size: int,
+                                overlap_size: int,
+                                chunking_method: str = None,
+                                file_ids: list = None):
+    """
+    A fanned out batch, once its retries are exhausted it returns a failure result
+    instead of raising, so the chord callback still runs and reports it.
+    """
+    try:
+        return asyncio.run(
+            _process_project_files(self, project_id, None, chunk_size,
+                                   overlap_size, 0, chunking_method, file_ids)
+        )
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+
+        logger.error(f"Files batch failed: {file_ids}, error: {str(e)}")
+        return {
+            "signal": ResponseSignal.FILE_PROCESSING_FAILED.value,
+            "inserted_chunks": 0,
+            "processed_files": 0,
+            "project_id": project_id,
+            "file_ids": file_ids,
+            "error": str(e)
+        }
+
+
+@celery_app.task(bind=True, name="tasks.file_processing.aggregate_process_results")
+def aggregate_process_results(self, results: list, project_id: int, do_reset: int):
+
+    # a batch without a result (skipped or lost) did not process its files either
+    results = [result or {} for result in results]
+    succeeded = [result for result in results
+                 if result.get("signal") == ResponseSignal.FILE_PROCESSING_SUCCESS.value]
+    failed = [result for result in results
+              if result.get("signal") != ResponseSignal.FILE_PROCESSING_SUCCESS.value]
+
+    no_records = sum(result.get("inserted_chunks", 0) for result in succeeded)
+    no_files = sum(result.get("processed_files", 0) for result in succeeded)
+
+    signal = ResponseSignal.FILE_PROCESSING_SUCCESS.value
+    if failed:
+        signal = ResponseSignal.FILE_PROCESSING_PARTIAL.value if succeeded \
+            else ResponseSignal.FILE_PROCESSING_FAILED.value
+        logger.error(f"Failed files batches: {len(failed)} of {len(results)}")
+
+    logger.warning(f"Inserted_chunks: {no_records}, processed_files: {no_files}")
+
+    return {
+        "signal": signal,
+        "inserted_chunks": no_records,
+        "processed_files": no_files,
+        "project_id": project_id,
+        "do_reset": do_reset,
+        "succeeded_batches": [result.get("file_ids") for result in succeeded],
+        "failed_batches": [
+            {"file_ids": result.get("file_ids"), "error": result.get("error")}
+            for result in failed
+        ]
+    }
+
+
+async def _reset_project_data(project_id: int):
+    """Delete the project vector db collection and chunks"""
+    db_engine, vectordb_client = None, None
+    generation_client, embedding_client = None, None
+
+    try:
+        (db_engine, db_client, generation_client, llm_provider_factory,
+         embedding_client, vector_db_provider_factory, vectordb_client, template_parser) = await get_setup_utils()
+
+        project_model = await ProjectModel.create_instance(
+            db_client=db_client
+        )
+
+        project = await project_model.get_project_or_create_one(
+            project_id=project_id
+        )
+
+        nlp_controller = NLPController(
+            vectordb_client=vectordb_client,
+            generation_client=generation_client,
+            embedding_client=embedding_client,
+            template_parser=template_parser
+        )
+
+        collection_name = nlp_controller.create_collection_name(
+            project_id=project.project_id)
+
+        _ = await vectordb_client.delete_collection(collection_name=collection_name)
+
+        chunk_model = await ChunkModel.create_instance(
+            db_client=db_client
+        )
+
+        deleted_chunks = await chunk_model.delete_chunks_by_project_id(
+            project_id=project.project_id
+        )
+
+        return {
+            "project_id": project_id,
+            "deleted_chunks": deleted_chunks
+        }
+
+    finally:
+        try:
+            if db_engine:
+                await db_engine.dispose()
+            if vectordb_client:
+                await vectordb_client.disconnect()
+            if generation_client:
+                await generation_client.close()
+            if embedding_client:
+                await embedding_client.close()
+        except Exception as e:
+            logger.error(f"Task failed while cleaning: {str(e)}")
+
+
+async def _prepare_fan_out_subtasks(project_id: int,
+                                    chunk_size: int,
+                                    overlap_size: int,
+                                    chunking_method: str = None):
+    """
+    Split the project assets into process_project_files_batch subtasks
+    of FILE_PROCESSING_FAN_OUT_BATCH_SIZE files each.
+    """
+    db_engine, vectordb_client = None, None
+    generation_client, embedding_client = None, None
+
+    try:
+        (db_engine, db_client, generation_client, llm_provider_factory,
+         embedding_client, vector_db_provider_factory, vectordb_client, template_parser) = await get_setup_utils()
+
+        settings = get_settings()
+
+        project_model = await ProjectModel.create_instance(
+            db_client=db_client
+        )
+
+        project = await project_model.get_project_or_create_one(
+            project_id=project_id
+        )
+
+        asset_model = await AssetModel.create_instance(
+            db_client=db_client
+        )
+
+        project_files = await asset_model.get_all_project_assets(
+            asset_project_id=project.project_id,
+            asset_type=AssetTypeEnum.FILE.value
+        )
+
+        if len(project_files) == 0:
+            raise Exception("No files found for project ID")
+
+        batch_size = max(settings.FILE_PROCESSING_FAN_OUT_BATCH_SIZE, 1)
+        files_names = [record.asset_name for record in project_files]
+
+        return [
+            process_project_files_batch.s(project_id, chunk_size, overlap_size,
+                                          chunking_method, files_names[i:i + batch_size])
+            for i in range(0, len(files_names), batch_size)
+        ]
+
+    finally:
+        try:
+            if db_engine:
+                await db_engine.dispose()
+            if vectordb_client:
+                await vectordb_client.disconnect()
+            if generation_client:
+                await generation_client.close()
+            if embedding_client:
+                await embedding_client.close()
+        except Exception as e:
+            logger.error(f"Task failed while cleaning: {str(e)}")
+
+
+def _iterate_project_chunks_batches(process_controller: ProcessController, project_files_ids: dict,
+                                    project_id: int, chunk_size: int, overlap_size: int,
+                                    chunking_method: str, batch_size: int):
+    """
+    Blocking producer of the processing pipeline, parses the files one by one and yields
+    (file_id, chunks_records, is_file_done) batches of at most batch_size chunks.
+    """
+
+    for asset_id, file_id in project_files_ids.items():
+
+        file_content = process_controller.get_file_content_stream(file_id=file_id)
+
+        if file_content is None:
+            logger.error(f"Failed to process file: {file_id}")
+            continue
+
+        file_chunks = process_controller.process_file_content_stream(
+            file_content=file_content,
+            file_id=file_id,
+            chunk_size=chunk_size,
+            overlap_size=overlap_size,
+            chunking_method=chunking_method
+        )
+
+        file_chunks_records = []
+        for i, chunk in enumerate(file_chunks):
+            file_chunks_records.append(DataChunk(
+                chunk_text=chunk.page_content,
+                chunk_metadata=chunk.metadata,
+                chunk_order=i+1,
+                chunk_project_id=project_id,
+                chunk_asset_id=asset_id
+            ))
+
+            if len(file_chunks_records) >= batch_size:
+                yield file_id, file_chunks_records, False
+                file_chunks_records = []
+
+        yield file_id, file_chunks_records, True
@@ -2,6 +2,12 @@ from celery_app import celery_app, get_setup_utils
 from helpers.config import get_settings
 import asyncio
 from utils.idempotency_manager import IdempotencyManager
+from models.UploadSessionModel import UploadSessionModel
+from models.AssetModel import AssetModel
+from models.EmbeddingCacheModel import EmbeddingCacheModel
+from controllers import ProjectController
+from stores.vectordb.providers import PGVectorPartitionedProvider
+import os
 
 import logging
 logger = logging.getLogger(__name__)
@@ -19,6 +25,7 @@ def clean_celery_executions_table(self):
 async def _clean_celery_executions_table(task_instance):
     
     db_engine, vectordb_client = None, None
+    generation_client, embedding_client = None, None
     
     try:
         (db_engine, db_client, generation_client, llm_provider_factory,
@@ -41,5 +48,170 @@ async def _clean_celery_executions_table(task_instance):
                 await db_engine.dispose()
             if vectordb_client:
                 await vectordb_client.disconnect()
+            if generation_client:
+                await generation_client.close()
+            if embedding_client:
+                await embedding_client.close()
+        except Exception as e:
+            logger.error(f"Task failed while cleaning: {str(e)}")
+
+
+@celery_app.task(
+    bind=True, name="tasks.maintenance.clean_stale_upload_sessions",
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 3, "countdown": 60}
+)
+def clean_stale_upload_sessions(self):
+
+    return asyncio.run(_clean_stale_upload_sessions(self))
+
+
+async def _clean_stale_upload_sessions(task_instance):
+
+    db_engine, vectordb_client = None, None
+    generation_client, embedding_client = None, None
+
+    try:
+        (db_engine, db_client, generation_client, llm_provider_factory,
+         embedding_client, vector_db_provider_factory, vectordb_client, template_parser) = await get_setup_utils()
+
+        settings = get_settings()
+
+        upload_session_model = await UploadSessionModel.create_instance(db_client=db_client)
+        asset_model = await AssetModel.create_instance(db_client=db_client)
+
+        stale_sessions = await upload_session_model.get_stale_upload_sessions(
+            time_retention=settings.FILE_UPLOAD_SESSION_RETENTION
+        )
+
+        logger.warning(f"Cleaning {len(stale_sessions)} stale upload sessions...")
+
+        for upload_session in stale_sessions:
+            file_path = os.path.join(
+                ProjectController().get_project_path(project_id=upload_session.upload_project_id),
+                upload_session.upload_file_name
+            )
+            # an interrupted finalize may have stored the file as an asset already
+            asset_record = await asset_model.get_asset_record(
+                asset_project_id=upload_session.upload_project_id,
+                asset_name=upload_session.upload_file_name
+            )
+            if asset_record is None and os.path.exists(file_path):
+                os.remove(file_path)
+
+        if len(stale_sessions):
+            _ = await upload_session_model.delete_upload_sessions(
+                upload_ids=[upload_session.upload_id for upload_session in stale_sessions]
+            )
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Task failed: {str(e)}")
+        raise
+    finally:
+        try:
+            if db_engine:
+                await db_engine.dispose()
+            if vectordb_client:
+                await vectordb_client.disconnect()
+            if generation_client:
+                await generation_client.close()
+            if embedding_client:
+                await embedding_client.close()
+        except Exception as e:
+            logger.error(f"Task failed while cleaning: {str(e)}")
+
+
+@celery_app.task(
+    bind=True, name="tasks.maintenance.prune_embedding_cache",
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 3, "countdown": 60}
+)
+def prune_embedding_cache(self):
+
+    return asyncio.run(_prune_embedding_cache(self))
+
+
+async def _prune_embedding_cache(task_instance):
+
+    db_engine, vectordb_client = None, None
+    generation_client, embedding_client = None, None
+
+    try:
+        (db_engine, db_client, generation_client, llm_provider_factory,
+         embedding_client, vector_db_provider_factory, vectordb_client, template_parser) = await get_setup_utils()
+
+        settings = get_settings()
+
+        embedding_cache_model = await EmbeddingCacheModel.create_instance(db_client=db_client)
+
+        deleted_entries = await embedding_cache_model.delete_unused_entries(
+            time_retention=settings.EMBEDDING_CACHE_RETENTION
+        )
+
+        logger.warning(f"Pruned {deleted_entries} unused embedding cache entries...")
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Task failed: {str(e)}")
+        raise
+    finally:
+        try:
+            if db_engine:
+                await db_engine.dispose()
+            if vectordb_client:
+                await vectordb_client.disconnect()
+            if generation_client:
+                await generation_client.close()
+            if embedding_client:
+                await embedding_client.close()
+        except Exception as e:
+            logger.error(f"Task failed while cleaning: {str(e)}")
+
+
+@celery_app.task(
+    bind=True, name="tasks.maintenance.promote_large_pgvector_collections",
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 3, "countdown": 60}
+)
+def promote_large_pgvector_collections(self):
+
+    return asyncio.run(_promote_large_pgvector_collections(self))
+
+
+async def _promote_large_pgvector_collections(task_instance):
+
+    db_engine, vectordb_client = None, None
+    generation_client, embedding_client = None, None
+
+    try:
+        (db_engine, db_client, generation_client, llm_provider_factory,
+         embedding_client, vector_db_provider_factory, vectordb_client, template_parser) = await get_setup_utils()
+
+        # only the partitioned PGVector layout has shared partitions to promote from
+        if not isinstance(vectordb_client, PGVectorPartitionedProvider):
+            return True
+
+        promoted_collections = await vectordb_client.promote_large_collections()
+
+        logger.warning(f"Promoted {len(promoted_collections)} collections to their own partition...")
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Task failed: {str(e)}")
+        raise
+    finally:
+        try:
+            if db_engine:
+                await db_engine.dispose()
+            if vectordb_client:
+                await vectordb_client.disconnect()
+            if generation_client:
+                await generation_client.close()
+            if embedding_client:
+                await embedding_client.close()
         except Exception as e:
             logger.error(f"Task failed while cleaning: {str(e)}")
@@ -1,8 +1,10 @@
-from celery import chain
+from celery import chain, chord
 from celery_app import celery_app, get_setup_utils
 from helpers.config import get_settings
 import asyncio
-from tasks.file_processing import process_project_files
+from models import ResponseSignal
+from tasks.file_processing import (process_project_files, aggregate_process_results,
+                                   _prepare_fan_out_subtasks)
 from tasks.data_indexing import _index_data_content
 
 import logging
@@ -16,7 +18,16 @@ def push_after_process_task(self, prev_task_result):
 
     project_id = prev_task_result["project_id"]
     do_reset = prev_task_result["do_reset"]
-    
+
+    if prev_task_result.get("signal") == ResponseSignal.FILE_PROCESSING_FAILED.value:
+        # every files batch failed, nothing new to push
+        logger.error(f"Skipping push, processing failed for project: {project_id}")
+        return {
+            "project_id": project_id,
+            "do_reset": do_reset,
+            "task_results": prev_task_result
+        }
+
     task_results = asyncio.run(
         _index_data_content(self, project_id, do_reset)
     )
@@ -36,11 +47,38 @@ def process_and_push_workflow(self, project_id: int,
                               file_id: int,
                               chunk_size: int,
                               overlap_size: int,
-                              do_reset: int):
+                              do_reset: int,
+                              chunking_method: str = None,
+                              do_fan_out: int = 0):
+
+    if do_fan_out == 1 and not file_id:
+        # one subtask per files batch, indexing starts once all of them are done,
+        # the reset, if requested, already ran in reset_project_data
+        subtasks = asyncio.run(
+            _prepare_fan_out_subtasks(project_id, chunk_size, overlap_size,
+                                      chunking_method)
+        )
+
+        result = chord(subtasks)(
+            chain(
+                aggregate_process_results.s(project_id, do_reset),
+                push_after_process_task.s()
+            )
+        )
+
+        return {
+            "signal": "WORKFLOW_STARTED",
+            "workflow_id": result.id,
+            "subtasks_count": len(subtasks),
+            "tasks": ["tasks.file_processing.process_project_files_batch",
+                      "tasks.file_processing.aggregate_process_results",
+                      "tasks.process_workflow.push_after_process_task"]
+        }
 
     workflow = chain(
         process_project_files.s(project_id, file_id,
-                                chunk_size, overlap_size, do_reset),
+                                chunk_size, overlap_size, do_reset,
+                                chunking_method),
         push_after_process_task.s()
     )
 
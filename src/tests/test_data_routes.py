@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("celery")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from kombu.utils.json import dumps
+
+import routes.data as data_routes
+from models import ResponseSignal
+
+
+class FakeAsyncResult:
+    id = "task-id"
+
+
+def test_process_without_chunking_method_sends_json_serializable_task_args(monkeypatch):
+    sent_kwargs = {}
+
+    def fake_delay(**kwargs):
+        sent_kwargs.update(kwargs)
+        # what kombu does to the task arguments before publishing them
+        dumps(kwargs)
+        return FakeAsyncResult()
+
+    monkeypatch.setattr(data_routes.process_project_files, "delay", fake_delay)
+
+    app = FastAPI()
+    app.include_router(data_routes.data_router)
+    client = TestClient(app)
+
+    response = client.post("/api/v1/data/process/1", json={"file_id": "file.txt"})
+
+    assert response.status_code == 200
+    assert response.json()["signal"] == ResponseSignal.FILE_PROCESSING_SUCCESS.value
+    assert sent_kwargs["chunking_method"] == "simple"
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+from typing import AsyncIterator, Iterable
+
+_END_OF_STREAM = object()
+
+
+async def iterate_in_executor(iterable: Iterable, max_pending: int = 4,
+                              executor=None) -> AsyncIterator:
+    """
+    Consume a blocking iterable in an executor and yield its items on the event loop.
+    Args:
+        iterable: Blocking iterable (e.g. a generator that parses files)
+        max_pending: Maximum number of produced items waiting for the consumer,
+                     the producer blocks when it is reached (backpressure)
+        executor: Executor to run the producer in, the loop default executor if None
+    """
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=max(max_pending, 1))
+    stop_event = threading.Event()
+
+    def put(item, error=None):
+        asyncio.run_coroutine_threadsafe(queue.put((item, error)), loop).result()
+
+    def produce():
+        try:
+            for item in iterable:
+                if stop_event.is_set():
+                    return
+                put(item)
+        except Exception as e:
+            put(_END_OF_STREAM, e)
+            return
+        put(_END_OF_STREAM)
+
+    producer = loop.run_in_executor(executor, produce)
+
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is _END_OF_STREAM:
+                if error:
+                    raise error
+                break
+            yield item
+    finally:
+        stop_event.set()
+        # the producer may be blocked on a full queue, keep draining until it exits
+        while not producer.done():
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.wait({producer}, timeout=0.05)
+        await producer
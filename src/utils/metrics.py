@@ -12,6 +12,21 @@ REQUEST_LATENCY = Histogram(
     'http_request_duration_seconds', 'Duration of HTTP requests',
     ['method', 'endpoint', 'status']
 )
+EMBEDDING_CACHE_REQUESTS = Counter(
+    'embedding_cache_requests_total', 'Embedding cache lookups per text',
+    ['tier', 'result']
+)
+EMBEDDING_QUERY_BATCH_SIZE = Histogram(
+    'embedding_query_batch_size', 'Number of queries per batched embedding request',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+EMBEDDING_QUERY_BATCH_LATENCY = Histogram(
+    'embedding_query_batch_duration_seconds', 'Duration of batched query embedding requests'
+)
+LLM_RATE_LIMIT_WAIT = Histogram(
+    'llm_rate_limit_wait_seconds', 'Time LLM calls waited for rate limit capacity',
+    ['bucket', 'priority']
+)
 
 class PrometheusMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):